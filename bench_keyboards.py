@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Микробенчмарк клавиатур: сборка разметки на каждый ответ против готовой.
+
+Для каждой клавиатуры сравнивает сборку заново (как было раньше) и
+получение через get_*_keyboard: время вызова и объем памяти, выделенной
+за серию вызовов (tracemalloc). БД и Telegram не нужны.
+
+Запуск: python bench_keyboards.py [количество_вызовов]
+"""
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.utils import keyboards, filter_keyboards
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+# Листание: 200 вакансий, у каждой несколько показов (вперед-назад, возврат из письма)
+VACANCY_ARGS = [(str(90_000_000 + i), i, 200) for i in range(200)]
+
+CASES = [
+    ("get_main_keyboard", keyboards._build_main_keyboard, keyboards.get_main_keyboard),
+    ("get_filters_main_keyboard", filter_keyboards._build_filters_main_keyboard,
+     filter_keyboards.get_filters_main_keyboard),
+    ("get_salary_keyboard", filter_keyboards._build_salary_keyboard, filter_keyboards.get_salary_keyboard),
+    ("get_area_keyboard", filter_keyboards._build_area_keyboard, filter_keyboards.get_area_keyboard),
+]
+
+
+def measure(func, args_list):
+    """Время на вызов (мкс) и выделенная память на вызов (байт)"""
+    n = len(args_list)
+
+    started = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [func(*args) for args in args_list]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+
+    return elapsed / n * 1e6, allocated / n
+
+
+def report(name, build, cached, args_list):
+    build_us, build_bytes = measure(build, args_list)
+    cached_us, cached_bytes = measure(cached, args_list)
+    print(f"{name:28} {build_us:9.2f} мкс {build_bytes:9.0f} Б  ->  "
+          f"{cached_us:7.2f} мкс {cached_bytes:7.0f} Б  (x{build_us / cached_us:.0f})")
+
+
+def main():
+    print(f"Вызовов: {CALLS}")
+    print(f"{'клавиатура':28} {'сборка заново':>24}  ->  {'готовая':>20}")
+
+    for name, build, cached in CASES:
+        report(name, build, cached, [()] * CALLS)
+
+    vacancy_calls = [VACANCY_ARGS[i % len(VACANCY_ARGS)] for i in range(CALLS)]
+    keyboards.get_vacancy_keyboard.cache_clear()
+    report("get_vacancy_keyboard", keyboards.get_vacancy_keyboard.__wrapped__,
+           keyboards.get_vacancy_keyboard, vacancy_calls)
+    print(f"Кэш get_vacancy_keyboard: {keyboards.get_vacancy_keyboard.cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
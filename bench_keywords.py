@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Микробенчмарк KeywordMatcher: время проверки вакансии в зависимости от числа слов.
+
+Для 10, 100, 1000 и 10000 пользователей (по 3 ключевых слова и 2 исключения
+у каждого) строит автомат и проверяет вакансию с описанием ~3 КБ. Время
+проверки должно расти с длиной текста, а не с числом слов. БД и HH не нужны.
+
+Запуск: python bench_keywords.py [количество_проверок]
+"""
+import sys
+import os
+import random
+import string
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.services.keyword_matcher import KeywordMatcher
+
+CHECKS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+USERS = [10, 100, 1000, 10000]
+
+
+def word(length: int = 7) -> str:
+    return ''.join(random.choices(string.ascii_lowercase, k=length))
+
+
+def main():
+    random.seed(1)
+    vocabulary = [word() for _ in range(5000)]
+    vacancy = {
+        'name': 'Python разработчик',
+        'description': '<p>' + ' '.join(random.choices(vocabulary, k=400)) + '</p>',
+        'key_skills': [{'name': 'Django'}, {'name': 'PostgreSQL'}],
+    }
+    print(f"Проверок: {CHECKS}, длина текста: {len(vacancy['description'])} символов")
+
+    for users in USERS:
+        matcher = KeywordMatcher()
+        started = time.perf_counter()
+        for user_id in range(users):
+            matcher.set_user(user_id, {
+                'keywords': random.sample(vocabulary, 3),
+                'exclude_keywords': random.sample(vocabulary, 2),
+            })
+        matcher.matched_words(vacancy)  # Суффиксные ссылки строятся при первом поиске
+        build_ms = (time.perf_counter() - started) * 1000
+
+        user_ids = list(range(users))
+        started = time.perf_counter()
+        for _ in range(CHECKS):
+            accepted = matcher.accepts(vacancy, user_ids)
+        check_ms = (time.perf_counter() - started) / CHECKS * 1000
+
+        print(f"пользователей {users:6}: шаблонов {len(matcher.automaton.patterns):6}, "
+              f"сборка {build_ms:8.1f} мс, проверка вакансии {check_ms:6.2f} мс, подходит {len(accepted)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Бенчмарк планов запросов горячего пути на 1M вакансий.
+
+Создает отдельную схему bench в БД из configs/dev.env, заполняет ее
+синтетическими данными и печатает EXPLAIN ANALYZE для старой (NOT IN)
+и новой (NOT EXISTS) формы запроса новых вакансий, а также для поиска
+по названию через ILIKE. Схема удаляется в конце.
+
+Запуск: python bench_queries.py [количество_вакансий]
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy.sql import text
+from src.storage.database import db
+from src.storage.models import Base
+
+VACANCIES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+USER_ID = 1
+SENT_TO_USER = 50_000
+
+QUERIES = {
+    "Новые вакансии (старый вариант: NOT IN)": """
+        SELECT * FROM vacancies
+        WHERE hh_id NOT IN (SELECT vacancy_id FROM user_vacancies WHERE user_id = :user_id)
+        ORDER BY published_at DESC
+        LIMIT 10
+    """,
+    "Новые вакансии (NOT EXISTS + индекс published_at)": """
+        SELECT * FROM vacancies
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_vacancies
+            WHERE user_vacancies.user_id = :user_id AND user_vacancies.vacancy_id = vacancies.hh_id
+        )
+        ORDER BY published_at DESC NULLS LAST
+        LIMIT 10
+    """,
+    "Новые вакансии по названию (ILIKE + триграммный индекс)": """
+        SELECT * FROM vacancies
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_vacancies
+            WHERE user_vacancies.user_id = :user_id AND user_vacancies.vacancy_id = vacancies.hh_id
+        )
+        AND title ILIKE '%python%'
+        ORDER BY published_at DESC NULLS LAST
+        LIMIT 10
+    """,
+    "Отправленные пользователю (user_id, notified)": """
+        SELECT vacancy_id FROM user_vacancies
+        WHERE user_id = :user_id AND notified = true
+    """,
+}
+
+
+async def check_bench_tables(conn):
+    """Убеждается, что таблицы созданы в bench и данные не попадут в рабочие таблицы"""
+    result = await conn.execute(text("""
+        SELECT tablename FROM pg_tables WHERE schemaname = 'bench'
+    """))
+    missing = set(Base.metadata.tables) - {row[0] for row in result}
+    if missing:
+        raise RuntimeError(f"В схеме bench не созданы таблицы: {', '.join(sorted(missing))}")
+
+
+async def fill(conn):
+    """Заполняет схему bench синтетическими данными"""
+    await conn.execute(text("""
+        INSERT INTO users (telegram_id, first_name, is_active, created_at)
+        SELECT g, 'user' || g, true, now() FROM generate_series(1, 1000) g
+    """))
+    await conn.execute(text("""
+        INSERT INTO vacancies (hh_id, title, employer_name, area, url, published_at, fetched_at)
+        SELECT g::text,
+               (ARRAY['Python-разработчик', 'Java developer', 'Data Scientist',
+                      'Frontend-разработчик', 'DevOps инженер', 'Аналитик данных'])[1 + g % 6]
+                   || ' ' || md5(g::text),
+               'Компания ' || (g % 5000),
+               'Москва',
+               'https://hh.ru/vacancy/' || g,
+               now() - (g || ' seconds')::interval,
+               now()
+        FROM generate_series(1, :n) g
+    """), {"n": VACANCIES})
+    await conn.execute(text("""
+        INSERT INTO user_vacancies (user_id, vacancy_id, notified, cover_sent, interested, created_at)
+        SELECT 1 + g % 1000, g::text, true, false, true, now()
+        FROM generate_series(1, :n) g
+    """), {"n": VACANCIES})
+    # Самые свежие вакансии уже отправлены пользователю USER_ID
+    await conn.execute(text("""
+        INSERT INTO user_vacancies (user_id, vacancy_id, notified, cover_sent, interested, created_at)
+        SELECT :user_id, g::text, true, false, true, now()
+        FROM generate_series(1, :sent) g
+        ON CONFLICT DO NOTHING
+    """), {"user_id": USER_ID, "sent": SENT_TO_USER})
+    await conn.execute(text("ANALYZE"))
+
+
+async def main():
+    await db.connect()
+
+    async with db.engine.connect() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+        await conn.execute(text("CREATE SCHEMA bench"))
+        # Таблицы явно создаются в bench (иначе create_all считает существующими
+        # таблицы из public и ничего не создает); public в search_path нужен
+        # только для операторов pg_trgm
+        await conn.execute(text("SET search_path TO bench, public"))
+        await conn.execution_options(schema_translate_map={None: 'bench'})
+        await conn.run_sync(Base.metadata.create_all)
+        await check_bench_tables(conn)
+
+        print(f"Заполняем {VACANCIES:,} вакансий...".replace(',', ' '))
+        await fill(conn)
+        await conn.commit()
+
+        try:
+            for title, sql in QUERIES.items():
+                result = await conn.execute(
+                    text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"),
+                    {"user_id": USER_ID}
+                )
+                print(f"\n=== {title} ===")
+                for row in result:
+                    print(row[0])
+        finally:
+            await conn.execute(text("DROP SCHEMA bench CASCADE"))
+            await conn.commit()
+
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Микробенчмарк ранжирования: оценка страницы вакансий для группы пользователей.
+
+Синтетические вакансии в формате HH API и профили с разными навыками.
+Печатает время разбора признаков, время оценки матрицы (пользователи x
+вакансии) и отбора top-k. БД, HH и Telegram не нужны.
+
+Запуск: python bench_ranking.py [пользователей] [вакансий]
+"""
+import sys
+import os
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.services.ranking import VacancyRanker, VacancyFeatures, RankingProfile
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+VACANCIES = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+ROUNDS = 50
+
+SKILLS = ['python', 'django', 'fastapi', 'postgresql', 'docker', 'kafka', 'redis', 'go', 'java', 'sql']
+EXPERIENCE = ['noExperience', 'between1And3', 'between3And6', 'moreThan6']
+
+
+def make_vacancy(i: int) -> dict:
+    skills = random.sample(SKILLS, 3)
+    salary_from = random.choice([None, 80_000, 150_000, 250_000])
+    return {
+        'id': str(90_000_000 + i),
+        'name': f"{skills[0].title()} разработчик",
+        'snippet': {'requirement': ' '.join(skills), 'responsibility': 'Разработка backend-сервисов'},
+        'salary': {'from': salary_from, 'to': None, 'currency': 'RUR'} if salary_from else None,
+        'experience': {'id': random.choice(EXPERIENCE)},
+        'area': {'id': random.choice(['1', '2'])},
+        'schedule': {'id': random.choice(['remote', 'fullDay'])},
+        'published_at': f"2026-10-{random.randint(10, 19)}T10:00:00+0300",
+    }
+
+
+def main():
+    random.seed(1)
+    vacancies = [make_vacancy(i) for i in range(VACANCIES)]
+    profiles = {
+        user_id: RankingProfile({
+            'profession': 'Python',
+            'experience': 'junior',
+            'area': 'Москва',
+            'salary_min': 150_000,
+            'skills': random.sample(SKILLS, 4),
+        })
+        for user_id in range(USERS)
+    }
+    candidates = {user_id: {v['id'] for v in vacancies} for user_id in profiles}
+    ranker = VacancyRanker(top_k=5)
+
+    print(f"Пользователей: {USERS}, вакансий на странице: {VACANCIES}")
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        VacancyFeatures(vacancies)
+    features_ms = (time.perf_counter() - started) / ROUNDS * 1000
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        ranker.score(vacancies, list(profiles.values()))
+    score_ms = (time.perf_counter() - started) / ROUNDS * 1000
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        ranker.select(vacancies, profiles, candidates)
+    select_ms = (time.perf_counter() - started) / ROUNDS * 1000
+
+    print(f"Разбор признаков:        {features_ms:8.2f} мс")
+    print(f"Матрица оценок:          {score_ms:8.2f} мс")
+    print(f"Оценка + отбор top-k:    {select_ms:8.2f} мс "
+          f"({select_ms * 1000 / (USERS * VACANCIES):.2f} мкс на пару пользователь-вакансия)")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,41 @@ from src.storage.database import db
 from src.handlers.messages import setup_message_handlers
 from src.handlers.callbacks import setup_callback_handlers
 from src.handlers.filters import setup_filter_handlers
+from src.handlers.inline import setup_inline_handlers
+from src.handlers.history import setup_history_handlers
 from src.core.scheduler import JobScheduler  # Импортируем планировщик
+from src.core.retention import RetentionJob
+from src.core.currency_rates import CurrencyRatesJob
+from src.core.listener import ChangeListener
+from src.core.webhook import run_webhook
+from src.core.update_processor import PerChatUpdateProcessor
+from src.services.write_behind import write_behind
+from src.services.prefetcher import prefetcher
+from src.services.cover_letter import cover_letter_service
+from src.services.inline_index import inline_index
+from src.services.dedup import duplicate_index
+from src.handlers.router import callback_router
 
 nest_asyncio.apply()
 logger = get_logger(__name__)
 
 
+class UnitOfWorkApplication(Application):
+    """Application, который обрабатывает каждый апдейт в одной сессии и транзакции БД"""
+
+    async def process_update(self, update):
+        async with db.session_scope():
+            await super().process_update(update)
+
+
+async def rollback_on_error(update, context):
+    """Откатывает транзакцию апдейта, если обработчик упал"""
+    logger.error(f"Ошибка обработки апдейта: {context.error}", exc_info=context.error)
+    session = db.current_session()
+    if session is not None:
+        await session.rollback()
+
+
 async def main():
     """Основная функция запуска бота"""
     # Загружаем конфигурацию
@@ -23,37 +52,95 @@ async def main():
         logger.error("Токен Telegram не найден! Проверьте configs/dev.env")
         return
 
+    if config.bot_mode == 'webhook' and not config.webhook_secret:
+        logger.error("Режим webhook без WEBHOOK_SECRET не запускается! Проверьте configs/dev.env")
+        return
+
     # 1. ПОДКЛЮЧАЕМСЯ К БД (создаем engine)
     await db.connect()
 
     # 2. СОЗДАЕМ ТАБЛИЦЫ (если их нет)
     await db.create_tables()
 
+    # Режим хранения фильтров документом: переносим старые строки user_filters
+    # и пересчитываем параметры HH у документов, сохраненных по старым правилам
+    if config.filter_storage == 'document':
+        from src.storage.repositories.filter_repo import filter_repo
+        async with db.session_scope() as session:
+            await filter_repo.migrate_from_rows(session)
+            await filter_repo.refresh_hh_params(session)
+
     logger.info("✅ База данных подключена")
 
+    # Курсы валют для нормализации зарплат при сохранении вакансий
+    currency_rates = CurrencyRatesJob(config)
+    await currency_rates.load()
+
+    # Индекс для inline-поиска: последние вакансии из БД, дальше пополняется при сохранении
+    await inline_index.load_recent()
+
+    # Индекс почти одинаковых вакансий восстанавливается из БД
+    await duplicate_index.load_recent(config.dedup_days)
+
     # 3. ЗАПУСКАЕМ БОТА
-    application = Application.builder().token(config.telegram_token).build()
+    application = (
+        Application.builder()
+        .token(config.telegram_token)
+        .application_class(UnitOfWorkApplication)
+        .concurrent_updates(PerChatUpdateProcessor(config.max_concurrent_updates))
+        .build()
+    )
 
     # Порядок регистрации обработчиков:
     setup_handlers(application)  # Команды
     setup_message_handlers(application)  # Текстовые сообщения
-    setup_callback_handlers(application)  # Callback-кнопки - ДО фильтров
-    setup_filter_handlers(application)  # Фильтры - ПОСЛЕ общих колбэков
+    setup_callback_handlers(application)  # Callback-кнопки: единый роутер
+    setup_filter_handlers(application)  # Фильтры: маршруты роутера
+    setup_history_handlers(application)  # История и избранное
+    setup_inline_handlers(application)  # Inline-поиск (@bot запрос)
+    application.add_error_handler(rollback_on_error)
+
+    # Отложенная запись действий пользователя (отметки показа вакансий)
+    await write_behind.start()
 
     # 4. ЗАПУСКАЕМ ПЛАНИРОВЩИК
-    scheduler = JobScheduler(application, config.check_interval)
+    scheduler = JobScheduler(application, config.check_interval, config.recheck_debounce,
+                             config.notify_max_per_check)
     await scheduler.start()
 
+    # Изменения фильтров из любого процесса: сброс кэша и внеочередная проверка
+    listener = ChangeListener(config, scheduler)
+    await listener.start()
+
+    # 5. ЗАПУСКАЕМ ОЧИСТКУ СТАРЫХ ДАННЫХ
+    retention = RetentionJob(config)
+    await retention.start()
+
+    # Обновление курсов валют и пересчет зарплат в рублях
+    await currency_rates.start()
+
     logger.info("🚀 Бот запущен с SQLAlchemy и планировщиком!")
 
     try:
-        await application.run_polling()
+        if config.bot_mode == 'webhook':
+            await run_webhook(application, config)
+        else:
+            await application.run_polling()
     except KeyboardInterrupt:
         logger.info("Бот остановлен по команде пользователя")
     except Exception as e:
         logger.error(f"Ошибка в работе бота: {e}")
     finally:
+        await listener.stop()
         await scheduler.stop()
+        await retention.stop()
+        await currency_rates.stop()
+        await prefetcher.stop()
+        cover_letter_service.stop()
+        await write_behind.stop()
+        logger.info(f"Метрики callback-маршрутов: {callback_router.stats()}")
+        logger.info(f"Индекс дубликатов: {duplicate_index.stats()}")
+        logger.info(f"Ожидание апдейтов в очереди: {application.update_processor.stats()}")
 
 
 def start_bot():
@@ -0,0 +1,100 @@
+import asyncio
+from src.core.logger import get_logger
+from src.services.hh_client import hh_client
+from src.storage.database import db
+from src.storage.repositories.currency_repo import currency_repo
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.salary import salary_normalizer, BASE_CURRENCY
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 1000
+
+
+class CurrencyRatesJob:
+    """Фоновое обновление курсов валют для нормализации зарплат.
+
+    Раз в refresh_interval секунд берет курсы из справочника HH, сохраняет
+    их в currency_rates и пересчитывает salary_min_rub/salary_max_rub у
+    вакансий в валютах, курс которых изменился, а также у вакансий, для
+    которых нормализованной зарплаты еще нет. Пересчет идет пачками по
+    BATCH_SIZE, каждая - одним проходом numpy и одним UPDATE.
+    """
+
+    def __init__(self, config):
+        self.interval = config.currency_refresh_interval
+        self.is_running = False
+        self.task = None
+
+    async def load(self):
+        """Курсы из БД - чтобы нормализация работала сразу после старта"""
+        async with db.session_scope() as session:
+            rates = await currency_repo.get_rates(session)
+        salary_normalizer.set_rates(rates)
+        logger.info(f"Загружено курсов валют: {len(rates)}")
+
+    async def start(self):
+        self.is_running = True
+        self.task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Обновление курсов валют запущено. Интервал: {self.interval} сек.")
+
+    async def stop(self):
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Обновление курсов валют остановлено")
+
+    async def _refresh_loop(self):
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Ошибка обновления курсов валют: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        """Обновить курсы и пересчитать затронутые зарплаты"""
+        rates = await hh_client.get_currency_rates()
+        if rates:
+            async with db.session_scope() as session:
+                await currency_repo.save_rates(session, rates)
+            changed = salary_normalizer.set_rates(rates) - {BASE_CURRENCY}
+        else:
+            changed = set()
+
+        updated = await self.renormalize(sorted(changed)) if changed else 0
+        updated += await self.renormalize(None)
+        logger.info(f"💱 Курсы валют: {len(salary_normalizer.rates)}, изменились: {sorted(changed)}, "
+                    f"пересчитано зарплат: {updated}")
+
+    async def renormalize(self, currencies) -> int:
+        """Пересчитать нормализованные зарплаты (currencies=None - только еще не посчитанные)"""
+        after_id = ''
+        total = 0
+
+        while True:
+            async with db.session_scope() as session:
+                rows = await vacancy_repo.get_salary_batch(session, after_id, BATCH_SIZE, currencies)
+                if not rows:
+                    return total
+
+                low, high = salary_normalizer.normalize_columns(
+                    [row.salary_from for row in rows], [row.salary_to for row in rows],
+                    [row.salary_currency for row in rows], [row.gross for row in rows],
+                    [row.period for row in rows]
+                )
+                await vacancy_repo.update_normalized_salaries(session, [
+                    {'hh_id': row.hh_id, 'salary_min_rub': salary_min, 'salary_max_rub': salary_max}
+                    for row, salary_min, salary_max in zip(
+                        rows, salary_normalizer.to_db(low), salary_normalizer.to_db(high)
+                    )
+                ])
+
+            total += len(rows)
+            after_id = rows[-1].hh_id
+            if len(rows) < BATCH_SIZE:
+                return total
@@ -0,0 +1,89 @@
+import asyncio
+import asyncpg
+from src.core.logger import get_logger
+from src.storage.database import FILTERS_CHANNEL, USERS_CHANNEL, EXCLUSIONS_CHANNEL
+from src.storage.repositories.filter_repo import filter_repo
+from src.services.exclusions import exclusions
+
+logger = get_logger(__name__)
+
+
+class ChangeListener:
+    """Слушает NOTIFY об изменениях фильтров, пользователей и исключений.
+
+    На изменение фильтров или пользователя сбрасывает локальный кэш фильтров
+    и просит планировщик перепроверить вакансии для него (с debounce). Новые
+    скрытые вакансии и работодатели дописываются в исключения в памяти.
+    Уведомления приходят от всех процессов бота, включая текущий.
+    """
+
+    def __init__(self, config, scheduler=None):
+        self.dsn = config.get_db_dsn()
+        self.scheduler = scheduler
+        self.is_running = False
+        self.task = None
+        self.connection = None
+
+    async def start(self):
+        self.is_running = True
+        self.task = asyncio.create_task(self._listen_loop())
+        logger.info(f"Слушатель изменений запущен: {FILTERS_CHANNEL}, {USERS_CHANNEL}, {EXCLUSIONS_CHANNEL}")
+
+    async def stop(self):
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Слушатель изменений остановлен")
+
+    async def _listen_loop(self):
+        """Держит LISTEN-соединение и переподключается при обрыве"""
+        while self.is_running:
+            try:
+                self.connection = await asyncpg.connect(self.dsn)
+                await self.connection.add_listener(FILTERS_CHANNEL, self._on_notification)
+                await self.connection.add_listener(USERS_CHANNEL, self._on_notification)
+                await self.connection.add_listener(EXCLUSIONS_CHANNEL, self._on_exclusion)
+
+                while not self.connection.is_closed():
+                    await asyncio.sleep(5)
+                logger.warning("LISTEN-соединение закрыто, переподключаемся")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка LISTEN-соединения: {e}")
+            finally:
+                if self.connection and not self.connection.is_closed():
+                    await self.connection.close()
+
+            await asyncio.sleep(5)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        """Обработчик NOTIFY (вызывается asyncpg синхронно)"""
+        try:
+            telegram_id = int(payload)
+        except ValueError:
+            logger.warning(f"Некорректное уведомление {channel}: {payload}")
+            return
+
+        logger.debug(f"Уведомление {channel} для {telegram_id}")
+        filter_repo.invalidate(telegram_id)
+
+        if self.scheduler:
+            self.scheduler.request_recheck(telegram_id)
+
+    def _on_exclusion(self, connection, pid, channel, payload):
+        """Обработчик NOTIFY о скрытой вакансии или заблокированном работодателе"""
+        try:
+            telegram_id, kind, value = payload.split(':', 2)
+            telegram_id = int(telegram_id)
+        except ValueError:
+            logger.warning(f"Некорректное уведомление {channel}: {payload}")
+            return
+
+        logger.debug(f"Уведомление {channel} для {telegram_id}: {kind} {value}")
+        exclusions.apply(telegram_id, kind, value)
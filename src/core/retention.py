@@ -0,0 +1,123 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.services.state_store import state_store
+
+logger = get_logger(__name__)
+
+# Ключи raw_data, которые остаются после урезания: хватает для format_vacancy_message,
+# а snippet и key_skills нужны сигнатурам дубликатов, ранжированию и search_vector
+RAW_DATA_KEEP_KEYS = [
+    'id', 'name', 'alternate_url', 'employer', 'salary', 'salary_range', 'area',
+    'experience', 'schedule', 'employment', 'published_at', 'snippet', 'key_skills'
+]
+BATCH_SIZE = 1000
+
+
+class RetentionJob:
+    """Фоновое обслуживание хранилища вакансий.
+
+    Раз в retention_interval секунд:
+    1. урезает raw_data у вакансий старше raw_data_ttl_days;
+    2. переносит вакансии старше archive_after_days (вместе со связями
+       user_vacancies) в сжатые помесячные файлы archive_dir/vacancies_ГГГГ_ММ.jsonl.gz
+       и удаляет их из БД (вакансии из избранного и скрытые остаются);
+    3. удаляет истекшие записи состояния диалогов.
+    """
+
+    def __init__(self, config):
+        self.raw_data_ttl_days = config.raw_data_ttl_days
+        self.archive_after_days = config.archive_after_days
+        self.archive_dir = Path(config.archive_dir)
+        self.interval = config.retention_interval
+        self.is_running = False
+        self.task = None
+
+    async def start(self):
+        self.is_running = True
+        self.task = asyncio.create_task(self._retention_loop())
+        logger.info(f"Очистка старых данных запущена. Интервал: {self.interval} сек.")
+
+    async def stop(self):
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Очистка старых данных остановлена")
+
+    async def _retention_loop(self):
+        # Не мешаем старту бота и первой проверке вакансий
+        await asyncio.sleep(300)
+
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Ошибка очистки старых данных: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        """Один проход обслуживания"""
+        stripped = await self.strip_raw_data()
+        archived = await self.archive_old_vacancies()
+        purged = await state_store.purge_expired()
+        logger.info(f"🧹 Урезано raw_data: {stripped}, архивировано вакансий: {archived}, "
+                    f"удалено истекших состояний: {purged}")
+
+    async def strip_raw_data(self) -> int:
+        """Урезает raw_data у старых вакансий пачками, каждая - в своей транзакции"""
+        older_than = datetime.now() - timedelta(days=self.raw_data_ttl_days)
+        total = 0
+
+        while True:
+            async with db.session_scope() as session:
+                count = await vacancy_repo.strip_raw_data(session, older_than, RAW_DATA_KEEP_KEYS, BATCH_SIZE)
+            total += count
+            if count < BATCH_SIZE:
+                return total
+
+    async def archive_old_vacancies(self) -> int:
+        """Архивирует старые вакансии по месяцам в сжатые файлы и удаляет их из БД"""
+        older_than = datetime.now() - timedelta(days=self.archive_after_days)
+        total = 0
+
+        async with db.session_scope() as session:
+            months = await vacancy_repo.get_archive_months(session, older_than)
+
+        for month_start in months:
+            month_end = (month_start + timedelta(days=32)).replace(day=1)
+            path = self.archive_dir / f"vacancies_{month_start:%Y_%m}.jsonl.gz"
+
+            while True:
+                # Удаление фиксируется только после успешной записи в архив
+                async with db.session_scope() as session:
+                    vacancies, user_vacancies = await vacancy_repo.pop_archive_batch(
+                        session, month_start, month_end, older_than, BATCH_SIZE
+                    )
+                    if vacancies:
+                        await asyncio.to_thread(self._write_archive, path, vacancies, user_vacancies)
+
+                total += len(vacancies)
+                if len(vacancies) < BATCH_SIZE:
+                    break
+
+            logger.info(f"📦 Месяц {month_start:%Y-%m} архивирован в {path}")
+
+        return total
+
+    def _write_archive(self, path: Path, vacancies: list, user_vacancies: list):
+        """Дописывает пачку в архив месяца (gzip допускает несколько сжатых блоков в файле)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in vacancies:
+                f.write(json.dumps({'table': 'vacancies', 'row': row}, ensure_ascii=False, default=str) + '\n')
+            for row in user_vacancies:
+                f.write(json.dumps({'table': 'user_vacancies', 'row': row}, ensure_ascii=False, default=str) + '\n')
@@ -1,21 +1,36 @@
 import asyncio
+from contextlib import asynccontextmanager, AsyncExitStack
 from src.core.logger import get_logger
 from src.storage.database import db
 from src.storage.repositories.user_repo import user_repo
 from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.storage.repositories.filter_repo import filter_repo
 from src.services.filter_service import filter_service
 from src.services.hh_client import hh_client
+from src.services.inline_index import inline_index
+from src.services.exclusions import exclusions
+from src.services.ranking import vacancy_ranker, RankingProfile
+from src.services.keyword_matcher import keyword_matcher
+from src.services.dedup import duplicate_index
 from src.handlers.notifications import send_vacancy_notification
 
 logger = get_logger(__name__)
 
+# Самые свежие вакансии за проверку (максимум HH): ключевые слова дофильтровываются локально
+SUBSCRIPTION_PAGE_SIZE = 100
+SEND_INTERVAL = 0.1  # Пауза между уведомлениями (лимиты Telegram на отправку)
+
 
 class JobScheduler:
-    def __init__(self, application, check_interval):
+    def __init__(self, application, check_interval, recheck_debounce: float = 10, max_per_check: int = 10):
         self.application = application
         self.is_running = False
         self.check_interval = check_interval
+        self.recheck_debounce = recheck_debounce
+        self.max_per_check = max_per_check
         self.task = None
+        self.pending_rechecks = {}  # {telegram_id: asyncio.Task}
+        self.user_locks = {}  # {telegram_id: [asyncio.Lock, число ожидающих]}
 
     async def start(self):
         self.is_running = True
@@ -24,6 +39,9 @@ class JobScheduler:
 
     async def stop(self):
         self.is_running = False
+        for task in self.pending_rechecks.values():
+            task.cancel()
+        self.pending_rechecks.clear()
         if self.task:
             self.task.cancel()
             try:
@@ -32,6 +50,61 @@ class JobScheduler:
                 pass
         logger.info("Планировщик остановлен")
 
+    def request_recheck(self, telegram_id: int):
+        """Запланировать внеочередную проверку для пользователя.
+
+        Повторные запросы в течение recheck_debounce секунд откладывают
+        проверку, поэтому серия изменений фильтров дает одну проверку.
+        """
+        if not self.is_running:
+            return
+
+        task = self.pending_rechecks.pop(telegram_id, None)
+        if task:
+            task.cancel()
+        self.pending_rechecks[telegram_id] = asyncio.create_task(self._delayed_recheck(telegram_id))
+
+    async def _delayed_recheck(self, telegram_id: int):
+        await asyncio.sleep(self.recheck_debounce)
+
+        # Проверка уже началась - новые запросы ее не отменяют
+        if self.pending_rechecks.get(telegram_id) is asyncio.current_task():
+            del self.pending_rechecks[telegram_id]
+
+        try:
+            # NOTIFY об изменении фильтров получают все процессы бота - проверку делает один.
+            # Ключ -telegram_id, чтобы не пересекаться с блокировкой данных пользователя
+            async with db.advisory_locks([-telegram_id], wait=False) as acquired:
+                if not acquired:
+                    logger.debug(f"Внеочередная проверка для {telegram_id} уже идет в другом процессе")
+                    return
+                logger.info(f"Внеочередная проверка вакансий для пользователя {telegram_id}")
+                await self.check_vacancies_for_user(telegram_id)
+        except Exception as e:
+            logger.error(f"Ошибка внеочередной проверки для пользователя {telegram_id}: {e}")
+
+    @asynccontextmanager
+    async def _users_locked(self, telegram_ids: list):
+        """Исключительный доступ к отметкам пользователей: от чтения отправленных до коммита новых.
+
+        Внутри процесса - asyncio.Lock на пользователя (периодическая и
+        внеочередная проверки не пересекаются), между процессами -
+        advisory-блокировки PostgreSQL. Берутся по возрастанию telegram_id.
+        """
+        async with AsyncExitStack() as stack:
+            for telegram_id in sorted(set(telegram_ids)):
+                entry = self.user_locks.setdefault(telegram_id, [asyncio.Lock(), 0])
+                entry[1] += 1
+                stack.callback(self._release_user_lock, telegram_id, entry)
+                await stack.enter_async_context(entry[0])
+            await stack.enter_async_context(db.advisory_locks(telegram_ids))
+            yield
+
+    def _release_user_lock(self, telegram_id: int, entry: list):
+        entry[1] -= 1
+        if not entry[1]:
+            del self.user_locks[telegram_id]
+
     async def _scheduler_loop(self):
         # Первая проверка через 30 секунд после старта
         await asyncio.sleep(30)
@@ -47,23 +120,27 @@ class JobScheduler:
         """Проверка новых вакансий для всех активных пользователей"""
         logger.info("🔄 Запуск периодической проверки новых вакансий")
 
-        # Получаем всех активных пользователей
-        async for session in db.get_session():
+        # Получаем всех активных пользователей и группируем одинаковые запросы
+        async with db.session_scope() as session:
             users = await user_repo.get_active_users(session)
+            groups = await filter_repo.get_subscription_groups(session, [user.telegram_id for user in users])
 
-            if not users:
-                logger.info("Нет активных пользователей для проверки")
-                return
+        if not users:
+            logger.info("Нет активных пользователей для проверки")
+            return
+
+        logger.info(f"Проверяем вакансии для {len(users)} активных пользователей "
+                    f"({len(groups)} уникальных запросов)")
 
-            logger.info(f"Проверяем вакансии для {len(users)} активных пользователей")
+        for params, telegram_ids in groups:
+            try:
+                await self.check_vacancies_for_group(params, telegram_ids)
+                # Пауза между запросами к HH
+                await asyncio.sleep(2)
+            except Exception as e:
+                logger.error(f"Ошибка при проверке вакансий для пользователей {telegram_ids}: {e}")
 
-            for user in users:
-                try:
-                    await self.check_vacancies_for_user(user.telegram_id)
-                    # Пауза между запросами для разных пользователей
-                    await asyncio.sleep(2)
-                except Exception as e:
-                    logger.error(f"Ошибка при проверке вакансий для пользователя {user.telegram_id}: {e}")
+        logger.info(f"Кэш фильтров: {filter_repo.cache_stats()}")
 
     async def check_vacancies_for_user(self, telegram_id: int):
         """Проверка новых вакансий для конкретного пользователя"""
@@ -76,62 +153,116 @@ class JobScheduler:
             return
 
         # 2. Преобразуем фильтры в параметры HH API
-        params = await filter_service.to_hh_params(filters)
-        # Добавим базовые параметры
-        params.update({
-            'per_page': 20,  # Первые 20 самых свежих вакансий
+        params = await filter_service.to_hh_params(filters, include_keywords=False)
+        await self.check_vacancies_for_group(params, [telegram_id])
+
+    async def check_vacancies_for_group(self, user_params: dict, telegram_ids: list):
+        """Один поиск на HH для группы пользователей с одинаковыми параметрами"""
+        # Базовые параметры; параметры пользователя (в том числе search_field) важнее
+        params = {
+            'per_page': SUBSCRIPTION_PAGE_SIZE,
             'order_by': 'publication_time',
             'search_field': 'name'
-        })
+        }
+        params.update(user_params)
 
-        # 3. Ищем вакансии
+        # Ищем вакансии
         try:
             vacancies = await hh_client.search_vacancies(**params)
         except Exception as e:
-            logger.error(f"Ошибка при поиске вакансий для пользователя {telegram_id}: {e}")
+            logger.error(f"Ошибка при поиске вакансий для пользователей {telegram_ids}: {e}")
             return
 
         if not vacancies:
-            logger.debug(f"Для пользователя {telegram_id} не найдено новых вакансий")
+            logger.debug(f"Для пользователей {telegram_ids} не найдено новых вакансий")
             return
 
-        logger.info(f"Для пользователя {telegram_id} найдено {len(vacancies)} вакансий")
+        logger.info(f"Для пользователей {telegram_ids} найдено {len(vacancies)} вакансий")
+
+        vacancies = [v for v in vacancies if v.get('id')]
+        inline_index.add(vacancies)
 
-        # 4. Обрабатываем каждую вакансию
-        new_vacancies_count = 0
-        for vacancy_data in vacancies:
-            if await self.process_vacancy_for_user(telegram_id, vacancy_data):
-                new_vacancies_count += 1
+        # HH отобрал вакансии с любым из ключевых слов (с учетом морфологии); здесь - ключевые
+        # слова целиком и слова-исключения в названии, фрагментах описания и навыках,
+        # один проход по тексту вакансии для всей группы
+        user_filters = {
+            telegram_id: await filter_service.get_user_filters(telegram_id) or {}
+            for telegram_id in telegram_ids
+        }
+        for telegram_id, filters in user_filters.items():
+            keyword_matcher.set_user(telegram_id, filters)
+        accepted = {str(v['id']): keyword_matcher.accepts(v, telegram_ids) for v in vacancies}
 
-        if new_vacancies_count:
-            logger.info(f"Отправлено {new_vacancies_count} новых вакансий пользователю {telegram_id}")
+        # Скрытые вакансии и заблокированных работодателей отсекаем в памяти - до записи в БД
+        user_exclusions = await exclusions.get_many(telegram_ids)
+        wanted = {
+            telegram_id: [
+                v for v in exclusions.filter(user_exclusions[telegram_id], vacancies)
+                if telegram_id in accepted[str(v['id'])]
+            ]
+            for telegram_id in telegram_ids
+        }
+        wanted_ids = {str(v['id']) for user_vacancies in wanted.values() for v in user_vacancies}
+        vacancies = [v for v in vacancies if str(v['id']) in wanted_ids]
+        if not vacancies:
+            logger.debug(f"Все найденные вакансии скрыты или отсеяны пользователями {telegram_ids}")
+            return
 
-    async def process_vacancy_for_user(self, telegram_id: int, vacancy_data: dict) -> bool:
-        """Обработка вакансии для пользователя: сохранение и отправка уведомления, если новая"""
-        vacancy_id = str(vacancy_data.get('id', ''))
+        # Перепубликации одной вакансии (новый ID, другой город) сводим к одному каноническому ID
+        canonical = duplicate_index.canonical_ids(vacancies)
 
-        if not vacancy_id:
-            return False
+        # Одна короткая транзакция на страницу: проверяем, что уже отправляли, сохраняем и отмечаем.
+        # Под блокировкой пользователей - параллельная проверка не прочитает отметки до нашего коммита.
+        # Сообщения в Telegram уходят после коммита - соединение БД не держится на время отправки
+        async with self._users_locked(telegram_ids), db.session_scope() as session:
+            notified = await vacancy_repo.get_notified_pairs(session, telegram_ids, list(wanted_ids))
+            seen_groups = await vacancy_repo.get_notified_canonical(session, telegram_ids, list(canonical.values()))
 
-        async for session in db.get_session():
-            try:
-                # Проверяем, отправляли ли уже эту вакансию пользователю
-                user_vacancy = await vacancy_repo.get_user_vacancy(session, telegram_id, vacancy_id)
-                if user_vacancy and user_vacancy.notified:
-                    # Уже отправляли
-                    return False
+            # Кандидаты - еще не отправленные, причем ни в каком варианте; из них отправляем лучшие
+            candidates = {}
+            for telegram_id in telegram_ids:
+                groups = set()
+                candidates[telegram_id] = set()
+                for v in wanted[telegram_id]:
+                    vacancy_id = str(v['id'])
+                    group = canonical[vacancy_id]
+                    if (telegram_id, vacancy_id) in notified or (telegram_id, group) in seen_groups or group in groups:
+                        continue
+                    groups.add(group)
+                    candidates[telegram_id].add(vacancy_id)
 
-                # Сохраняем вакансию в БД
-                vacancy = await vacancy_repo.save_vacancy(session, vacancy_data)
+            # Дубликаты, которые никому не уйдут, в БД не пишем
+            needed = set().union(*candidates.values())
+            vacancies = [v for v in vacancies if str(v['id']) in needed or canonical[str(v['id'])] == str(v['id'])]
+            await vacancy_repo.save_vacancies(session, vacancies, canonical)
 
-                # Отправляем уведомление
-                await send_vacancy_notification(self.application.bot, telegram_id, vacancy_data)
+            profiles = {telegram_id: RankingProfile(user_filters[telegram_id]) for telegram_id in telegram_ids}
+            selected = vacancy_ranker.select(vacancies, profiles, candidates)
+            # Не больше max_per_check за проверку: не отмеченные останутся кандидатами в следующий раз
+            selected = {telegram_id: found[:self.max_per_check] for telegram_id, found in selected.items()}
 
-                # Отмечаем как отправленную
-                await vacancy_repo.mark_as_notified(session, telegram_id, vacancy_id)
-                logger.info(f"📨 Отправлена новая вакансия {vacancy_id} пользователю {telegram_id}")
-                return True
+            # Отмечаем выбранные до отправки одним запросом на пользователя
+            for telegram_id in telegram_ids:
+                await vacancy_repo.mark_as_notified_many(
+                    session, telegram_id, [str(v['id']) for v in selected[telegram_id]]
+                )
 
-            except Exception as e:
-                logger.error(f"Ошибка обработки вакансии {vacancy_id} для {telegram_id}: {e}")
-                return False
+        failed = {}
+        for telegram_id in telegram_ids:
+            for vacancy_data in selected[telegram_id]:
+                if await send_vacancy_notification(self.application.bot, telegram_id, vacancy_data):
+                    logger.info(f"📨 Отправлена новая вакансия {vacancy_data['id']} пользователю {telegram_id}")
+                else:
+                    failed.setdefault(telegram_id, []).append(str(vacancy_data['id']))
+                await asyncio.sleep(SEND_INTERVAL)
+
+            if selected[telegram_id]:
+                sent = len(selected[telegram_id]) - len(failed.get(telegram_id, []))
+                logger.info(f"Отправлено {sent} из {len(candidates[telegram_id])} "
+                            f"новых вакансий пользователю {telegram_id}")
+
+        # Неотправленные снова становятся кандидатами следующей проверки
+        if failed:
+            async with self._users_locked(list(failed)), db.session_scope() as session:
+                for telegram_id, vacancy_ids in failed.items():
+                    await vacancy_repo.unmark_notified(session, telegram_id, vacancy_ids)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SLOW_WAIT_MS = 1000  # Дольше ждал в очереди - пишем предупреждение
+WAIT_WINDOW = 1000  # Сколько последних ожиданий держим для перцентилей
+MAX_PENDING_UPDATES = 10000  # Принятых апдейтов, включая ждущих очереди своего чата
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Параллельная обработка апдейтов с сохранением порядка внутри чата.
+
+    Апдейты одного чата обрабатываются строго по очереди, разных чатов -
+    одновременно, но не больше max_concurrent_updates. Сначала апдейт ждет
+    очередь своего чата и только потом занимает место в общем лимите, поэтому
+    медленный поиск или серия нажатий одного пользователя не задерживает
+    остальных, а диалоги вида "жду ввод фильтра" не перемешиваются.
+
+    Лимит BaseUpdateProcessor.process_update (max_pending) ограничивает лишь
+    число принятых апдейтов, включая ждущих очереди чата. Для каждого апдейта
+    замеряется ожидание от поступления до начала обработки.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_pending: int = MAX_PENDING_UPDATES):
+        super().__init__(max(max_pending, max_concurrent_updates))
+        self.slots = asyncio.Semaphore(max_concurrent_updates)
+        self.chat_locks = {}  # {chat_id: [asyncio.Lock, число ожидающих]}
+        self.in_progress = 0
+        self.waits = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.recent_waits = deque(maxlen=WAIT_WINDOW)
+
+    async def do_process_update(self, update, coroutine):
+        queued_at = time.perf_counter()
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            await self._run(queued_at, coroutine)
+            return
+
+        entry = self.chat_locks.setdefault(chat_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._run(queued_at, coroutine)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.chat_locks[chat_id]
+
+    async def _run(self, queued_at: float, coroutine):
+        """Занять место в общем лимите и обработать апдейт"""
+        async with self.slots:
+            self._record_wait(queued_at)
+            self.in_progress += 1
+            try:
+                await coroutine
+            finally:
+                self.in_progress -= 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    @staticmethod
+    def _chat_id(update):
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    def _record_wait(self, queued_at: float):
+        wait_ms = (time.perf_counter() - queued_at) * 1000
+        self.waits += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.recent_waits.append(wait_ms)
+        if wait_ms > SLOW_WAIT_MS:
+            logger.warning(f"Апдейт ждал обработки {wait_ms:.0f} мс")
+
+    def stats(self) -> dict:
+        """Ожидание апдейтов в очереди: среднее, p95 по последним, максимум"""
+        recent = sorted(self.recent_waits)
+        return {
+            'updates': self.waits,
+            'in_progress': self.in_progress,
+            'chats_waiting': len(self.chat_locks),
+            'avg_wait_ms': round(self.total_wait_ms / self.waits, 1) if self.waits else 0.0,
+            'p95_wait_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else 0.0,
+            'max_wait_ms': round(self.max_wait_ms, 1)
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import hmac
+import signal
+from aiohttp import web
+from telegram import Update
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """Прием апдейтов Telegram через webhook на локальном aiohttp-сервере.
+
+    Каждый POST проверяется по секретному токену (WEBHOOK_SECRET обязателен),
+    и для апдейта сразу создается задача обработки через процессор
+    приложения: там общий лимит параллельности и порядок внутри чата, так
+    что медленный чат не задерживает остальные. Принятых, но еще не обработанных апдейтов не
+    больше max_pending: сверх этого сервер отвечает 503, и Telegram
+    повторит доставку позже.
+    """
+
+    def __init__(self, application, config):
+        # Адрес webhook публичный: без секрета любой POST сошел бы за апдейт Telegram
+        if not config.webhook_secret:
+            raise ValueError("Режим webhook требует WEBHOOK_SECRET")
+        self.application = application
+        self.host = config.webhook_host
+        self.port = config.webhook_port
+        self.path = config.webhook_path
+        self.url = config.webhook_url
+        self.secret = config.webhook_secret
+        self.max_pending = config.webhook_queue_size
+        self.tasks = set()
+        self.runner = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+    async def start(self):
+        self.runner = web.AppRunner(self.make_app())
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+        # Без публичного URL сервер работает локально (например, для тестовых POST)
+        if self.url:
+            await self.application.bot.set_webhook(
+                url=self.url + self.path,
+                secret_token=self.secret,
+                allowed_updates=Update.ALL_TYPES
+            )
+        logger.info(f"Webhook-сервер слушает {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Остановить прием и дождаться обработки принятых апдейтов"""
+        if self.runner:
+            await self.runner.cleanup()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        logger.info("Webhook-сервер остановлен")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """POST от Telegram: проверка токена, разбор апдейта, запуск обработки"""
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), self.secret):
+            logger.warning(f"Webhook: неверный секретный токен от {request.remote}")
+            return web.Response(status=403)
+
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            logger.warning(f"Webhook: некорректный апдейт: {e}")
+            return web.Response(status=400)
+
+        if len(self.tasks) >= self.max_pending:
+            logger.warning(f"Webhook: {len(self.tasks)} апдейтов в обработке, апдейт {update.update_id} отклонен")
+            return web.Response(status=503)
+
+        task = asyncio.create_task(self._process(update))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: Update):
+        try:
+            # Через процессор приложения: общий лимит параллельности, порядок в чате и метрики ожидания
+            await self.application.update_processor.process_update(
+                update, self.application.process_update(update)
+            )
+        except Exception as e:
+            logger.error(f"Webhook: ошибка обработки апдейта {update.update_id}: {e}")
+
+
+async def run_webhook(application, config):
+    """Работа бота через webhook до SIGINT/SIGTERM"""
+    server = WebhookServer(application, config)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    async with application:
+        await application.start()
+        await server.start()
+        try:
+            await stop_event.wait()
+        finally:
+            await server.stop()
+            await application.stop()
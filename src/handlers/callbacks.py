@@ -1,201 +1,226 @@
 from telegram import Update
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes
 from src.core.logger import get_logger
-from src.utils.keyboards import get_main_keyboard, get_vacancy_keyboard, get_cover_letter_keyboard
-from src.services.hh_client import hh_client
+from src.utils.keyboards import (
+    get_main_keyboard, get_vacancy_keyboard, get_cover_letter_keyboard, get_hidden_vacancy_keyboard
+)
+from src.services.search_sessions import search_sessions
+from src.services.prefetcher import prefetcher
+from src.services.write_behind import write_behind
+from src.services.exclusions import exclusions
+from src.services.cover_letter import cover_letter_service
+from src.handlers.router import callback_router
 from src.storage.database import db
 from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.callback_data import Route
 
 logger = get_logger(__name__)
 
 
-async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработка нажатий inline-кнопок"""
+async def handle_next(update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str):
+    """Переход к следующей вакансии"""
     query = update.callback_query
-    await query.answer()  # Убираем "часики"
-
-    data = query.data
-    user_id = query.from_user.id
-
-    logger.info(f"Обработка callback: {data} от {user_id}")
-
-    # Навигация по вакансиям
-    if data.startswith("next_"):
-        try:
-            next_index = int(data.replace("next_", ""))
-            logger.info(f"Переход к следующей вакансии: индекс {next_index}")
-
-            # Получаем вакансии из контекста
-            vacancies = context.user_data.get('search_results', [])
-
-            if not vacancies:
-                await query.edit_message_text(
-                    "❌ Нет данных о вакансиях. Начните поиск заново.",
-                    reply_markup=get_main_keyboard()
-                )
-                return
-
-            if next_index >= len(vacancies):
-                await query.edit_message_text(
-                    "✅ Это последняя вакансия в списке!",
-                    reply_markup=get_vacancy_keyboard(
-                        vacancies[-1].get('id', ''),
-                        len(vacancies) - 1,
-                        len(vacancies)
-                    )
-                )
-                return
+    try:
+        next_index = int(arg)
+        logger.info(f"Переход к следующей вакансии: индекс {next_index}")
 
-            # Отправляем следующую вакансию
-            await send_vacancy_message(update, context, next_index, query)
+        # Получаем сессию поиска
+        search = await search_sessions.get_active(update.effective_user.id)
 
-        except Exception as e:
-            logger.error(f"Ошибка навигации next: {e}", exc_info=True)
+        if not search or not len(search):
             await query.edit_message_text(
-                "❌ Ошибка при переходе к следующей вакансии",
+                "❌ Нет данных о вакансиях. Начните поиск заново.",
                 reply_markup=get_main_keyboard()
             )
+            return
 
-    elif data.startswith("prev_"):
-        try:
-            prev_index = int(data.replace("prev_", ""))
-            logger.info(f"Переход к предыдущей вакансии: индекс {prev_index}")
+        # Следующая страница результатов подгружается только сейчас
+        if not await search_sessions.ensure_loaded(search, next_index):
+            await query.edit_message_text(
+                "✅ Это последняя вакансия в списке!",
+                reply_markup=get_vacancy_keyboard(
+                    search.vacancy_id(len(search) - 1),
+                    len(search) - 1,
+                    len(search)
+                )
+            )
+            return
 
-            vacancies = context.user_data.get('search_results', [])
+        # Отправляем следующую вакансию
+        await send_vacancy_message(update, context, next_index, query)
 
-            if not vacancies:
-                await query.edit_message_text(
-                    "❌ Нет данных о вакансиях. Начните поиск заново.",
-                    reply_markup=get_main_keyboard()
-                )
-                return
-
-            if prev_index < 0:
-                await query.edit_message_text(
-                    "✅ Это первая вакансия в списке!",
-                    reply_markup=get_vacancy_keyboard(
-                        vacancies[0].get('id', ''),
-                        0,
-                        len(vacancies)
-                    )
-                )
-                return
+    except Exception as e:
+        logger.error(f"Ошибка навигации next: {e}", exc_info=True)
+        await query.edit_message_text(
+            "❌ Ошибка при переходе к следующей вакансии",
+            reply_markup=get_main_keyboard()
+        )
+
+
+async def handle_prev(update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str):
+    """Переход к предыдущей вакансии"""
+    query = update.callback_query
+    try:
+        prev_index = int(arg)
+        logger.info(f"Переход к предыдущей вакансии: индекс {prev_index}")
 
-            # Отправляем предыдущую вакансию
-            await send_vacancy_message(update, context, prev_index, query)
+        search = await search_sessions.get_active(update.effective_user.id)
 
-        except Exception as e:
-            logger.error(f"Ошибка навигации prev: {e}", exc_info=True)
+        if not search or not len(search):
             await query.edit_message_text(
-                "❌ Ошибка при переходе к предыдущей вакансии",
+                "❌ Нет данных о вакансиях. Начните поиск заново.",
                 reply_markup=get_main_keyboard()
             )
+            return
 
-    # Действия с вакансиями
-    elif data.startswith("save_"):
-        vacancy_id = data.replace("save_", "")
-        logger.info(f"Сохранение вакансии в избранное: {vacancy_id}")
+        if prev_index < 0:
+            await query.edit_message_text(
+                "✅ Это первая вакансия в списке!",
+                reply_markup=get_vacancy_keyboard(
+                    search.vacancy_id(0),
+                    0,
+                    max(search.total, len(search))
+                )
+            )
+            return
+
+        # Отправляем предыдущую вакансию
+        await send_vacancy_message(update, context, prev_index, query)
 
+    except Exception as e:
+        logger.error(f"Ошибка навигации prev: {e}", exc_info=True)
         await query.edit_message_text(
-            f"💾 Вакансия сохранена в избранное!\n"
-            f"ID: {vacancy_id}\n\n"
-            "Вы можете найти ее в истории поиска.",
+            "❌ Ошибка при переходе к предыдущей вакансии",
             reply_markup=get_main_keyboard()
         )
 
-    elif data.startswith("hide_"):
-        vacancy_id = data.replace("hide_", "")
-        logger.info(f"Скрытие вакансии: {vacancy_id}")
 
-        # Здесь можно добавить логику скрытия вакансии
-        await query.edit_message_text(
-            f"👎 Больше не покажу эту вакансию.\n"
-            f"ID: {vacancy_id}",
-            reply_markup=get_main_keyboard()
-        )
+async def handle_page_info(update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str):
+    """Нажатие на номер страницы"""
+    # Просто показываем всплывающее сообщение
+    await update.callback_query.answer("Текущая страница", show_alert=False)
 
-    elif data.startswith("cover_"):
-        vacancy_id = data.replace("cover_", "")
-        logger.info(f"Создание письма для вакансии: {vacancy_id}")
 
-        await query.edit_message_text(
-            f"📝 Создание сопроводительного письма\n\n"
-            f"Вакансия: {vacancy_id}\n\n"
-            "Выберите действие:",
-            reply_markup=get_cover_letter_keyboard(vacancy_id)
-        )
+async def handle_save(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Сохранение вакансии в избранное"""
+    logger.info(f"Сохранение вакансии в избранное: {vacancy_id}")
 
-    elif data.startswith("gen_cover_"):
-        vacancy_id = data.replace("gen_cover_", "")
-        logger.info(f"Генерация письма для вакансии: {vacancy_id}")
+    async with db.session_scope() as session:
+        await vacancy_repo.set_user_flags(session, update.effective_user.id, vacancy_id, saved=True)
+
+    # Вакансия остается на экране - листание продолжается
+    await update.callback_query.answer("💾 Сохранено! Список - в «📋 История поиска» → «⭐ Избранное»")
+
+
+async def handle_hide(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Вакансия не интересна"""
+    logger.info(f"Скрытие вакансии: {vacancy_id}")
+    await _hide_vacancy(update, vacancy_id, "👎 Больше не покажу эту вакансию.")
 
-        await query.edit_message_text(
-            f"🤖 Генерирую сопроводительное письмо...\n\n"
-            "Эта функция будет доступна в следующем обновлении!",
-            reply_markup=get_main_keyboard()
-        )
 
-    elif data.startswith("back_to_"):
-        vacancy_id = data.replace("back_to_", "")
-        logger.info(f"Возврат к вакансии: {vacancy_id}")
+async def handle_ignore(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Скрытие вакансии"""
+    logger.info(f"Игнорирование вакансии: {vacancy_id}")
+    await _hide_vacancy(update, vacancy_id, "❌ Вакансия скрыта.")
 
-        # Находим индекс вакансии в списке
-        vacancies = context.user_data.get('search_results', [])
-        index = 0
-        for i, v in enumerate(vacancies):
-            if v.get('id') == vacancy_id:
-                index = i
-                break
 
-        await send_vacancy_message(update, context, index, query)
+async def _hide_vacancy(update: Update, vacancy_id: str, text: str):
+    """Скрыть вакансию и предложить скрыть работодателя или листать дальше"""
+    user_id = update.effective_user.id
+    await exclusions.hide_vacancy(user_id, vacancy_id)
+
+    # Если вакансия из текущего поиска - даем перейти к следующей
+    next_index = None
+    search = await search_sessions.get_active(user_id)
+    if search and len(search):
+        index = search.index_of(vacancy_id)
+        if search.vacancy_id(index) == str(vacancy_id):
+            next_index = index + 1
+
+    await update.callback_query.edit_message_text(
+        f"{text}\nID: {vacancy_id}",
+        reply_markup=get_hidden_vacancy_keyboard(vacancy_id, next_index)
+    )
+
+
+async def handle_block_employer(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Больше не присылать вакансии работодателя"""
+    query = update.callback_query
+    logger.info(f"Блокировка работодателя вакансии: {vacancy_id}")
+
+    employer_name = await exclusions.block_employer(update.effective_user.id, vacancy_id)
+    if employer_name is None:
+        await query.answer("❌ Не удалось определить работодателя", show_alert=True)
+        return
 
-    elif data == "page_info":
-        # Просто обновляем всплывающее сообщение
-        await query.answer("Текущая страница", show_alert=False)
+    await query.answer(f"🚫 Вакансии «{employer_name}» больше не придут")
 
-    elif data == "ignore_":
-        vacancy_id = data.replace("ignore_", "")
-        logger.info(f"Игнорирование вакансии: {vacancy_id}")
 
+async def handle_cover(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Меню сопроводительного письма"""
+    logger.info(f"Создание письма для вакансии: {vacancy_id}")
+
+    await update.callback_query.edit_message_text(
+        f"📝 Создание сопроводительного письма\n\n"
+        f"Вакансия: {vacancy_id}\n\n"
+        "Выберите действие:",
+        reply_markup=get_cover_letter_keyboard(vacancy_id)
+    )
+
+
+async def handle_gen_cover(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Генерация сопроводительного письма"""
+    query = update.callback_query
+    logger.info(f"Генерация письма для вакансии: {vacancy_id}")
+
+    letter = await cover_letter_service.generate(update.effective_user.id, vacancy_id)
+    if letter is None:
         await query.edit_message_text(
-            f"❌ Вакансия скрыта.\n"
-            f"ID: {vacancy_id}",
-            reply_markup=get_main_keyboard()
+            "❌ Не удалось получить данные вакансии. Попробуйте позже.",
+            reply_markup=get_cover_letter_keyboard(vacancy_id)
         )
+        return
+
+    await query.edit_message_text(
+        f"📝 Сопроводительное письмо\n\n{letter}",
+        reply_markup=get_cover_letter_keyboard(vacancy_id)
+    )
+
+
+async def handle_back_to_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: str):
+    """Возврат к вакансии из меню письма"""
+    logger.info(f"Возврат к вакансии: {vacancy_id}")
 
-    else:
-        logger.warning(f"Неизвестный callback: {data}")
-        await query.answer("Команда не распознана")
+    # Находим индекс вакансии в сессии поиска
+    search = await search_sessions.get_active(update.effective_user.id)
+    index = search.index_of(vacancy_id) if search else 0
+
+    await send_vacancy_message(update, context, index, update.callback_query)
 
 
 async def send_vacancy_message(update: Update, context: ContextTypes.DEFAULT_TYPE,
                                index: int, query=None):
     """Вспомогательная функция для отправки вакансии с кнопками"""
-    vacancies = context.user_data.get('search_results', [])
+    search = await search_sessions.get_active(update.effective_user.id)
+    rendered = await prefetcher.get(search, index) if search else None
 
-    if index < 0 or index >= len(vacancies):
-        logger.error(f"Индекс {index} вне диапазона (0-{len(vacancies) - 1})")
+    if not rendered:
+        logger.error(f"Вакансия с индексом {index} не найдена в сессии поиска")
         return
 
-    vacancy_data = vacancies[index]
-    vacancy_id = vacancy_data.get('id', '')
+    vacancy_id, message = rendered
 
     try:
-        # Сохраняем в БД
-        async for session in db.get_session():
-            await vacancy_repo.save_vacancy(session, vacancy_data)
-            await vacancy_repo.mark_as_notified(session, update.effective_user.id, vacancy_id)
-
-        logger.info(f"Отправка вакансии {index + 1}/{len(vacancies)}: {vacancy_id}")
+        # Вакансия уже сохранена при загрузке страницы - показ отметится отложенно
+        await write_behind.mark_notified(update.effective_user.id, vacancy_id)
 
-        # Форматируем сообщение
-        message = hh_client.format_vacancy_message(vacancy_data)
+        logger.info(f"Отправка вакансии {index + 1}/{search.total}: {vacancy_id}")
 
         # Создаем inline-клавиатуру
         keyboard = get_vacancy_keyboard(
             vacancy_id=vacancy_id,
             page=index,
-            total=len(vacancies)
+            total=max(search.total, len(search))
         )
 
         # Обновляем сообщение
@@ -218,6 +243,9 @@ async def send_vacancy_message(update: Update, context: ContextTypes.DEFAULT_TYP
         # Обновляем индекс
         context.user_data['current_vacancy_index'] = index
 
+        # Пока пользователь читает, готовим следующие вакансии
+        prefetcher.schedule(search, index)
+
     except Exception as e:
         logger.error(f"Ошибка отправки вакансии: {e}", exc_info=True)
         error_msg = "⚠️ Ошибка при обработке вакансии"
@@ -229,5 +257,16 @@ async def send_vacancy_message(update: Update, context: ContextTypes.DEFAULT_TYP
 
 def setup_callback_handlers(application):
     """Регистрация обработчиков callback-кнопок"""
-    # Регистрируем общий обработчик для всех callback
-    application.add_handler(CallbackQueryHandler(handle_callback_query))
\ No newline at end of file
+    callback_router.add(Route.NEXT, handle_next)
+    callback_router.add(Route.PREV, handle_prev)
+    callback_router.add(Route.PAGE_INFO, handle_page_info, answer=False)
+    callback_router.add(Route.SAVE, handle_save, answer=False)
+    callback_router.add(Route.HIDE, handle_hide)
+    callback_router.add(Route.IGNORE, handle_ignore)
+    callback_router.add(Route.BLOCK_EMPLOYER, handle_block_employer, answer=False)
+    callback_router.add(Route.COVER, handle_cover)
+    callback_router.add(Route.GEN_COVER, handle_gen_cover)
+    callback_router.add(Route.BACK_TO_VACANCY, handle_back_to_vacancy)
+
+    # Один обработчик на все inline-кнопки: маршрут выбирается по таблице
+    application.add_handler(callback_router.handler())
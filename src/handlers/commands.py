@@ -4,9 +4,10 @@ from src.core.logger import get_logger
 from src.utils.keyboards import get_main_keyboard
 from src.storage.database import db
 from src.storage.repositories.user_repo import user_repo
-from src.storage.repositories.vacancy_repo import vacancy_repo
 from src.storage.repositories.filter_repo import filter_repo
-from src.services.hh_client import hh_client
+from src.services.search_sessions import search_sessions
+from src.services.prefetcher import prefetcher
+from src.services.write_behind import write_behind
 
 logger = get_logger(__name__)
 
@@ -59,7 +60,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
 
     # Регистрируем пользователя
-    async for session in db.get_session():
+    async with db.session_scope() as session:
         db_user = await user_repo.get_or_create(
             session,
             telegram_id=user.id,
@@ -109,28 +110,29 @@ async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # 4. Добавляем общие параметры
     params.update({
-        'per_page': 5,
         'order_by': 'publication_time',
         'search_field': 'name'
     })
 
     logger.info(f"Поиск с параметрами: {params}")
 
-    # 5. Ищем вакансии
+    # 5. Открываем сессию поиска: первая страница из локальной базы или HH,
+    # следующие подгружаются по мере листания
     try:
-        vacancies = await hh_client.search_vacancies(**params)
+        # Предыдущая сессия поиска закончилась - ее предзагрузка больше не нужна
+        prefetcher.cancel(await search_sessions.active_session_id(user_id))
+        search = await search_sessions.start(user_id, params)
 
-        if not vacancies:
+        if not len(search):
             await update.message.reply_text(
                 "😔 По вашему запросу ничего не найдено",
                 reply_markup=get_main_keyboard()
             )
             return
 
-        await update.message.reply_text(f"📊 Найдено вакансий: {len(vacancies)}")
+        await update.message.reply_text(f"📊 Найдено вакансий: {search.total}")
 
-        # Сохраняем вакансии в контексте для навигации
-        context.user_data['search_results'] = vacancies
+        # Сессия поиска уже запомнена как активная для пользователя
         context.user_data['current_vacancy_index'] = 0
 
         # Отправляем первую вакансию
@@ -148,34 +150,29 @@ async def send_vacancy_with_buttons(update, context, index: int):
     """Отправка одной вакансии с inline-кнопками"""
     from src.utils.keyboards import get_vacancy_keyboard
 
-    vacancies = context.user_data.get('search_results', [])
+    search = await search_sessions.get_active(update.effective_user.id)
+    rendered = await prefetcher.get(search, index) if search else None
 
-    if index >= len(vacancies):
+    if not rendered:
         await update.message.reply_text(
             "✅ Это все найденные вакансии!",
             reply_markup=get_main_keyboard()
         )
         return
 
-    vacancy_data = vacancies[index]
-    vacancy_id = vacancy_data.get('id', '')
+    vacancy_id, message = rendered
 
     try:
-        # Сохраняем в БД
-        async for session in db.get_session():
-            vacancy = await vacancy_repo.save_vacancy(session, vacancy_data)
-            await vacancy_repo.mark_as_notified(session, update.effective_user.id, vacancy_id)
+        # Вакансия уже сохранена при загрузке страницы - показ отметится отложенно
+        await write_behind.mark_notified(update.effective_user.id, vacancy_id)
 
-        logger.info(f"Отправка вакансии {index + 1}/{len(vacancies)}: {vacancy_id}")
-
-        # Форматируем сообщение
-        message = hh_client.format_vacancy_message(vacancy_data)
+        logger.info(f"Отправка вакансии {index + 1}/{search.total}: {vacancy_id}")
 
         # Создаем inline-клавиатуру
         keyboard = get_vacancy_keyboard(
             vacancy_id=vacancy_id,
             page=index,
-            total=len(vacancies)
+            total=max(search.total, len(search))
         )
 
         # Отправляем с кнопками
@@ -197,6 +194,9 @@ async def send_vacancy_with_buttons(update, context, index: int):
         # Обновляем индекс
         context.user_data['current_vacancy_index'] = index
 
+        # Пока пользователь читает, готовим следующие вакансии
+        prefetcher.schedule(search, index)
+
     except Exception as e:
         logger.error(f"Ошибка отправки вакансии: {e}", exc_info=True)
         await update.message.reply_text(
@@ -225,7 +225,7 @@ async def set_filters_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_id = update.effective_user.id
 
     # Сохраняем фильтры в базу данных (старая система для совместимости)
-    async for session in db.get_session():
+    async with db.session_scope() as session:
         success = await user_repo.update_filters(session, user_id, filters)
 
     if success:
@@ -248,7 +248,7 @@ async def my_filters_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user_id = update.effective_user.id
     filters_text = "❌ У вас еще не заданы фильтры поиска."
 
-    async for session in db.get_session():
+    async with db.session_scope() as session:
         user = await user_repo.get_user(session, user_id)
         if user and user.search_filters:
             filters_text = f"🔍 Ваши текущие фильтры:\n\n`{user.search_filters}`"
@@ -260,11 +260,38 @@ async def my_filters_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     )
 
 
+async def skills_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /skills - навыки для сопроводительных писем"""
+    user_id = update.effective_user.id
+    skills = [skill.strip() for skill in ' '.join(context.args).split(',') if skill.strip()]
+
+    if not skills:
+        async with db.session_scope() as session:
+            filters = await filter_repo.get_all_filters(session, user_id)
+        current = ', '.join(filters.get('skills') or []) or 'не заданы'
+        await update.message.reply_text(
+            f"🧠 Ваши навыки: {current}\n\n"
+            "Перечислите навыки через запятую - они попадут в сопроводительные письма:\n"
+            "/skills Python, Django, PostgreSQL, Docker",
+            reply_markup=get_main_keyboard()
+        )
+        return
+
+    async with db.session_scope() as session:
+        await filter_repo.save_filter(session, user_id, 'skills', skills)
+
+    await update.message.reply_text(
+        f"✅ Навыки сохранены: {', '.join(skills)}",
+        reply_markup=get_main_keyboard()
+    )
+    logger.info(f"Сохранены навыки для {user_id}: {skills}")
+
+
 async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /status"""
     user_id = update.effective_user.id
 
-    async for session in db.get_session():
+    async with db.session_scope() as session:
         user = await user_repo.get_user(session, user_id)
 
     if user:
@@ -292,6 +319,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/help - Показать это сообщение\n"
         "/set_filters - Настроить фильтры поиска\n"
         "/my_filters - Показать текущие фильтры\n"
+        "/skills - Навыки для сопроводительных писем\n"
         "/status - Показать статус\n"
         "/stop - Остановить уведомления\n"
         "/search - Найти вакансии\n\n"
@@ -320,5 +348,6 @@ def setup_handlers(application):
     application.add_handler(CommandHandler("set_filters", set_filters_command))
     application.add_handler(CommandHandler("my_filters", my_filters_command))
     application.add_handler(CommandHandler("status", status_command))
+    application.add_handler(CommandHandler("skills", skills_command))
     application.add_handler(CommandHandler("stop", stop_command))
     application.add_handler(CommandHandler("search", search_command))
@@ -1,5 +1,5 @@
 from telegram import Update
-from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import ContextTypes
 from src.core.logger import get_logger
 from src.storage.database import db
 from src.storage.repositories.filter_repo import filter_repo
@@ -9,28 +9,33 @@ from src.utils.filter_keyboards import (
     get_area_keyboard, get_confirmation_keyboard
 )
 from src.utils.keyboards import get_main_keyboard
+from src.utils.callback_data import Route
+from src.handlers.router import callback_router
+from src.services.state_store import state_store
 
 logger = get_logger(__name__)
 
 
+INPUT_STATE = 'filter_input'  # {user_id: filter_type} в хранилище состояния
+INPUT_TTL = 600  # Ожидание ввода сбрасывается через 10 минут
+
+
 class FilterHandler:
     """Обработчик фильтров поиска"""
 
-    def __init__(self):
-        self.waiting_for_input = {}  # {user_id: filter_type}
-
-    async def show_filters_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def show_filters_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = ''):
         """Показать меню фильтров"""
         query = update.callback_query
-        user_id = query.from_user.id
+        user_id = update.effective_user.id
 
         # Получаем текущие фильтры пользователя
         current_filters = {}
-        async for session in db.get_session():
+        async with db.session_scope() as session:
             current_filters = await filter_repo.get_all_filters(session, user_id)
 
-        # Показываем меню
-        await query.edit_message_text(
+        # Показываем меню (после текстового ввода - новым сообщением)
+        send = query.edit_message_text if query else update.message.reply_text
+        await send(
             "⚙️ *Настройка фильтров поиска*\n\n"
             "Выберите параметр для настройки:\n\n"
             f"*Текущие настройки:*\n"
@@ -39,17 +44,18 @@ class FilterHandler:
             f"🎓 Опыт: {current_filters.get('experience', 'не задано')}\n"
             f"📍 Формат: {current_filters.get('schedule', 'не задано')}\n"
             f"🏢 Занятость: {current_filters.get('employment', 'не задано')}\n"
-            f"🌍 Город: {current_filters.get('area', 'не задано')}",
+            f"🌍 Город: {current_filters.get('area', 'не задано')}\n"
+            f"🔍 Ключевые слова: {', '.join(current_filters.get('keywords') or []) or 'не задано'}\n"
+            f"🚫 Исключить: {', '.join(current_filters.get('exclude_keywords') or []) or 'не задано'}",
             parse_mode='Markdown',
             reply_markup=get_filters_main_keyboard(current_filters)
         )
 
-    async def handle_filter_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_filter_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE, filter_type: str):
         """Обработка выбора типа фильтра"""
         query = update.callback_query
-        data = query.data
 
-        if data == "filter_profession":
+        if filter_type == "profession":
             await query.edit_message_text(
                 "💼 *Выберите профессию:*\n\n"
                 "Или введите свою профессию вручную",
@@ -57,7 +63,7 @@ class FilterHandler:
                 reply_markup=get_profession_keyboard()
             )
 
-        elif data == "filter_salary":
+        elif filter_type == "salary":
             await query.edit_message_text(
                 "💰 *Выберите минимальную зарплату:*\n\n"
                 "Или введите свою сумму в рублях",
@@ -65,28 +71,28 @@ class FilterHandler:
                 reply_markup=get_salary_keyboard()
             )
 
-        elif data == "filter_experience":
+        elif filter_type == "experience":
             await query.edit_message_text(
                 "🎓 *Выберите требуемый опыт:*",
                 parse_mode='Markdown',
                 reply_markup=get_experience_keyboard()
             )
 
-        elif data == "filter_schedule":
+        elif filter_type == "schedule":
             await query.edit_message_text(
                 "📍 *Выберите формат работы:*",
                 parse_mode='Markdown',
                 reply_markup=get_schedule_keyboard()
             )
 
-        elif data == "filter_employment":
+        elif filter_type == "employment":
             await query.edit_message_text(
                 "🏢 *Выберите тип занятости:*",
                 parse_mode='Markdown',
                 reply_markup=get_employment_keyboard()
             )
 
-        elif data == "filter_area":
+        elif filter_type == "area":
             await query.edit_message_text(
                 "🌍 *Выберите город:*\n\n"
                 "Или введите свой город",
@@ -94,104 +100,110 @@ class FilterHandler:
                 reply_markup=get_area_keyboard()
             )
 
-        elif data == "filter_keywords":
-            self.waiting_for_input[query.from_user.id] = "keywords"
+        elif filter_type == "keywords":
+            await state_store.set(INPUT_STATE, query.from_user.id, "keywords", ttl=INPUT_TTL)
             await query.edit_message_text(
                 "🔍 *Введите ключевые слова:*\n\n"
                 "Например: Django, FastAPI, PostgreSQL, Docker\n"
-                "Каждое слово или фраза с новой строки",
+                "Каждое слово или фраза с новой строки\n"
+                "Ищутся в названии, описании и навыках вакансии - достаточно одного",
                 parse_mode='Markdown',
                 reply_markup=get_confirmation_keyboard("back")
             )
 
-    async def handle_filter_value(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка выбора значения фильтра"""
+        elif filter_type == "exclude_keywords":
+            await state_store.set(INPUT_STATE, query.from_user.id, "exclude_keywords", ttl=INPUT_TTL)
+            await query.edit_message_text(
+                "🚫 *Введите слова-исключения:*\n\n"
+                "Например: 1С, Битрикс, Senior\n"
+                "Каждое слово или фраза с новой строки\n"
+                "Вакансии с любым из них не будут приходить",
+                parse_mode='Markdown',
+                reply_markup=get_confirmation_keyboard("back")
+            )
+
+    async def set_profession(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profession: str):
+        """Выбор профессии"""
         query = update.callback_query
-        data = query.data
-        user_id = query.from_user.id
+        if profession == "custom_profession":
+            await state_store.set(INPUT_STATE, query.from_user.id, "profession", ttl=INPUT_TTL)
+            await query.edit_message_text(
+                "💼 *Введите профессию:*\n\n"
+                "Например: Python-разработчик, Data Scientist",
+                parse_mode='Markdown'
+            )
+        else:
+            await self._save_and_show(update, context, "profession", profession)
 
-        if data.startswith("prof_"):
-            profession = data.replace("prof_", "")
-            if profession == "custom_profession":
-                self.waiting_for_input[user_id] = "profession"
-                await query.edit_message_text(
-                    "💼 *Введите профессию:*\n\n"
-                    "Например: Python-разработчик, Data Scientist",
-                    parse_mode='Markdown'
-                )
-            else:
-                async for session in db.get_session():
-                    await filter_repo.save_filter(session, user_id, "profession", profession)
-                await self.show_filters_menu(update, context)
-
-        elif data.startswith("salary_"):
-            salary = data.replace("salary_", "")
-            if salary == "custom_salary":
-                self.waiting_for_input[user_id] = "salary"
-                await query.edit_message_text(
-                    "💰 *Введите минимальную зарплату:*\n\n"
-                    "Только цифры, например: 120000",
-                    parse_mode='Markdown'
-                )
+    async def set_salary(self, update: Update, context: ContextTypes.DEFAULT_TYPE, salary: str):
+        """Выбор минимальной зарплаты"""
+        query = update.callback_query
+        user_id = query.from_user.id
+        if salary == "custom_salary":
+            await state_store.set(INPUT_STATE, user_id, "salary", ttl=INPUT_TTL)
+            await query.edit_message_text(
+                "💰 *Введите минимальную зарплату:*\n\n"
+                "Только цифры, например: 120000",
+                parse_mode='Markdown'
+            )
+        else:
+            # Парсим диапазон зарплат
+            if "_" in salary:
+                salary_min = salary.split("_")[0]
+            elif salary == "any":
+                salary_min = None
             else:
-                # Парсим диапазон зарплат
-                if "_" in salary:
-                    salary_min = salary.split("_")[0]
-                elif salary == "any":
-                    salary_min = None
+                salary_min = salary
+
+            async with db.session_scope() as session:
+                if salary_min:
+                    await filter_repo.save_filter(session, user_id, "salary_min", int(salary_min))
                 else:
-                    salary_min = salary
-
-                async for session in db.get_session():
-                    if salary_min:
-                        await filter_repo.save_filter(session, user_id, "salary_min", int(salary_min))
-                    else:
-                        await filter_repo.delete_filter(session, user_id, "salary_min")
-                await self.show_filters_menu(update, context)
-
-        elif data.startswith("exp_"):
-            experience = data.replace("exp_", "")
-            async for session in db.get_session():
-                await filter_repo.save_filter(session, user_id, "experience", experience)
+                    await filter_repo.delete_filter(session, user_id, "salary_min")
             await self.show_filters_menu(update, context)
 
-        elif data.startswith("schedule_"):
-            schedule = data.replace("schedule_", "")
-            async for session in db.get_session():
-                await filter_repo.save_filter(session, user_id, "schedule", schedule)
-            await self.show_filters_menu(update, context)
+    async def set_experience(self, update: Update, context: ContextTypes.DEFAULT_TYPE, experience: str):
+        """Выбор опыта"""
+        await self._save_and_show(update, context, "experience", experience)
 
-        elif data.startswith("employment_"):
-            employment = data.replace("employment_", "")
-            async for session in db.get_session():
-                await filter_repo.save_filter(session, user_id, "employment", employment)
-            await self.show_filters_menu(update, context)
+    async def set_schedule(self, update: Update, context: ContextTypes.DEFAULT_TYPE, schedule: str):
+        """Выбор формата работы"""
+        await self._save_and_show(update, context, "schedule", schedule)
 
-        elif data.startswith("area_"):
-            area = data.replace("area_", "")
-            if area == "custom_area":
-                self.waiting_for_input[user_id] = "area"
-                await query.edit_message_text(
-                    "🌍 *Введите город:*\n\n"
-                    "Например: Москва, Санкт-Петербург, Новосибирск",
-                    parse_mode='Markdown'
-                )
-            else:
-                async for session in db.get_session():
-                    await filter_repo.save_filter(session, user_id, "area", area)
-                await self.show_filters_menu(update, context)
+    async def set_employment(self, update: Update, context: ContextTypes.DEFAULT_TYPE, employment: str):
+        """Выбор типа занятости"""
+        await self._save_and_show(update, context, "employment", employment)
+
+    async def set_area(self, update: Update, context: ContextTypes.DEFAULT_TYPE, area: str):
+        """Выбор города"""
+        query = update.callback_query
+        if area == "custom_area":
+            await state_store.set(INPUT_STATE, query.from_user.id, "area", ttl=INPUT_TTL)
+            await query.edit_message_text(
+                "🌍 *Введите город:*\n\n"
+                "Например: Москва, Санкт-Петербург, Новосибирск",
+                parse_mode='Markdown'
+            )
+        else:
+            await self._save_and_show(update, context, "area", area)
+
+    async def _save_and_show(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                             filter_name: str, value):
+        """Сохранить значение фильтра и вернуться в меню фильтров"""
+        async with db.session_scope() as session:
+            await filter_repo.save_filter(session, update.callback_query.from_user.id, filter_name, value)
+        await self.show_filters_menu(update, context)
 
-    async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка текстового ввода для фильтров"""
+    async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+        """Обработка текстового ввода для фильтров; False, если ввода не ждали"""
         user_id = update.effective_user.id
         text = update.message.text
 
-        if user_id not in self.waiting_for_input:
-            return
-
-        filter_type = self.waiting_for_input.pop(user_id)
+        filter_type = await state_store.pop(INPUT_STATE, user_id)
+        if filter_type is None:
+            return False
 
-        async for session in db.get_session():
+        async with db.session_scope() as session:
             if filter_type == "profession":
                 await filter_repo.save_filter(session, user_id, "profession", text)
                 await update.message.reply_text(
@@ -231,62 +243,71 @@ class FilterHandler:
                     reply_markup=get_main_keyboard()
                 )
 
+            elif filter_type == "exclude_keywords":
+                words = [k.strip() for k in text.split('\n') if k.strip()]
+                await filter_repo.save_filter(session, user_id, "exclude_keywords", words)
+                await update.message.reply_text(
+                    "✅ Слова-исключения сохранены:\n" + "\n".join(f"• {k}" for k in words),
+                    reply_markup=get_main_keyboard()
+                )
+
         # Показываем меню фильтров
         await self.show_filters_menu(update, context)
+        return True
 
-    async def handle_actions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка действий с фильтрами"""
+    async def save_filters(self, update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = ''):
+        """Сохранение фильтров"""
         query = update.callback_query
-        data = query.data
         user_id = query.from_user.id
 
-        if data == "filters_save":
-            # Формируем текстовый запрос для API HH
-            async for session in db.get_session():
-                filters = await filter_repo.get_all_filters(session, user_id)
+        # Формируем текстовый запрос для API HH
+        async with db.session_scope() as session:
+            filters = await filter_repo.get_all_filters(session, user_id)
 
-            search_text = self._build_search_query(filters)
+        search_text = self._build_search_query(filters)
 
-            # Сохраняем в старую систему (для совместимости)
-            async for session in db.get_session():
-                from src.storage.repositories.user_repo import user_repo
-                await user_repo.update_filters(session, user_id, search_text)
+        # Сохраняем в старую систему (для совместимости)
+        async with db.session_scope() as session:
+            from src.storage.repositories.user_repo import user_repo
+            await user_repo.update_filters(session, user_id, search_text)
 
-            await query.edit_message_text(
-                f"✅ *Фильтры сохранены!*\n\n"
-                f"Поисковый запрос:\n`{search_text}`\n\n"
-                f"Теперь используйте 🔍 Поиск вакансий",
-                parse_mode='Markdown',
-                reply_markup=get_main_keyboard()
-            )
-
-        elif data == "filters_clear":
-            async for session in db.get_session():
-                await filter_repo.clear_all_filters(session, user_id)
+        await query.edit_message_text(
+            f"✅ *Фильтры сохранены!*\n\n"
+            f"Поисковый запрос:\n`{search_text}`\n\n"
+            f"Теперь используйте 🔍 Поиск вакансий",
+            parse_mode='Markdown',
+            reply_markup=get_main_keyboard()
+        )
 
-            await query.edit_message_text(
-                "🧹 *Все фильтры очищены!*",
-                parse_mode='Markdown',
-                reply_markup=get_main_keyboard()
-            )
+    async def clear_filters(self, update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = ''):
+        """Очистка всех фильтров"""
+        query = update.callback_query
+        async with db.session_scope() as session:
+            await filter_repo.clear_all_filters(session, query.from_user.id)
 
-        elif data == "filters_back" or data == "back_to_filters":
-            await self.show_filters_menu(update, context)
+        await query.edit_message_text(
+            "🧹 *Все фильтры очищены!*",
+            parse_mode='Markdown',
+            reply_markup=get_main_keyboard()
+        )
 
-        elif data == "back_to_main":
-            await query.edit_message_text(
-                "Главное меню:",
-                reply_markup=get_main_keyboard()
-            )
+    async def back_to_main(self, update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = ''):
+        """Возврат в главное меню"""
+        await update.callback_query.edit_message_text(
+            "Главное меню:",
+            reply_markup=get_main_keyboard()
+        )
 
-        elif data.startswith("confirm_back"):
-            user_id = query.from_user.id
-            if user_id in self.waiting_for_input:
-                del self.waiting_for_input[user_id]
+    async def confirm(self, update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
+        """Подтверждение действия"""
+        if action.startswith("back"):
+            await state_store.delete(INPUT_STATE, update.callback_query.from_user.id)
             await self.show_filters_menu(update, context)
 
-        elif data.startswith("cancel_back"):
-            user_id = query.from_user.id
+    async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
+        """Отмена действия"""
+        query = update.callback_query
+        if action.startswith("back"):
             # Просто удаляем клавиатуру, оставляя текст
             await query.edit_message_text(
                 query.message.text,
@@ -325,21 +346,21 @@ filter_handler = FilterHandler()
 
 def setup_filter_handlers(application):
     """Регистрация обработчиков фильтров"""
-    # Обработчики callback-кнопок - более специфичные паттерны
-    application.add_handler(CallbackQueryHandler(
-        filter_handler.show_filters_menu, pattern="^filters_menu$"
-    ))
-    application.add_handler(CallbackQueryHandler(
-        filter_handler.handle_filter_selection, pattern="^filter_(?!next|prev|save|hide|cover|gen_cover|back_to|ignore)"
-    ))
-    application.add_handler(CallbackQueryHandler(
-        filter_handler.handle_filter_value, pattern="^(prof|salary|exp|schedule|employment|area)_"
-    ))
-    application.add_handler(CallbackQueryHandler(
-        filter_handler.handle_actions, pattern="^filters_(save|clear|back)|^back_to_filters$|^confirm_|^cancel_"
-    ))
-
-    # Обработчик текстового ввода
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND, filter_handler.handle_text_input
-    ))
\ No newline at end of file
+    # Callback-кнопки фильтров - маршруты общего роутера
+    callback_router.add(Route.FILTERS_MENU, filter_handler.show_filters_menu)
+    callback_router.add(Route.FILTERS_BACK, filter_handler.show_filters_menu, name='filters_back')
+    callback_router.add(Route.FILTER_SELECT, filter_handler.handle_filter_selection)
+    callback_router.add(Route.FILTER_PROFESSION, filter_handler.set_profession)
+    callback_router.add(Route.FILTER_SALARY, filter_handler.set_salary)
+    callback_router.add(Route.FILTER_EXPERIENCE, filter_handler.set_experience)
+    callback_router.add(Route.FILTER_SCHEDULE, filter_handler.set_schedule)
+    callback_router.add(Route.FILTER_EMPLOYMENT, filter_handler.set_employment)
+    callback_router.add(Route.FILTER_AREA, filter_handler.set_area)
+    callback_router.add(Route.FILTERS_SAVE, filter_handler.save_filters)
+    callback_router.add(Route.FILTERS_CLEAR, filter_handler.clear_filters)
+    callback_router.add(Route.MAIN_MENU, filter_handler.back_to_main)
+    callback_router.add(Route.CONFIRM, filter_handler.confirm)
+    callback_router.add(Route.CANCEL, filter_handler.cancel)
+
+    # Текстовый ввод фильтров принимает handle_text_messages (messages.py):
+    # отдельный MessageHandler здесь никогда не срабатывал бы после него
@@ -0,0 +1,119 @@
+import html
+from datetime import datetime, timedelta
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes
+from src.core.logger import get_logger
+from src.handlers.router import callback_router
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.services.cover_letter import cover_letter_service
+from src.utils.callback_data import Route, encode
+
+logger = get_logger(__name__)
+
+PAGE_SIZE = 10
+MAX_BATCH_LETTERS = 10  # Писем за одно нажатие "Письма ко всем"
+HISTORY = 'h'  # Все показанные вакансии, кроме скрытых
+SAVED = 's'  # Только избранное
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(kind: str, created_at: datetime, vacancy_id: str) -> str:
+    """Аргумент кнопки "Дальше": вид списка и ключ последней строки страницы"""
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{kind}:{micros}:{vacancy_id}"
+
+
+def decode_cursor(arg: str):
+    """(вид списка, (created_at, vacancy_id) или None для первой страницы)"""
+    kind, _, rest = arg.partition(':')
+    if not rest:
+        return kind or HISTORY, None
+    micros, _, vacancy_id = rest.partition(':')
+    return kind, (_EPOCH + timedelta(microseconds=int(micros)), vacancy_id)
+
+
+def render_page(kind: str, rows: list, first_page: bool) -> str:
+    """Компактный список: строка на вакансию, ссылка на HH"""
+    title = "⭐ Избранное" if kind == SAVED else "📋 История поиска"
+    if not rows:
+        empty = "Пока пусто" if first_page else "Больше ничего нет"
+        return f"<b>{title}</b>\n\n{empty}"
+
+    lines = [f"<b>{title}</b>", ""]
+    for row in rows:
+        mark = "⭐ " if row.saved and kind != SAVED else ""
+        name = html.escape(row.title or 'Без названия')
+        employer = html.escape(row.employer_name or '')
+        date = row.created_at.strftime('%d.%m') if row.created_at else ''
+        lines.append(f'{mark}<a href="{html.escape(row.url)}">{name}</a> — {employer} <i>{date}</i>')
+    return "\n".join(lines)
+
+
+def history_keyboard(kind: str, cursor: str = None, first_page: bool = True) -> InlineKeyboardMarkup:
+    buttons = []
+    if cursor:
+        buttons.append([InlineKeyboardButton("Дальше ➡️", callback_data=encode(Route.HISTORY, cursor))])
+
+    row = []
+    if not first_page:
+        row.append(InlineKeyboardButton("⏮ В начало", callback_data=encode(Route.HISTORY, kind)))
+    if kind == SAVED:
+        buttons.append([InlineKeyboardButton("📨 Письма ко всем", callback_data=encode(Route.COVER_SAVED))])
+        row.append(InlineKeyboardButton("📋 Вся история", callback_data=encode(Route.HISTORY, HISTORY)))
+    else:
+        row.append(InlineKeyboardButton("⭐ Избранное", callback_data=encode(Route.HISTORY, SAVED)))
+    buttons.append(row)
+    return InlineKeyboardMarkup(buttons)
+
+
+async def show_history(update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = HISTORY):
+    """Страница истории или избранного (из меню - новым сообщением, из кнопки - редактированием)"""
+    kind, after = decode_cursor(arg)
+    user_id = update.effective_user.id
+
+    async with db.session_scope() as session:
+        rows = await vacancy_repo.get_history_page(
+            session, user_id, saved_only=kind == SAVED, after=after, limit=PAGE_SIZE
+        )
+
+    has_more = len(rows) > PAGE_SIZE
+    rows = rows[:PAGE_SIZE]
+    cursor = encode_cursor(kind, rows[-1].created_at, rows[-1].vacancy_id) if has_more else None
+
+    text = render_page(kind, rows, first_page=after is None)
+    keyboard = history_keyboard(kind, cursor, first_page=after is None)
+
+    query = update.callback_query
+    send = query.edit_message_text if query else update.message.reply_text
+    await send(text, reply_markup=keyboard, parse_mode='HTML', disable_web_page_preview=True)
+
+
+async def send_saved_letters(update: Update, context: ContextTypes.DEFAULT_TYPE, arg: str = ''):
+    """Сопроводительные письма ко всем вакансиям из избранного - отдельными сообщениями"""
+    query = update.callback_query
+    await query.answer("📨 Готовлю письма...")
+
+    letters = await cover_letter_service.generate_for_saved(update.effective_user.id, limit=MAX_BATCH_LETTERS)
+    if not letters:
+        await query.message.reply_text("В избранном нет вакансий, для которых удалось составить письмо")
+        return
+
+    async with db.session_scope() as session:
+        titles = {row.vacancy_id: row.title for row in await vacancy_repo.get_history_page(
+            session, update.effective_user.id, saved_only=True, limit=MAX_BATCH_LETTERS
+        )}
+
+    for vacancy_id, letter in letters.items():
+        title = html.escape(titles.get(vacancy_id) or vacancy_id)
+        await query.message.reply_text(
+            f'📝 <a href="https://hh.ru/vacancy/{vacancy_id}">{title}</a>\n\n{html.escape(letter)}',
+            parse_mode='HTML',
+            disable_web_page_preview=True
+        )
+
+
+def setup_history_handlers(application):
+    """Регистрация кнопок истории и избранного"""
+    callback_router.add(Route.HISTORY, show_history)
+    callback_router.add(Route.COVER_SAVED, send_saved_letters, answer=False)
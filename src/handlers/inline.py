@@ -0,0 +1,42 @@
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import ContextTypes, InlineQueryHandler
+from src.core.logger import get_logger
+from src.services.inline_index import inline_index
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+INLINE_RESULTS = min(load_config().inline_results, 50)
+CACHE_TIME = 60  # Telegram сам кэширует ответ на одинаковый запрос
+
+
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline-поиск вакансий (@bot python remote) по индексу в памяти.
+
+    Запросы приходят на каждое нажатие клавиши, поэтому ответ строится
+    только из inline_index - без обращений к HH и PostgreSQL.
+    """
+    query = update.inline_query
+    vacancies = inline_index.search(query.query, limit=INLINE_RESULTS)
+
+    results = [
+        InlineQueryResultArticle(
+            id=vacancy.vacancy_id,
+            title=vacancy.title,
+            description=vacancy.description,
+            url=vacancy.url or None,
+            input_message_content=InputTextMessageContent(
+                vacancy.message,
+                parse_mode='Markdown',
+                disable_web_page_preview=True
+            )
+        )
+        for vacancy in vacancies
+    ]
+
+    await query.answer(results, cache_time=CACHE_TIME, is_personal=False)
+
+
+def setup_inline_handlers(application):
+    """Регистрация inline-режима (нужно включить у бота через @BotFather /setinline)"""
+    application.add_handler(InlineQueryHandler(handle_inline_query))
@@ -45,7 +45,7 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
 
         # Получаем текущие фильтры
         current_filters = {}
-        async for session in db.get_session():
+        async with db.session_scope() as session:
             current_filters = await filter_repo.get_all_filters(session, user_id)
 
         # Показываем меню фильтров
@@ -82,7 +82,7 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
         from src.storage.database import db
         from src.storage.repositories.user_repo import user_repo
 
-        async for session in db.get_session():
+        async with db.session_scope() as session:
             await user_repo.update_filters(session, user_id, "")
 
         await update.message.reply_text(
@@ -118,11 +118,8 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
         )
 
     elif text == "📋 История поиска":
-        await update.message.reply_text(
-            "📋 Ваша история поиска будет здесь...\n"
-            "(функция в разработке)",
-            reply_markup=get_main_keyboard()
-        )
+        from src.handlers.history import show_history
+        await show_history(update, context)
 
     elif text == "⏰ Автопоиск":
         await update.message.reply_text(
@@ -132,12 +129,17 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
         )
 
     else:
+        # Ждем ввод значения фильтра (профессия, зарплата, город, ключевые слова)
+        from src.handlers.filters import filter_handler
+        if await filter_handler.handle_text_input(update, context):
+            return
+
         # Если текст не команда, пробуем сохранить как фильтры
         try:
             from src.storage.database import db
             from src.storage.repositories.user_repo import user_repo
 
-            async for session in db.get_session():
+            async with db.session_scope() as session:
                 success = await user_repo.update_filters(session, user_id, text)
 
             if success:
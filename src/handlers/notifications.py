@@ -5,8 +5,8 @@ from src.services.hh_client import hh_client
 logger = get_logger(__name__)
 
 
-async def send_vacancy_notification(bot: Bot, chat_id: int, vacancy_data: dict):
-    """Отправка уведомления о новой вакансии"""
+async def send_vacancy_notification(bot: Bot, chat_id: int, vacancy_data: dict) -> bool:
+    """Отправка уведомления о новой вакансии (False - не отправлено)"""
     try:
         message = hh_client.format_vacancy_message(vacancy_data)
         await bot.send_message(
@@ -16,8 +16,10 @@ async def send_vacancy_notification(bot: Bot, chat_id: int, vacancy_data: dict):
             disable_web_page_preview=True
         )
         logger.info(f"Уведомление отправлено пользователю {chat_id}")
+        return True
     except Exception as e:
         logger.error(f"Ошибка отправки уведомления пользователю {chat_id}: {e}")
+        return False
 
 
 def format_vacancy_message(vacancy: dict) -> str:
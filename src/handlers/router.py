@@ -0,0 +1,102 @@
+import time
+from telegram import Update
+from telegram.ext import ContextTypes, CallbackQueryHandler
+from src.core.logger import get_logger
+from src.utils.callback_data import decode
+
+logger = get_logger(__name__)
+
+SLOW_CALLBACK_MS = 500  # Медленнее - пишем предупреждение в лог
+
+
+class RouteStats:
+    """Счетчики одного маршрута: вызовы, ошибки, суммарное и максимальное время"""
+
+    __slots__ = ('calls', 'errors', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 1)
+        }
+
+
+class CallbackRouter:
+    """Единая точка обработки inline-кнопок.
+
+    callback_data разбирается в (код маршрута, аргумент), обработчик берется
+    из таблицы по коду - без перебора регулярных выражений и префиксов.
+    Обработчик вызывается как handler(update, context, arg). Время каждого
+    вызова копится по маршрутам.
+    """
+
+    def __init__(self):
+        self.routes = {}  # {code: (name, handler, answer)}
+        self.route_stats = {}  # {name: RouteStats}
+
+    def add(self, code: str, handler, name: str = None, answer: bool = True):
+        """Зарегистрировать обработчик маршрута.
+
+        answer=False - обработчик сам отвечает на callback (например, всплывающим текстом).
+        """
+        if code in self.routes:
+            raise ValueError(f"Маршрут {code} уже зарегистрирован: {self.routes[code][0]}")
+        name = name or handler.__name__
+        self.routes[code] = (name, handler, answer)
+        self.route_stats.setdefault(name, RouteStats())
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик CallbackQuery для приложения"""
+        query = update.callback_query
+        decoded = decode(query.data)
+
+        if decoded is None:
+            logger.info(f"Устаревшая кнопка {query.data!r} от {query.from_user.id}")
+            await query.answer("Кнопка устарела, откройте меню заново")
+            return
+
+        code, arg = decoded
+        route = self.routes.get(code)
+        if route is None:
+            logger.warning(f"Неизвестный callback: {query.data}")
+            await query.answer("Команда не распознана")
+            return
+
+        name, handler, answer = route
+        if answer:
+            await query.answer()  # Убираем "часики"
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            await handler(update, context, arg)
+            failed = False
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.route_stats[name].add(elapsed_ms, failed)
+            if elapsed_ms > SLOW_CALLBACK_MS:
+                logger.warning(f"Медленный callback {name}: {elapsed_ms:.0f} мс")
+
+    def stats(self) -> dict:
+        """Метрики по маршрутам, которые вызывались"""
+        return {name: stats.as_dict() for name, stats in self.route_stats.items() if stats.calls}
+
+    def handler(self) -> CallbackQueryHandler:
+        return CallbackQueryHandler(self.dispatch)
+
+
+callback_router = CallbackRouter()
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import html
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from string import Formatter
+from src.core.logger import get_logger
+from src.services.hh_client import hh_client
+from src.services.filter_service import filter_service
+from src.storage.database import db
+from src.storage.repositories.user_repo import user_repo
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.cache import LRUCache
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+TEMPLATES_VERSION = 1  # Меняется вместе с текстами шаблонов - старые письма в кэше не подходят
+MAX_SKILLS = 3  # Сколько навыков упоминать в одном абзаце
+DETAILS_CONCURRENCY = 5  # Параллельных запросов деталей вакансий к HH в пакетной генерации
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def compile_template(template: str) -> tuple:
+    """Разобрать шаблон str.format один раз: ((текст, поле или None), ...)"""
+    return tuple((literal, field) for literal, field, _, _ in Formatter().parse(template))
+
+
+def render_template(compiled: tuple, values: dict) -> str:
+    """Подставить значения в разобранный шаблон без повторного разбора"""
+    return ''.join(literal + (str(values[field]) if field is not None else '') for literal, field in compiled)
+
+
+def normalize(text: str) -> str:
+    return SPACE_RE.sub(' ', (text or '').lower().replace('ё', 'е')).strip()
+
+
+# Шаблоны писем по уровню опыта
+INTRO = {
+    'noExperience': compile_template(
+        "Меня зовут {name}. Хочу начать карьеру в роли «{title}» в компании {employer} "
+        "и готов(а) много учиться на реальных задачах."
+    ),
+    'junior': compile_template(
+        "Меня зовут {name}. Откликаюсь на вакансию «{title}» в компании {employer}: "
+        "у меня есть первый коммерческий опыт, и я хочу расти дальше в вашей команде."
+    ),
+    'default': compile_template(
+        "Меня зовут {name}. Откликаюсь на вакансию «{title}» в компании {employer} - "
+        "описание задач хорошо совпадает с тем, чем я занимаюсь сейчас."
+    ),
+}
+MATCHED = compile_template("Мой опыт с {skills} напрямую пересекается с вашими требованиями.")
+ONE_MATCHED = compile_template("В вашей вакансии важен {skill} - это мой основной рабочий инструмент.")
+MISSING = compile_template("С {skills} знаком(а) меньше, но готов(а) быстро разобраться.")
+NO_SKILLS = compile_template("Буду рад(а) рассказать подробнее о своем опыте в роли «{profession}».")
+CLOSING = compile_template("Буду рад(а) обсудить, чем могу быть полезен(на) {employer}.\n\nС уважением,\n{name}")
+
+
+class CoverLetterProfile:
+    """Что о пользователе нужно для письма: имя, профессия, уровень и навыки"""
+
+    __slots__ = ('name', 'profession', 'experience', 'skills')
+
+    def __init__(self, name: str, profession: str = '', experience: str = '', skills=()):
+        self.name = name or 'кандидат'
+        self.profession = profession or ''
+        self.experience = experience or ''
+        # {нормализованный навык: как написал пользователь}; порядок сохраняем - указанные первыми важнее
+        self.skills = {}
+        for skill in skills:
+            self.skills.setdefault(normalize(skill), skill.strip())
+        self.skills.pop('', None)
+
+    @classmethod
+    def from_filters(cls, name: str, filters: dict) -> 'CoverLetterProfile':
+        skills = filters.get('skills') or []
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        keywords = filters.get('keywords') or []
+        if isinstance(keywords, str):
+            keywords = keywords.split()
+        return cls(name, filters.get('profession'), filters.get('experience'), list(skills) + list(keywords))
+
+    def key(self) -> str:
+        """Хэш профиля: при изменении профиля письма генерируются заново"""
+        skills = list(self.skills.values())
+        payload = json.dumps([TEMPLATES_VERSION, self.name, self.profession, self.experience, skills], ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def match_skills(profile: CoverLetterProfile, vacancy: dict) -> tuple:
+    """(навыки профиля, нужные вакансии; ключевые навыки вакансии, которых нет в профиле)"""
+    key_skills = [skill.get('name', '') for skill in vacancy.get('key_skills') or []]
+    required = {normalize(skill): skill for skill in key_skills if skill}
+    description = normalize(html.unescape(TAG_RE.sub(' ', vacancy.get('description') or '')))
+
+    matched = [original for skill, original in profile.skills.items() if skill in required or skill in description]
+    missing = [original for skill, original in required.items() if skill not in profile.skills]
+    return matched, missing
+
+
+def render_letter(profile: CoverLetterProfile, vacancy: dict) -> str:
+    """Письмо по профилю и деталям вакансии (синхронно, выполняется в пуле потоков)"""
+    values = {
+        'name': profile.name,
+        'title': vacancy.get('name', 'Без названия'),
+        'employer': (vacancy.get('employer') or {}).get('name', 'вашей компании'),
+        'profession': profile.profession or vacancy.get('name', ''),
+    }
+    intro = INTRO.get(profile.experience, INTRO['default'])
+    paragraphs = ["Здравствуйте!", render_template(intro, values)]
+
+    matched, missing = match_skills(profile, vacancy)
+    if len(matched) == 1:
+        paragraphs.append(render_template(ONE_MATCHED, {'skill': matched[0]}))
+    elif matched:
+        paragraphs.append(render_template(MATCHED, {'skills': ', '.join(matched[:MAX_SKILLS])}))
+    else:
+        paragraphs.append(render_template(NO_SKILLS, values))
+    if matched and missing:
+        paragraphs.append(render_template(MISSING, {'skills': ', '.join(missing[:MAX_SKILLS])}))
+
+    paragraphs.append(render_template(CLOSING, values))
+    return '\n\n'.join(paragraphs)
+
+
+class CoverLetterService:
+    """Генерация сопроводительных писем по шаблонам.
+
+    Шаблоны разбираются один раз при импорте, подстановка и поиск навыков в
+    описании вакансии идут в пуле потоков, чтобы не задерживать обработку
+    апдейтов. Готовые письма кэшируются по (хэш профиля, ID вакансии).
+    """
+
+    def __init__(self, workers: int = 2, cache_size: int = 5000, ttl: float = 86400):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cover-letter')
+        self.letters = LRUCache(max_size=cache_size, ttl=ttl)
+
+    async def get_profile(self, user_id: int) -> CoverLetterProfile:
+        async with db.session_scope() as session:
+            user = await user_repo.get_user(session, user_id)
+        filters = await filter_service.get_user_filters(user_id) or {}
+        return CoverLetterProfile.from_filters(user.first_name if user else '', filters)
+
+    async def generate(self, user_id: int, vacancy_id: str, profile: CoverLetterProfile = None):
+        """Письмо для вакансии или None, если вакансию не удалось получить"""
+        profile = profile or await self.get_profile(user_id)
+        key = (profile.key(), str(vacancy_id))
+        letter = self.letters.get(key)
+        if letter is not None:
+            return letter
+
+        vacancy = await self._get_details(vacancy_id)
+        if not vacancy:
+            return None
+
+        loop = asyncio.get_running_loop()
+        letter = await loop.run_in_executor(self.executor, render_letter, profile, vacancy)
+        self.letters.set(key, letter)
+        return letter
+
+    async def generate_many(self, user_id: int, vacancy_ids: list) -> dict:
+        """{vacancy_id: письмо} для нескольких вакансий (профиль загружается один раз).
+
+        Данные из БД читаются одним запросом до параллельной части: сессия
+        апдейта общая для всех задач gather, поэтому параллельно идут только
+        запросы деталей в HH.
+        """
+        profile = await self.get_profile(user_id)
+        profile_key = profile.key()
+        letters = {}
+        missing = []
+        for vacancy_id in vacancy_ids:
+            letter = self.letters.get((profile_key, str(vacancy_id)))
+            if letter is not None:
+                letters[vacancy_id] = letter
+            else:
+                missing.append(vacancy_id)
+
+        if missing:
+            async with db.session_scope() as session:
+                stored = await vacancy_repo.get_raw_data_many(session, [str(v) for v in missing])
+            semaphore = asyncio.Semaphore(DETAILS_CONCURRENCY)
+
+            async def fetch_one(vacancy_id):
+                vacancy = stored.get(str(vacancy_id))
+                if vacancy and 'description' in vacancy:
+                    return vacancy
+                async with semaphore:
+                    return await hh_client.get_vacancy_details(vacancy_id) or vacancy
+
+            details = await asyncio.gather(*(fetch_one(vacancy_id) for vacancy_id in missing))
+            found = [(vacancy_id, vacancy) for vacancy_id, vacancy in zip(missing, details) if vacancy]
+
+            loop = asyncio.get_running_loop()
+            rendered = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, render_letter, profile, vacancy) for _, vacancy in found
+            ))
+            for (vacancy_id, _), letter in zip(found, rendered):
+                self.letters.set((profile_key, str(vacancy_id)), letter)
+                letters[vacancy_id] = letter
+
+        return {vacancy_id: letters[vacancy_id] for vacancy_id in vacancy_ids if vacancy_id in letters}
+
+    async def generate_for_saved(self, user_id: int, limit: int = 20) -> dict:
+        """Письма ко всем вакансиям из избранного пользователя (не больше limit, новые первыми)"""
+        async with db.session_scope() as session:
+            vacancy_ids = await vacancy_repo.get_saved_ids(session, user_id, limit)
+        return await self.generate_many(user_id, vacancy_ids)
+
+    def stop(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _get_details(self, vacancy_id: str):
+        """Детали вакансии (описание, key_skills): из БД, если там полные данные, иначе из HH"""
+        async with db.session_scope() as session:
+            vacancy = await vacancy_repo.get_raw_data(session, vacancy_id)
+        # В результатах поиска HH нет описания - за ним нужно идти в /vacancies/{id}
+        if vacancy and 'description' in vacancy:
+            return vacancy
+        return await hh_client.get_vacancy_details(vacancy_id) or vacancy
+
+
+_config = load_config()
+cover_letter_service = CoverLetterService(
+    workers=_config.cover_letter_workers,
+    cache_size=_config.cover_letter_cache_size
+)
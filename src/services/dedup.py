@@ -0,0 +1,170 @@
+import html
+import re
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+SHINGLE_SIZE = 3  # Слов в шингле
+MIN_SHINGLES = 3  # У более коротких текстов сходство ненадежно - такие не склеиваем
+PRIME = np.uint64(4294967291)  # Наибольшее простое меньше 2^32
+SEED = 1
+
+
+def shingles(vacancy: dict) -> set:
+    """Шинглы по SHINGLE_SIZE слов из названия, работодателя и описания (город не учитывается)"""
+    snippet = vacancy.get('snippet') or {}
+    text = ' '.join((
+        vacancy.get('name') or '',
+        (vacancy.get('employer') or {}).get('name') or '',
+        html.unescape(TAG_RE.sub(' ', vacancy.get('description') or '')),
+        TAG_RE.sub(' ', snippet.get('requirement') or ''),
+        TAG_RE.sub(' ', snippet.get('responsibility') or ''),
+    ))
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+class MinHasher:
+    """MinHash-сигнатуры: num_perm хэш-функций вида (a*x + b) mod PRIME над crc32 шинглов"""
+
+    def __init__(self, num_perm: int = 64):
+        generator = np.random.default_rng(SEED)
+        self.num_perm = num_perm
+        # a < 2^31 и x < 2^32: произведение помещается в uint64 без переполнения
+        self.a = generator.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.b = generator.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: set):
+        """Сигнатура (uint32[num_perm]) или None, если шинглов слишком мало"""
+        if len(items) < MIN_SHINGLES:
+            return None
+        hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64, count=len(items))
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """Поиск почти одинаковых вакансий (перепубликации под новым ID, в других городах).
+
+    Сигнатура MinHash делится на bands полос; вакансии с совпадающей полосой
+    попадают в одну корзину LSH и становятся кандидатами. Кандидат считается
+    дубликатом, если доля совпадающих значений сигнатур (оценка сходства
+    Жаккара) не меньше threshold. Дубликату назначается канонический ID -
+    ID первой встреченной вакансии группы.
+
+    Индекс хранит не больше max_size последних вакансий (вытесняются
+    добавленные раньше всех) и восстанавливается из PostgreSQL при старте:
+    сигнатуры пересчитываются по raw_data, канонические ID берутся из БД.
+    """
+
+    def __init__(self, max_size: int = 50000, num_perm: int = 64, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) должно делиться на bands ({bands})")
+        self.max_size = max_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.entries = OrderedDict()  # {vacancy_id: (сигнатура, канонический ID)}
+        self.buckets = [{} for _ in range(bands)]  # По полосе: {байты полосы: set(vacancy_id)}
+        self.duplicates_found = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def canonical_ids(self, vacancies: list) -> dict:
+        """{vacancy_id: канонический ID} для пачки вакансий, с добавлением их в индекс"""
+        result = {}
+        for vacancy in vacancies:
+            vacancy_id = str(vacancy['id'])
+            entry = self.entries.get(vacancy_id)
+            if entry is not None:
+                result[vacancy_id] = entry[1]
+                continue
+
+            signature = self.hasher.signature(shingles(vacancy))
+            canonical_id = self._find_original(signature) if signature is not None else None
+            if canonical_id is not None:
+                self.duplicates_found += 1
+                logger.debug(f"Вакансия {vacancy_id} - дубликат {canonical_id}")
+            result[vacancy_id] = canonical_id or vacancy_id
+            self._add(vacancy_id, signature, result[vacancy_id])
+        return result
+
+    async def load_recent(self, days: int = 14):
+        """Перестроить индекс по вакансиям из БД за последние дни"""
+        since = datetime.now() - timedelta(days=days)
+        async with db.session_scope() as session:
+            rows = await vacancy_repo.get_recent_with_canonical(session, since, self.max_size)
+
+        self.entries.clear()
+        self.buckets = [{} for _ in range(self.bands)]
+        # Из БД приходят новые первыми, а вытесняются добавленные первыми
+        for vacancy_id, canonical_id, raw_data in reversed(rows):
+            self._add(vacancy_id, self.hasher.signature(shingles(raw_data or {})), canonical_id or vacancy_id)
+        logger.info(f"Индекс дубликатов: {len(self.entries)} вакансий")
+
+    def stats(self) -> dict:
+        return {'size': len(self.entries), 'max_size': self.max_size, 'duplicates_found': self.duplicates_found}
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _find_original(self, signature: np.ndarray):
+        """Канонический ID самой похожей вакансии с сходством не ниже threshold или None"""
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates |= self.buckets[band].get(key, set())
+        if not candidates:
+            return None
+
+        candidates = list(candidates)
+        signatures = np.stack([self.entries[candidate][0] for candidate in candidates])
+        similarity = (signatures == signature[None, :]).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return self.entries[candidates[best]][1]
+
+    def _add(self, vacancy_id: str, signature, canonical_id: str):
+        self._remove(vacancy_id)
+        if signature is None:
+            return
+        self.entries[vacancy_id] = (signature, canonical_id)
+        for band, key in self._bands(signature):
+            self.buckets[band].setdefault(key, set()).add(vacancy_id)
+
+        while len(self.entries) > self.max_size:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, vacancy_id: str):
+        entry = self.entries.pop(vacancy_id, None)
+        if entry is None:
+            return
+        for band, key in self._bands(entry[0]):
+            bucket = self.buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(vacancy_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+
+_config = load_config()
+duplicate_index = DuplicateIndex(
+    max_size=_config.dedup_index_size,
+    num_perm=_config.dedup_num_perm,
+    bands=_config.dedup_bands,
+    threshold=_config.dedup_threshold
+)
@@ -0,0 +1,115 @@
+from array import array
+from bisect import bisect_left, insort
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.exclusion_repo import exclusion_repo, HIDDEN, BLOCKED
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.cache import LRUCache
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+
+class UserExclusions:
+    """Что пользователь не хочет видеть: отсортированный массив ID скрытых
+    вакансий (8 байт на вакансию, поиск бинарный) и множество работодателей"""
+
+    __slots__ = ('hidden', 'employers')
+
+    def __init__(self, hidden_ids=(), employer_ids=()):
+        self.hidden = array('Q', sorted({int(v) for v in hidden_ids if str(v).isdigit()}))
+        self.employers = set(str(e) for e in employer_ids)
+
+    def hide(self, vacancy_id):
+        if str(vacancy_id).isdigit() and not self.is_hidden(vacancy_id):
+            insort(self.hidden, int(vacancy_id))
+
+    def is_hidden(self, vacancy_id) -> bool:
+        if not str(vacancy_id).isdigit():
+            return False
+        value = int(vacancy_id)
+        position = bisect_left(self.hidden, value)
+        return position < len(self.hidden) and self.hidden[position] == value
+
+    def excludes(self, vacancy: dict) -> bool:
+        """Вакансия (в формате HH API) скрыта или от заблокированного работодателя"""
+        if self.is_hidden(vacancy.get('id', '')):
+            return True
+        employer_id = (vacancy.get('employer') or {}).get('id')
+        return employer_id is not None and str(employer_id) in self.employers
+
+
+class ExclusionService:
+    """Скрытые вакансии и заблокированные работодатели пользователей в памяти.
+
+    Загружаются из БД при первом обращении (для группы пользователей - одним
+    проходом), дальше дополняются на месте при новых скрытиях - и в этом
+    процессе, и по NOTIFY из других (см. ChangeListener).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600):
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, user_id: int) -> UserExclusions:
+        return (await self.get_many([user_id]))[user_id]
+
+    async def get_many(self, user_ids: list) -> dict:
+        """{user_id: UserExclusions}; недостающих пользователей загружает одним запросом на таблицу"""
+        found = {}
+        missing = []
+        for user_id in user_ids:
+            exclusions = self.cache.get(user_id)
+            if exclusions is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = exclusions
+
+        if missing:
+            async with db.session_scope() as session:
+                hidden = await exclusion_repo.get_hidden_ids(session, missing)
+                blocked = await exclusion_repo.get_blocked_employers(session, missing)
+            for user_id in missing:
+                exclusions = UserExclusions(hidden[user_id], blocked[user_id])
+                self.cache.set(user_id, exclusions)
+                found[user_id] = exclusions
+        return found
+
+    async def hide_vacancy(self, user_id: int, vacancy_id: str):
+        async with db.session_scope() as session:
+            await exclusion_repo.hide_vacancy(session, user_id, vacancy_id)
+        self.apply(user_id, HIDDEN, vacancy_id)
+
+    async def block_employer(self, user_id: int, vacancy_id: str):
+        """Заблокировать работодателя вакансии; возвращает его название или None, если не удалось"""
+        async with db.session_scope() as session:
+            vacancy = await vacancy_repo.get_raw_data(session, vacancy_id) or {}
+            employer = vacancy.get('employer') or {}
+            if not employer.get('id'):
+                logger.warning(f"У вакансии {vacancy_id} нет ID работодателя")
+                return None
+            await exclusion_repo.block_employer(session, user_id, employer['id'], employer.get('name'))
+
+        self.apply(user_id, BLOCKED, employer['id'])
+        return employer.get('name') or 'работодатель'
+
+    def filter(self, exclusions: UserExclusions, vacancies: list) -> list:
+        return [vacancy for vacancy in vacancies if not exclusions.excludes(vacancy)]
+
+    def apply(self, user_id: int, kind: str, value):
+        """Дополнить загруженные исключения пользователя; не загруженные подтянутся из БД при обращении"""
+        exclusions = self.cache.get(user_id)
+        if exclusions is None:
+            return
+        if kind == HIDDEN:
+            exclusions.hide(value)
+        elif kind == BLOCKED:
+            exclusions.employers.add(str(value))
+        else:
+            self.invalidate(user_id)
+
+    def invalidate(self, user_id: int):
+        self.cache.invalidate(user_id)
+
+
+_config = load_config()
+exclusions = ExclusionService(max_size=_config.exclusions_cache_size, ttl=_config.exclusions_cache_ttl)
@@ -3,6 +3,7 @@ import asyncio
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
+from src.utils.hh_params import DEFAULT_AREA
 
 logger = logging.getLogger(__name__)
 
@@ -23,17 +24,29 @@ class HHAPIClient:
         if self.session:
             await self.session.close()
 
-    async def search_vacancies(self, text: str, **params) -> List[Dict]:
+    async def search_vacancies(self, text: str = '', **params) -> List[Dict]:
         """Поиск вакансий по параметрам"""
+        data = await self.search_page(text, **params)
+        vacancies = data.get("items", [])
+        if data:
+            logger.info(f"Найдено вакансий: {len(vacancies)}")
+        return vacancies
+
+    async def search_page(self, text: str = '', **params) -> Dict:
+        """Одна страница поиска целиком: items, found, pages, page (пустой словарь при ошибке).
+
+        Параметр со значением None не передается (search_field=None - поиск по всем полям).
+        """
         default_params = {
             "text": text,
-            "area": 1,  # Москва
+            "area": DEFAULT_AREA,
             "per_page": 50,  # Количество результатов
             "page": 0,  # Страница
             "order_by": "publication_time",
             "search_field": "name",  # Искать в названии
         }
         default_params.update(params)
+        default_params = {key: value for key, value in default_params.items() if value is not None}
 
         try:
             async with aiohttp.ClientSession() as session:
@@ -44,17 +57,14 @@ class HHAPIClient:
                 ) as response:
 
                     if response.status == 200:
-                        data = await response.json()
-                        vacancies = data.get("items", [])
-                        logger.info(f"Найдено вакансий: {len(vacancies)}")
-                        return vacancies
+                        return await response.json()
                     else:
                         logger.error(f"Ошибка API: {response.status}")
-                        return []
+                        return {}
 
         except Exception as e:
             logger.error(f"Ошибка запроса к API: {e}")
-            return []
+            return {}
 
     async def get_vacancy_details(self, vacancy_id: str) -> Optional[Dict]:
         """Получить детальную информацию о вакансии"""
@@ -75,6 +85,26 @@ class HHAPIClient:
             logger.error(f"Ошибка получения вакансии {vacancy_id}: {e}")
             return None
 
+    async def get_currency_rates(self) -> Dict[str, float]:
+        """Курсы валют из справочника HH: {код: сколько единиц валюты стоит рубль} (пустой при ошибке)"""
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                        f"{self.BASE_URL}/dictionaries",
+                        headers={"User-Agent": "JobSearchBot/1.0"}
+                ) as response:
+
+                    if response.status == 200:
+                        data = await response.json()
+                        return {c['code']: c['rate'] for c in data.get('currency', []) if c.get('rate')}
+                    else:
+                        logger.error(f"Ошибка получения справочников: {response.status}")
+                        return {}
+
+        except Exception as e:
+            logger.error(f"Ошибка получения курсов валют: {e}")
+            return {}
+
     def format_vacancy_message(self, vacancy: Dict) -> str:
         """Форматирование вакансии в читаемое сообщение"""
         title = vacancy.get('name', 'Без названия')
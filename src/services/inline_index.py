@@ -0,0 +1,130 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from src.core.logger import get_logger
+from src.services.hh_client import hh_client
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+TOKEN_RE = re.compile(r'\w+')
+MIN_PREFIX = 2  # Более короткие слова запроса не сужают поиск, а только замедляют его
+
+
+def tokenize(text: str) -> list:
+    """Слова текста в нижнем регистре (ё -> е)"""
+    return TOKEN_RE.findall((text or '').lower().replace('ё', 'е'))
+
+
+class IndexedVacancy:
+    """Вакансия в индексе: все, что нужно для ответа на inline-запрос"""
+
+    __slots__ = ('vacancy_id', 'published', 'title', 'description', 'url', 'message', 'tokens')
+
+    def __init__(self, vacancy: dict):
+        employer = (vacancy.get('employer') or {}).get('name', '')
+        area = (vacancy.get('area') or {}).get('name', '')
+
+        self.vacancy_id = str(vacancy['id'])
+        self.published = vacancy.get('published_at') or ''  # ISO-строки сравниваются как даты
+        self.title = vacancy.get('name', 'Без названия')
+        self.description = ' · '.join(part for part in (employer, area) if part)
+        self.url = vacancy.get('alternate_url', '')
+        self.message = hh_client.format_vacancy_message(vacancy)
+        self.tokens = frozenset(tokenize(f"{self.title} {employer} {area}"))
+
+
+class InlineVacancyIndex:
+    """Индекс последних полученных вакансий в памяти для inline-режима.
+
+    Инвертированный индекс слово -> ID вакансий по названию, работодателю и
+    городу плюс отсортированный словарь слов для поиска по префиксу. Хранит
+    не больше max_size вакансий: при переполнении вытесняются добавленные
+    раньше всех. Пополняется по мере сохранения вакансий планировщиком и
+    поиском, поэтому запрос не ходит ни в HH, ни в PostgreSQL.
+    """
+
+    def __init__(self, max_size: int = 20000):
+        self.max_size = max_size
+        self.vacancies = OrderedDict()  # {vacancy_id: IndexedVacancy} в порядке добавления
+        self.postings = {}  # {слово: set(vacancy_id)}
+        self.vocabulary = []  # Отсортированные слова для поиска по префиксу
+
+    def __len__(self):
+        return len(self.vacancies)
+
+    def add(self, vacancies: list):
+        """Добавить или обновить вакансии (данные в формате HH API)"""
+        for vacancy in vacancies:
+            try:
+                item = IndexedVacancy(vacancy)
+            except (KeyError, TypeError) as e:
+                logger.debug(f"Вакансия не попала в inline-индекс: {e}")
+                continue
+
+            self._remove(item.vacancy_id)
+            self.vacancies[item.vacancy_id] = item
+            for token in item.tokens:
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = set()
+                    insort(self.vocabulary, token)
+                ids.add(item.vacancy_id)
+
+        while len(self.vacancies) > self.max_size:
+            self._remove(next(iter(self.vacancies)))
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Вакансии, в которых каждое слово запроса - начало какого-то слова; новые первыми"""
+        tokens = [token for token in tokenize(query) if len(token) >= MIN_PREFIX]
+        if not tokens:
+            return []
+
+        matches = None
+        # Начинаем с самых длинных слов - у них меньше совпадений
+        for token in sorted(set(tokens), key=len, reverse=True):
+            ids = self._prefix_ids(token, within=matches)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+
+        best = heapq.nlargest(limit, matches, key=lambda vacancy_id: self.vacancies[vacancy_id].published)
+        return [self.vacancies[vacancy_id] for vacancy_id in best]
+
+    async def load_recent(self, days: int = 3):
+        """Заполнить индекс вакансиями, полученными за последние дни"""
+        since = datetime.now() - timedelta(days=days)
+        async with db.session_scope() as session:
+            vacancies = await vacancy_repo.get_recent(session, since, self.max_size)
+        # Из БД приходят новые первыми, а вытесняются добавленные первыми
+        self.add(list(reversed(vacancies)))
+        logger.info(f"Inline-индекс: {len(self.vacancies)} вакансий, {len(self.vocabulary)} слов")
+
+    def _prefix_ids(self, prefix: str, within: set = None) -> set:
+        """ID вакансий со словами, начинающимися на prefix (в пределах within, если задано)"""
+        ids = set()
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            postings = self.postings[vocabulary[position]]
+            ids |= postings if within is None else postings & within
+            position += 1
+        return ids
+
+    def _remove(self, vacancy_id: str):
+        item = self.vacancies.pop(vacancy_id, None)
+        if item is None:
+            return
+        for token in item.tokens:
+            ids = self.postings[token]
+            ids.discard(vacancy_id)
+            if not ids:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+
+inline_index = InlineVacancyIndex(max_size=load_config().inline_index_size)
@@ -0,0 +1,219 @@
+import html
+import re
+from collections import deque
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TAG_RE = re.compile(r'<[^>]+>')
+COMPACT_RATIO = 2  # Перестроить автомат с нуля, когда ненужных шаблонов в нем больше, чем нужных
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, ё -> е, одиночные пробелы"""
+    return ' '.join((text or '').lower().replace('ё', 'е').split())
+
+
+def vacancy_text(vacancy: dict) -> str:
+    """Название, описание (или фрагменты из поиска) и ключевые навыки вакансии одной строкой"""
+    snippet = vacancy.get('snippet') or {}
+    parts = [
+        vacancy.get('name') or '',
+        html.unescape(TAG_RE.sub(' ', vacancy.get('description') or '')),
+        TAG_RE.sub(' ', snippet.get('requirement') or ''),
+        TAG_RE.sub(' ', snippet.get('responsibility') or ''),
+    ]
+    parts.extend(skill.get('name', '') for skill in vacancy.get('key_skills') or [])
+    # Разделитель - не буква, поэтому слово не "склеится" через границу частей
+    return normalize(' \n '.join(parts))
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик: все вхождения всех шаблонов за один проход по тексту.
+
+    Шаблоны добавляются в бор по одному; суффиксные ссылки пересчитываются
+    обходом в ширину перед первым поиском после изменений. Время поиска -
+    O(длина текста + число вхождений) и не зависит от количества шаблонов.
+    """
+
+    def __init__(self):
+        self.goto = [{}]  # Переходы по символу
+        self.fail = [0]  # Суффиксная ссылка
+        self.output = [None]  # Шаблон, который заканчивается в узле
+        self.dict_link = [0]  # Ближайший по суффиксным ссылкам узел с шаблоном
+        self.patterns = {}  # {шаблон: узел}
+        self.dirty = False
+
+    def add(self, pattern: str):
+        if pattern in self.patterns:
+            return
+        node = 0
+        for char in pattern:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.dict_link.append(0)
+            node = child
+        self.output[node] = pattern
+        self.patterns[pattern] = node
+        self.dirty = True
+
+    def build(self):
+        """Пересчитать суффиксные ссылки (бор уже содержит все шаблоны)"""
+        queue = deque()
+        for child in self.goto[0].values():
+            self.fail[child] = 0
+            self.dict_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                link = self.fail[child]
+                self.dict_link[child] = link if self.output[link] is not None else self.dict_link[link]
+                queue.append(child)
+        self.dirty = False
+
+    def find(self, text: str):
+        """(конец вхождения, шаблон) для всех вхождений"""
+        if self.dirty:
+            self.build()
+
+        goto, fail, output, dict_link = self.goto, self.fail, self.output, self.dict_link
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if output[node] is not None else dict_link[node]
+            while match:
+                yield position, output[match]
+                match = dict_link[match]
+
+
+class KeywordMatcher:
+    """Локальная фильтрация вакансий по ключевым словам пользователей.
+
+    Ключевые слова (фильтр keywords) и слова-исключения (exclude_keywords)
+    всех пользователей собраны в один автомат. Вакансия (название,
+    описание, навыки) просматривается один раз, после чего видно, каким
+    пользователям она подходит: есть хотя бы одно ключевое слово (или
+    ключевых слов нет) и нет ни одного исключения. Совпадают только слова
+    целиком: "java" не находится в "javascript".
+
+    Изменение фильтров пользователя перестраивает автомат, только если
+    появились новые слова: новые шаблоны дописываются в бор, ссылки
+    пересчитываются один раз перед следующим поиском. Ненужные шаблоны
+    остаются в боре до пересборки с нуля, когда их становится больше нужных.
+    """
+
+    def __init__(self):
+        self.automaton = AhoCorasick()
+        self.include = {}  # {шаблон: set(user_id)}
+        self.exclude = {}
+        self.users = {}  # {user_id: (frozenset(включить), frozenset(исключить))}
+
+    def __len__(self):
+        return len(self.users)
+
+    def set_user(self, user_id: int, filters: dict):
+        """Обновить слова пользователя по его фильтрам (без изменений - ничего не делает)"""
+        include = frozenset(self._words(filters.get('keywords')))
+        exclude = frozenset(self._words(filters.get('exclude_keywords')))
+        if not include and not exclude:
+            self.remove_user(user_id)
+            return
+        if self.users.get(user_id) == (include, exclude):
+            return
+
+        self.remove_user(user_id)
+        self.users[user_id] = (include, exclude)
+        for words, index in ((include, self.include), (exclude, self.exclude)):
+            for word in words:
+                index.setdefault(word, set()).add(user_id)
+                self.automaton.add(word)
+
+    def remove_user(self, user_id: int):
+        words = self.users.pop(user_id, None)
+        if words is None:
+            return
+
+        removed = False
+        for user_words, index in zip(words, (self.include, self.exclude)):
+            for word in user_words:
+                users = index[word]
+                users.discard(user_id)
+                if not users:
+                    del index[word]
+                    removed = True
+        if removed:
+            self._compact_if_needed()
+
+    def matched_words(self, vacancy: dict) -> set:
+        """Слова из фильтров пользователей, которые есть в вакансии целыми словами"""
+        text = vacancy_text(vacancy)
+        found = set()
+        for end, word in self.automaton.find(text):
+            start = end - len(word) + 1
+            starts_word = start == 0 or not text[start - 1].isalnum()
+            ends_word = end + 1 == len(text) or not text[end + 1].isalnum()
+            if starts_word and ends_word:
+                found.add(word)
+        return found
+
+    def accepts(self, vacancy: dict, user_ids) -> set:
+        """Те из user_ids, кому вакансия подходит по ключевым словам.
+
+        У вакансии из результатов поиска нет полного описания - слова ищутся
+        в названии, фрагментах описания (snippet) и навыках.
+        """
+        if not self.users:
+            return set(user_ids)
+
+        found = self.matched_words(vacancy)
+        included, excluded = set(), set()
+        for word in found:
+            included |= self.include.get(word, set())
+            excluded |= self.exclude.get(word, set())
+
+        accepted = set()
+        for user_id in user_ids:
+            if user_id in excluded:
+                continue
+            words = self.users.get(user_id)
+            if words is None or not words[0] or user_id in included:
+                accepted.add(user_id)
+        return accepted
+
+    def _words(self, value) -> list:
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = re.split(r'[,\n]', value)
+        return [word for word in (normalize(item) for item in value) if word]
+
+    def _compact_if_needed(self):
+        """Пересобрать автомат только из нужных шаблонов, если ненужных накопилось много"""
+        active = set(self.include) | set(self.exclude)
+        stale = len(self.automaton.patterns) - len(active)
+        if stale <= max(len(active), 1) * (COMPACT_RATIO - 1):
+            return
+
+        automaton = AhoCorasick()
+        for word in active:
+            automaton.add(word)
+        self.automaton = automaton
+        logger.debug(f"Автомат ключевых слов пересобран: {len(active)} шаблонов, удалено {stale}")
+
+
+keyword_matcher = KeywordMatcher()
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.config import load_config
+from src.utils.hh_params import DEFAULT_AREA
+
+logger = get_logger(__name__)
+
+# Регионы HH без вложенных: у вакансии area.id совпадает с ними точно. Для
+# составных (113 - Россия и т.п.) HH ищет по всем вложенным - такие только через HH
+LEAF_AREAS = {'1', '2'}  # Москва, Санкт-Петербург
+
+
+class LocalSearchService:
+    """Поиск по уже сохраненным вакансиям без запроса к HH"""
+
+    def __init__(self):
+        config = load_config()
+        self.max_age = timedelta(seconds=config.local_search_max_age)
+
+    async def search(self, params: dict, limit: int = 20):
+        """Ищет по локальной базе вакансии, полученные за последние max_age.
+
+        Возвращает список вакансий в формате HH или None, если свежих данных
+        меньше limit и нужно идти в HH.
+        """
+        if self.max_age.total_seconds() <= 0:
+            return None
+        # Без региона HH ищет в DEFAULT_AREA - локально так же (см. vacancy_repo.search_local)
+        area = str(params.get('area', DEFAULT_AREA))
+        if area not in LEAF_AREAS:
+            logger.debug(f"Регион {area} составной, нужен запрос к HH")
+            return None
+
+        try:
+            async with db.session_scope() as session:
+                vacancies = await vacancy_repo.search_local(
+                    session, params, since=datetime.now() - self.max_age, limit=limit
+                )
+        except Exception as e:
+            logger.error(f"Ошибка локального поиска: {e}")
+            return None
+
+        if len(vacancies) < limit:
+            logger.debug(f"Локально найдено {len(vacancies)} из {limit}, нужен запрос к HH")
+            return None
+
+        logger.info(f"Найдено локально: {len(vacancies)} вакансий")
+        return vacancies
+
+
+local_search = LocalSearchService()
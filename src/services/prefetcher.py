@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+from src.core.logger import get_logger
+from src.services.hh_client import hh_client
+from src.services.search_sessions import search_sessions, SESSION_TTL
+from src.utils.cache import LRUCache
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+
+class VacancyPrefetcher:
+    """Фоновая подготовка следующих вакансий, пока пользователь читает текущую.
+
+    После показа вакансии i загружает вакансии i+1..i+ahead (из БД, при
+    необходимости - из HH) и кладет готовый текст сообщения в ограниченный
+    кэш. На одну сессию поиска - не больше одной фоновой задачи: новый показ
+    отменяет предыдущую, завершение сессии отменяет ее совсем.
+    """
+
+    def __init__(self, ahead: int = 3, cache_size: int = 1000):
+        self.ahead = ahead
+        self.rendered = LRUCache(max_size=cache_size, ttl=SESSION_TTL)  # {(session_id, index): (vacancy_id, message)}
+        self.tasks = {}  # {session_id: asyncio.Task}
+
+    async def get(self, search, index: int):
+        """(vacancy_id, текст сообщения) для позиции index или None, если вакансии нет"""
+        rendered = self.rendered.get((search.session_id, index))
+        if rendered is None:
+            rendered = await self._render(search, index)
+        return rendered
+
+    def schedule(self, search, index: int):
+        """Начать подготовку вакансий, следующих за index"""
+        if self.ahead <= 0:
+            return
+        self._cancel_task(search.session_id)
+        # Чистый контекст: задача переживет обработчик и не должна видеть его сессию БД
+        self.tasks[search.session_id] = asyncio.create_task(
+            self._prefetch(search, index), context=contextvars.Context()
+        )
+
+    def cancel(self, session_id: str):
+        """Сессия поиска завершена: отменить подготовку и забыть готовые сообщения"""
+        if not session_id:
+            return
+        self._cancel_task(session_id)
+        for key in [key for key in self.rendered.keys() if key[0] == session_id]:
+            self.rendered.invalidate(key)
+
+    async def stop(self):
+        """Отменить все фоновые задачи"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def _cancel_task(self, session_id: str):
+        task = self.tasks.pop(session_id, None)
+        if task:
+            task.cancel()
+
+    async def _prefetch(self, search, index: int):
+        try:
+            for next_index in range(index + 1, index + 1 + self.ahead):
+                key = (search.session_id, next_index)
+                if key in self.rendered:
+                    continue
+                rendered = await self._render(search, next_index)
+                if rendered is None:
+                    break
+                self.rendered.set(key, rendered)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Ошибка предзагрузки для сессии {search.session_id}: {e}")
+        finally:
+            if self.tasks.get(search.session_id) is asyncio.current_task():
+                del self.tasks[search.session_id]
+
+    async def _render(self, search, index: int):
+        vacancy_data = await search_sessions.get_vacancy(search, index)
+        if not vacancy_data and 0 <= index < len(search):
+            # В локальной базе вакансии нет - берем из HH
+            vacancy_data = await hh_client.get_vacancy_details(search.vacancy_id(index))
+        if not vacancy_data:
+            return None
+        return str(vacancy_data.get('id', '')), hh_client.format_vacancy_message(vacancy_data)
+
+
+_config = load_config()
+prefetcher = VacancyPrefetcher(ahead=_config.prefetch_ahead, cache_size=_config.prefetch_cache_size)
@@ -0,0 +1,215 @@
+from datetime import datetime, timezone
+import numpy as np
+from src.core.logger import get_logger
+from src.services.inline_index import tokenize
+from src.utils.config import load_config
+from src.utils.hh_params import build_hh_params
+from src.utils.salary import salary_normalizer
+
+logger = get_logger(__name__)
+
+FEATURES = ('keywords', 'salary', 'experience', 'area', 'schedule', 'recency')
+DEFAULT_WEIGHTS = {
+    'keywords': 0.35,
+    'salary': 0.2,
+    'experience': 0.15,
+    'area': 0.1,
+    'schedule': 0.1,
+    'recency': 0.1,
+}
+UNKNOWN = 0.5  # Оценка признака, о котором вакансия ничего не говорит
+
+# Опыт HH -> порядковый номер (разница номеров - насколько далеко от нужного уровня)
+EXPERIENCE_LEVELS = {'noExperience': 0, 'between1And3': 1, 'between3And6': 2, 'moreThan6': 3}
+
+
+def parse_weights(spec: str) -> dict:
+    """Веса из строки вида "keywords=0.4,salary=0.2"; не указанные берутся по умолчанию"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (spec or '').split(','):
+        name, _, value = part.partition('=')
+        name = name.strip()
+        if not name:
+            continue
+        if name not in weights:
+            logger.warning(f"Неизвестный признак ранжирования: {name}")
+            continue
+        weights[name] = float(value)
+    return weights
+
+
+class RankingProfile:
+    """Что пользователь ищет, в кодах HH: слова, зарплата, опыт, регион, график"""
+
+    __slots__ = ('terms', 'salary', 'experience', 'area', 'schedule')
+
+    def __init__(self, filters: dict):
+        params = build_hh_params(filters)
+        skills = filters.get('skills') or []
+        if isinstance(skills, str):
+            skills = skills.split(',')
+
+        self.terms = set(tokenize(params.get('text', '')))
+        for skill in skills:
+            self.terms.update(tokenize(skill))
+        self.salary = params.get('salary')
+        self.experience = EXPERIENCE_LEVELS.get(params.get('experience'))
+        self.area = str(params['area']) if 'area' in params else None
+        self.schedule = params.get('schedule')
+
+
+class VacancyFeatures:
+    """Признаки страницы вакансий в виде массивов (одна позиция - одна вакансия)"""
+
+    def __init__(self, vacancies: list, now: datetime = None):
+        n = len(vacancies)
+        now = now or datetime.now(timezone.utc)
+
+        self.tokens = []
+        # Зарплата в рублях в месяц на руки - сравнима между валютами
+        self.salary_min, self.salary_max = salary_normalizer.normalize(vacancies)
+        self.experience = np.full(n, np.nan)
+        self.area = np.empty(n, dtype=object)
+        self.schedule = np.empty(n, dtype=object)
+        self.age_hours = np.zeros(n)
+
+        # Разбор JSON неизбежно поштучный; все вычисления оценок - над массивами
+        for i, vacancy in enumerate(vacancies):
+            snippet = vacancy.get('snippet') or {}
+            skills = ' '.join(skill.get('name', '') for skill in vacancy.get('key_skills') or [])
+            self.tokens.append(set(tokenize(
+                f"{vacancy.get('name', '')} {snippet.get('requirement') or ''} "
+                f"{snippet.get('responsibility') or ''} {skills}"
+            )))
+
+            level = EXPERIENCE_LEVELS.get((vacancy.get('experience') or {}).get('id'))
+            if level is not None:
+                self.experience[i] = level
+            self.area[i] = str((vacancy.get('area') or {}).get('id', ''))
+            self.schedule[i] = (vacancy.get('schedule') or {}).get('id')
+
+            try:
+                published = datetime.strptime(vacancy.get('published_at') or '', '%Y-%m-%dT%H:%M:%S%z')
+                self.age_hours[i] = max((now - published).total_seconds() / 3600, 0)
+            except ValueError:
+                self.age_hours[i] = np.nan
+
+
+class VacancyRanker:
+    """Оценка соответствия вакансий пользователям и отбор лучших.
+
+    Страница вакансий сравнивается сразу со всеми пользователями группы:
+    каждый признак - матрица (пользователи x вакансии) в [0, 1], итоговая
+    оценка - их взвешенная сумма. top_k ограничивает число отправляемых
+    вакансий на пользователя за проверку (0 - без ограничения, только
+    порядок). Не вошедшие в top_k нигде не сохраняются и со следующей
+    страницей обычно уже не приходят.
+    """
+
+    def __init__(self, weights: dict = None, top_k: int = 0, half_life_hours: float = 24):
+        self.weights = weights or dict(DEFAULT_WEIGHTS)
+        self.top_k = top_k
+        self.half_life_hours = half_life_hours
+
+    def score(self, vacancies: list, profiles: list) -> np.ndarray:
+        """Матрица оценок (пользователи x вакансии)"""
+        features = VacancyFeatures(vacancies)
+        matrices = {
+            'keywords': self._keywords(features, profiles),
+            'salary': self._salary(features, profiles),
+            'experience': self._experience(features, profiles),
+            'area': self._match(features.area, [profile.area for profile in profiles]),
+            'schedule': self._match(features.schedule, [profile.schedule for profile in profiles]),
+            'recency': np.broadcast_to(self._recency(features), (len(profiles), len(vacancies))),
+        }
+        total = np.zeros((len(profiles), len(vacancies)))
+        for name in FEATURES:
+            total += self.weights.get(name, 0) * matrices[name]
+        return total
+
+    def select(self, vacancies: list, profiles: dict, candidates: dict) -> dict:
+        """{user_id: [вакансии]} - лучшие из кандидатов пользователя, по убыванию оценки.
+
+        profiles - {user_id: RankingProfile}, candidates - {user_id: set(ID вакансий)}.
+        """
+        user_ids = [user_id for user_id in profiles if candidates.get(user_id)]
+        if not user_ids or not vacancies:
+            return {user_id: [] for user_id in profiles}
+
+        scores = self.score(vacancies, [profiles[user_id] for user_id in user_ids])
+
+        column = {str(vacancy['id']): i for i, vacancy in enumerate(vacancies)}
+        rows, columns = [], []
+        for row, user_id in enumerate(user_ids):
+            indexes = [column[vacancy_id] for vacancy_id in candidates[user_id] if vacancy_id in column]
+            rows.extend([row] * len(indexes))
+            columns.extend(indexes)
+        allowed = np.zeros(scores.shape, dtype=bool)
+        allowed[rows, columns] = True
+        scores = np.where(allowed, scores, -np.inf)
+
+        limit = min(self.top_k or len(vacancies), len(vacancies))
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :limit]
+        counts = np.minimum(allowed.sum(axis=1), limit).tolist()
+        selected = {user_id: [] for user_id in profiles}
+        for row, user_id in enumerate(user_ids):
+            selected[user_id] = [vacancies[i] for i in order[row, :counts[row]].tolist()]
+        return selected
+
+    def _keywords(self, features: VacancyFeatures, profiles: list) -> np.ndarray:
+        """Доля слов профиля, встречающихся в названии, описании и навыках вакансии"""
+        terms = sorted(set().union(*(profile.terms for profile in profiles)))
+        if not terms:
+            return np.full((len(profiles), len(features.tokens)), UNKNOWN)
+
+        position = {term: i for i, term in enumerate(terms)}
+        wanted = np.zeros((len(profiles), len(terms)))
+        for row, profile in enumerate(profiles):
+            wanted[row, [position[term] for term in profile.terms]] = 1
+
+        # Вхождения через словарь терминов: пересечение множеств на вакансию, без цикла термины x вакансии
+        rows, columns = [], []
+        for i, tokens in enumerate(features.tokens):
+            hits = [position[term] for term in tokens.intersection(position)]
+            rows.extend([i] * len(hits))
+            columns.extend(hits)
+        present = np.zeros((len(features.tokens), len(terms)))
+        present[rows, columns] = 1
+        counts = wanted.sum(axis=1, keepdims=True)
+        overlap = wanted @ present.T
+        return np.where(counts > 0, overlap / np.maximum(counts, 1), UNKNOWN)
+
+    def _salary(self, features: VacancyFeatures, profiles: list) -> np.ndarray:
+        """1 - вилка достигает желаемой зарплаты, иначе доля от нее; без зарплаты - UNKNOWN"""
+        wanted = np.array([profile.salary or np.nan for profile in profiles], dtype=float)[:, None]
+        upper = features.salary_max[None, :]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fit = np.clip(upper / wanted, 0, 1)
+        fit = np.where(np.isnan(upper), UNKNOWN, fit)
+        return np.where(np.isnan(wanted), 1.0, fit)
+
+    def _experience(self, features: VacancyFeatures, profiles: list) -> np.ndarray:
+        """1 - тот же уровень, каждая ступень разницы снижает оценку на треть"""
+        wanted = np.array([np.nan if p.experience is None else p.experience for p in profiles], dtype=float)[:, None]
+        distance = np.abs(wanted - features.experience[None, :])
+        fit = 1 - distance / (len(EXPERIENCE_LEVELS) - 1)
+        fit = np.where(np.isnan(features.experience)[None, :], UNKNOWN, fit)
+        return np.where(np.isnan(wanted), 1.0, fit)
+
+    def _match(self, values: np.ndarray, wanted: list) -> np.ndarray:
+        """1 - совпадает или пользователю все равно, 0 - не совпадает"""
+        wanted = np.array(wanted, dtype=object)[:, None]
+        return ((wanted == None) | (wanted == values[None, :])).astype(float)  # noqa: E711
+
+    def _recency(self, features: VacancyFeatures) -> np.ndarray:
+        """Свежесть: вдвое меньше каждые half_life_hours часов"""
+        recency = np.power(0.5, features.age_hours / self.half_life_hours)
+        return np.where(np.isnan(recency), UNKNOWN, recency)
+
+
+_config = load_config()
+vacancy_ranker = VacancyRanker(
+    weights=parse_weights(_config.ranking_weights),
+    top_k=_config.ranking_top_k,
+    half_life_hours=_config.ranking_half_life_hours
+)
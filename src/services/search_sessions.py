@@ -0,0 +1,199 @@
+import asyncio
+import secrets
+from array import array
+from datetime import datetime
+from src.core.logger import get_logger
+from src.services.hh_client import hh_client
+from src.services.inline_index import inline_index
+from src.services.local_search import local_search
+from src.services.state_store import state_store
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.cache import LRUCache
+
+logger = get_logger(__name__)
+
+PAGE_SIZE = 20
+MAX_SESSIONS = 10000
+SESSION_TTL = 3600  # Сессия поиска живет час с последнего обращения
+SEARCH_STATE = 'search'  # {session_id: состояние сессии} в хранилище состояния
+ACTIVE_SEARCH_STATE = 'active_search'  # {user_id: session_id}
+
+
+class SearchSession:
+    """Состояние одного поиска: параметры, курсор и только ID найденных вакансий"""
+
+    __slots__ = ('session_id', 'user_id', 'params', 'source', 'vacancy_ids',
+                 'next_page', 'total', 'exhausted', 'since', 'lock')
+
+    def __init__(self, session_id: str, user_id: int, params: dict):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.params = params
+        self.source = 'hh'  # 'hh' или 'local'
+        self.vacancy_ids = array('Q')  # ID вакансий HH - числа, 8 байт на вакансию
+        self.next_page = 0  # Следующая страница HH
+        self.total = 0  # Всего найдено
+        self.exhausted = False  # Больше страниц нет
+        self.since = None  # Граница свежести для локального поиска
+        self.lock = asyncio.Lock()  # Подгрузку страниц ведут и обработчик, и предзагрузка
+
+    def __len__(self):
+        return len(self.vacancy_ids)
+
+    def vacancy_id(self, index: int) -> str:
+        return str(self.vacancy_ids[index])
+
+    def index_of(self, vacancy_id: str) -> int:
+        """Позиция вакансии в результатах (0, если не найдена)"""
+        try:
+            return self.vacancy_ids.index(int(vacancy_id))
+        except ValueError:
+            return 0
+
+    def to_state(self) -> dict:
+        """Состояние для хранилища (JSON)"""
+        return {
+            'user_id': self.user_id,
+            'params': self.params,
+            'source': self.source,
+            'vacancy_ids': self.vacancy_ids.tolist(),
+            'next_page': self.next_page,
+            'total': self.total,
+            'exhausted': self.exhausted,
+            'since': self.since.isoformat() if self.since else None
+        }
+
+    @classmethod
+    def from_state(cls, session_id: str, state: dict) -> 'SearchSession':
+        search = cls(session_id, state['user_id'], state['params'])
+        search.source = state['source']
+        search.vacancy_ids = array('Q', state['vacancy_ids'])
+        search.next_page = state['next_page']
+        search.total = state['total']
+        search.exhausted = state['exhausted']
+        search.since = datetime.fromisoformat(state['since']) if state['since'] else None
+        return search
+
+    def add(self, vacancies: list):
+        for vacancy in vacancies:
+            try:
+                self.vacancy_ids.append(int(vacancy['id']))
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Пропущена вакансия с некорректным ID: {vacancy.get('id')}")
+
+
+class SearchSessionStore:
+    """Сессии поиска в памяти: ограничены по количеству и времени жизни.
+
+    Следующая страница результатов подгружается (из локальной базы или HH)
+    только когда пользователь до нее долистал. Сами вакансии хранятся в БД.
+    Активная сессия пользователя запоминается в хранилище состояния; если
+    оно общее для процессов бота, туда же пишется и сама сессия, и ее
+    может продолжить любой процесс.
+    """
+
+    def __init__(self, max_size: int = MAX_SESSIONS, ttl: int = SESSION_TTL, page_size: int = PAGE_SIZE):
+        self.sessions = LRUCache(max_size=max_size, ttl=ttl)
+        self.page_size = page_size
+
+    async def get(self, session_id: str):
+        """Сессия по ID (продлевает ее жизнь) или None, если истекла"""
+        if not session_id:
+            return None
+        search = self.sessions.get(session_id)
+        if search is None and state_store.shared:
+            state = await state_store.get(SEARCH_STATE, session_id)
+            if state is not None:
+                search = SearchSession.from_state(session_id, state)
+        if search is not None:
+            self.sessions.set(session_id, search)
+        return search
+
+    async def active_session_id(self, user_id: int):
+        """ID последней сессии поиска пользователя"""
+        return await state_store.get(ACTIVE_SEARCH_STATE, user_id)
+
+    async def get_active(self, user_id: int):
+        """Последняя сессия поиска пользователя или None"""
+        return await self.get(await self.active_session_id(user_id))
+
+    async def start(self, user_id: int, params: dict) -> SearchSession:
+        """Создать сессию поиска и загрузить первую страницу"""
+        session_id = secrets.token_urlsafe(6)
+        search = SearchSession(session_id, user_id, params)
+
+        # Первая страница из локальной базы, если там достаточно свежих данных
+        local = await local_search.search(params, limit=self.page_size)
+        if local is not None:
+            search.source = 'local'
+            search.since = datetime.now() - local_search.max_age
+            search.add(local)
+            async with db.session_scope() as session:
+                search.total = await vacancy_repo.count_local(session, params, search.since)
+            search.exhausted = len(search) >= search.total
+        else:
+            await self._fetch_hh_page(search)
+
+        self.sessions.set(session_id, search)
+        await self._save(search)
+        await state_store.set(ACTIVE_SEARCH_STATE, user_id, session_id, ttl=self.sessions.ttl)
+        logger.info(f"Сессия поиска {session_id} для {user_id}: {search.total} вакансий ({search.source})")
+        return search
+
+    async def ensure_loaded(self, search: SearchSession, index: int) -> bool:
+        """Догрузить страницы, пока вакансия index не окажется в сессии"""
+        if index < len(search):
+            return True
+        async with search.lock:
+            loaded_before = len(search)
+            while index >= len(search) and not search.exhausted:
+                loaded = len(search)
+                if search.source == 'local':
+                    await self._fetch_local_page(search)
+                else:
+                    await self._fetch_hh_page(search)
+                if len(search) == loaded:
+                    search.exhausted = True
+            if len(search) != loaded_before or search.exhausted:
+                await self._save(search)
+        return index < len(search)
+
+    async def get_vacancy(self, search: SearchSession, index: int):
+        """Данные вакансии по позиции в результатах (или None)"""
+        if index < 0 or not await self.ensure_loaded(search, index):
+            return None
+        async with db.session_scope() as session:
+            return await vacancy_repo.get_raw_data(session, search.vacancy_id(index))
+
+    async def _save(self, search: SearchSession):
+        """Записать сессию в общее хранилище состояния (если оно общее)"""
+        if state_store.shared:
+            await state_store.set(SEARCH_STATE, search.session_id, search.to_state(), ttl=self.sessions.ttl)
+
+    async def _fetch_hh_page(self, search: SearchSession):
+        params = dict(search.params, page=search.next_page, per_page=self.page_size)
+        data = await hh_client.search_page(**params)
+        vacancies = data.get('items', [])
+
+        if vacancies:
+            async with db.session_scope() as session:
+                await vacancy_repo.save_vacancies(session, vacancies)
+            inline_index.add(vacancies)
+            search.add(vacancies)
+
+        # HH отдает не больше pages * per_page результатов, даже если found больше
+        search.total = min(data.get('found', 0), data.get('pages', 0) * self.page_size) or len(search)
+        search.next_page += 1
+        search.exhausted = not vacancies or search.next_page >= data.get('pages', 0)
+
+    async def _fetch_local_page(self, search: SearchSession):
+        async with db.session_scope() as session:
+            vacancies = await vacancy_repo.search_local(
+                session, search.params, search.since, limit=self.page_size, offset=len(search)
+            )
+        search.add(vacancies)
+        search.exhausted = len(vacancies) < self.page_size
+
+
+search_sessions = SearchSessionStore()
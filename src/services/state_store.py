@@ -0,0 +1,83 @@
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.state_repo import state_repo
+from src.utils.cache import LRUCache
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+
+class MemoryStateStore:
+    """Состояние диалогов в памяти процесса: ограничено по размеру, записи истекают по TTL.
+
+    Подходит для одного процесса бота; при перезапуске состояние теряется.
+    """
+
+    shared = False  # Другие процессы бота этого состояния не видят
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600):
+        self.ttl = ttl
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, namespace: str, key, default=None):
+        return self.cache.get((namespace, str(key)), default)
+
+    async def set(self, namespace: str, key, value, ttl: float = None):
+        self.cache.set((namespace, str(key)), value, ttl=ttl)
+
+    async def pop(self, namespace: str, key, default=None):
+        value = self.cache.get((namespace, str(key)), default)
+        self.cache.invalidate((namespace, str(key)))
+        return value
+
+    async def delete(self, namespace: str, key):
+        self.cache.invalidate((namespace, str(key)))
+
+    async def purge_expired(self) -> int:
+        """Истекшие записи вытесняются сами при обращении и переполнении"""
+        return 0
+
+
+class PostgresStateStore:
+    """Состояние диалогов в UNLOGGED-таблице conversation_state.
+
+    Общее для всех процессов бота и переживает их перезапуск. Значения -
+    JSON-совместимые объекты. Запись идет в транзакции текущего апдейта.
+    """
+
+    shared = True
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+
+    async def get(self, namespace: str, key, default=None):
+        async with db.session_scope() as session:
+            value = await state_repo.get(session, namespace, str(key))
+        return default if value is None else value
+
+    async def set(self, namespace: str, key, value, ttl: float = None):
+        async with db.session_scope() as session:
+            await state_repo.set(session, namespace, str(key), value, self.ttl if ttl is None else ttl)
+
+    async def pop(self, namespace: str, key, default=None):
+        async with db.session_scope() as session:
+            value = await state_repo.pop(session, namespace, str(key))
+        return default if value is None else value
+
+    async def delete(self, namespace: str, key):
+        await self.pop(namespace, key)
+
+    async def purge_expired(self) -> int:
+        async with db.session_scope() as session:
+            return await state_repo.delete_expired(session)
+
+
+def _create_state_store():
+    """Хранилище состояния по настройке STATE_STORE: 'memory' или 'postgres'"""
+    config = load_config()
+    if config.state_store == 'postgres':
+        return PostgresStateStore(ttl=config.state_ttl)
+    return MemoryStateStore(max_size=config.state_max_size, ttl=config.state_ttl)
+
+
+state_store = _create_state_store()
@@ -0,0 +1,139 @@
+import asyncio
+from sqlalchemy.exc import IntegrityError, DataError
+from src.core.logger import get_logger
+from src.storage.database import db
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.utils.config import load_config
+
+logger = get_logger(__name__)
+
+_STOP = object()  # Маркер остановки в очереди
+MAX_RETRY_DELAY = 30  # Сек. между повторами записи пачки при недоступной БД
+STOP_RETRIES = 3  # Попыток записи пачки, когда буфер уже останавливается
+
+
+class WriteBehindBuffer:
+    """Отложенная пакетная запись действий пользователя в БД.
+
+    Обработчики кладут записи в очередь и сразу отвечают пользователю.
+    Фоновая задача пишет накопленное пачкой раз в flush_interval секунд
+    или по достижении batch_size записей. Очередь ограничена max_queue:
+    при переполнении добавление ждет, пока запись догонит (backpressure).
+    При остановке все, что уже в очереди, дописывается.
+
+    Ошибка данных в отметках одного пользователя (нет пользователя или
+    вакансии) отбрасывает только их: каждый шаг пачки - в своей точке сохранения.
+    При временной ошибке (БД недоступна) пачка не теряется, а пишется
+    повторно с растущей паузой.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, batch_size: int = 100, max_queue: int = 10000):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.is_running = False
+        self.task = None
+
+    async def start(self):
+        self.is_running = True
+        self.task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Отложенная запись запущена: каждые {self.flush_interval} сек. "
+                    f"или {self.batch_size} записей")
+
+    async def stop(self):
+        """Дописать очередь и остановиться"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        await self.queue.put(_STOP)
+        await self.task
+        logger.info("Отложенная запись остановлена")
+
+    async def mark_notified(self, user_id: int, vacancy_id: str):
+        """Отметить вакансию как показанную пользователю"""
+        await self._put(('notified', user_id, str(vacancy_id)))
+
+    async def _put(self, item):
+        if self.is_running:
+            await self.queue.put(item)
+        else:
+            # Буфер не запущен - пишем сразу
+            await self._write_with_retry([item])
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._write_with_retry(batch)
+            if stop:
+                return
+
+    async def _write_with_retry(self, batch: list):
+        """Писать пачку, пока не получится; при остановке - не больше STOP_RETRIES попыток"""
+        delay = self.flush_interval
+        attempt = 1
+        while not await self._write(batch):
+            if not self.is_running and attempt >= STOP_RETRIES:
+                logger.error(f"Отложенная запись: {len(batch)} записей потеряно при остановке")
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+            attempt += 1
+
+    async def _write(self, batch: list) -> bool:
+        """Записать пачку одной транзакцией, отметки - по одному запросу на пользователя.
+
+        Возвращает False при временной ошибке - пачку нужно записать повторно.
+        """
+        notified = {}  # {user_id: [vacancy_id, ...]}
+        for item in batch:
+            if item[0] == 'notified':
+                notified.setdefault(item[1], []).append(item[2])
+
+        try:
+            async with db.session_scope() as session:
+                for user_id, vacancy_ids in notified.items():
+                    await self._write_step(session, f"отметки пользователя {user_id}",
+                                           vacancy_repo.mark_as_notified_many, session, user_id, vacancy_ids)
+            logger.debug(f"Записано отложенно: {len(batch)} записей")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка отложенной записи ({len(batch)} записей, будет повтор): {e}")
+            return False
+
+    async def _write_step(self, session, description: str, write, *args):
+        """Шаг пачки в точке сохранения: ошибка данных отбрасывает только этот шаг"""
+        try:
+            async with session.begin_nested():
+                await write(*args)
+        except (IntegrityError, DataError) as e:
+            logger.error(f"Отложенная запись: отброшены {description}: {e}")
+
+
+_config = load_config()
+write_behind = WriteBehindBuffer(
+    flush_interval=_config.write_behind_interval_ms / 1000,
+    batch_size=_config.write_behind_batch,
+    max_queue=_config.write_behind_max_queue
+)
@@ -1,12 +1,40 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.sql import text
+from sqlalchemy.sql import text, bindparam
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
 from src.utils.config import load_config
-from src.storage.models import Base
+from src.storage.models import Base, VACANCY_SEARCH_VECTOR_SQL
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Сессия текущей единицы работы (цикл планировщика или обработка апдейта)
+_current_session: ContextVar = ContextVar('current_session', default=None)
+
+# Колонки, добавленные после создания таблиц (create_all не меняет существующие таблицы)
+SCHEMA_UPGRADES = [
+    "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({VACANCY_SEARCH_VECTOR_SQL}) STORED",
+    "ALTER TABLE user_vacancies ADD COLUMN IF NOT EXISTS saved boolean NOT NULL DEFAULT false",
+    "ALTER TABLE user_vacancies ADD COLUMN IF NOT EXISTS hidden boolean NOT NULL DEFAULT false",
+    "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS salary_min_rub integer",
+    "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS salary_max_rub integer",
+    "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS canonical_id varchar(50)",
+]
+
+# Пул соединений: каждый обрабатываемый апдейт держит соединение своей единицы работы,
+# сверх этого остаются соединения для планировщика, отложенной записи и фоновых задач
+POOL_SIZE = 10
+BACKGROUND_CONNECTIONS = 10
+
+# Каналы LISTEN/NOTIFY, payload - telegram_id пользователя
+FILTERS_CHANNEL = 'filters_changed'
+USERS_CHANNEL = 'users_changed'
+EXCLUSIONS_CHANNEL = 'exclusions_changed'  # Скрытые вакансии и работодатели
+
 
 class Database:
     def __init__(self):
@@ -27,8 +55,8 @@ class Database:
         self.engine = create_async_engine(
             database_url,
             echo=False,  # True для отладки SQL запросов
-            pool_size=10,
-            max_overflow=20
+            pool_size=POOL_SIZE,
+            max_overflow=max(20, self.config.max_concurrent_updates + BACKGROUND_CONNECTIONS - POOL_SIZE)
         )
 
         # Создаем фабрику сессий
@@ -43,12 +71,86 @@ class Database:
     async def create_tables(self):
         """Создает все таблицы в БД"""
         async with self.engine.begin() as conn:
+            # Нужно для триграммных индексов (поиск по названию через ILIKE)
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(Base.metadata.create_all)
+            for statement in SCHEMA_UPGRADES:
+                await conn.execute(text(statement))
+            # create_all не добавляет индексы в уже существующие таблицы
+            await conn.run_sync(self._create_missing_indexes)
         logger.info("✅ Таблицы созданы")
 
-    async def get_session(self):
-        """Возвращает сессию для работы с БД"""
+    @staticmethod
+    def _create_missing_indexes(conn):
+        """Создает индексы, которых еще нет в существующих таблицах"""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """Единица работы: одна сессия и одна транзакция на весь блок.
+
+        Вложенные вызовы переиспользуют уже открытую сессию, поэтому все
+        репозитории внутри одного апдейта или цикла планировщика работают
+        в общей транзакции. Репозитории делают только flush, коммит - здесь,
+        при любой ошибке транзакция целиком откатывается.
+        """
+        session = _current_session.get()
+        if session is not None:
+            yield session
+            return
+
         async with self.async_session() as session:
+            token = _current_session.set(session)
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                _current_session.reset(token)
+
+    @asynccontextmanager
+    async def advisory_locks(self, keys: list, wait: bool = True):
+        """Транзакционные advisory-блокировки PostgreSQL по ключам - общие для всех процессов бота.
+
+        Берутся на отдельном соединении вне единицы работы и держатся до выхода
+        из блока. Ключи блокируются по возрастанию, поэтому пересекающиеся наборы
+        не дают взаимной блокировки. Отдает True, если блокировки взяты; при
+        wait=False не ждет и отдает False, если какой-то ключ уже занят.
+        """
+        keys = sorted(set(keys))
+        if not keys:
+            yield True
+            return
+
+        if wait:
+            stmt = text("SELECT pg_advisory_xact_lock(key) FROM unnest(:keys) AS key")
+        else:
+            stmt = text("SELECT bool_and(pg_try_advisory_xact_lock(key)) FROM unnest(:keys) AS key")
+        stmt = stmt.bindparams(bindparam('keys', keys, type_=ARRAY(BigInteger)))
+
+        async with self.engine.connect() as conn:
+            async with conn.begin():
+                result = await conn.execute(stmt)
+                yield True if wait else bool(result.scalar())
+
+    async def notify(self, session: AsyncSession, channel: str, payload):
+        """NOTIFY в рамках текущей транзакции: доставляется слушателям только после коммита"""
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {'channel': channel, 'payload': str(payload)}
+        )
+
+    def current_session(self):
+        """Возвращает сессию текущей единицы работы (или None)"""
+        return _current_session.get()
+
+    async def get_session(self):
+        """Возвращает сессию для работы с БД (совместимость со старым кодом)"""
+        async with self.session_scope() as session:
             yield session
 
 
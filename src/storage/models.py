@@ -1,7 +1,8 @@
-from sqlalchemy import Column, BigInteger, String, Text, Boolean, JSON, DateTime, Integer, ForeignKey, Index
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, BigInteger, String, Text, Boolean, JSON, DateTime, Integer, Float, ForeignKey, Index, Computed
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func, false
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 Base = declarative_base()
 
@@ -39,6 +40,55 @@ class UserFilter(Base):
         return f"<UserFilter {self.telegram_id}:{self.filter_name}={self.filter_value}>"
 
 
+class UserFilterDocument(Base):
+    """Все фильтры пользователя одним JSONB-документом (режим FILTER_STORAGE=document)"""
+    __tablename__ = 'user_filter_docs'
+
+    telegram_id = Column(BigInteger, primary_key=True)
+    filters = Column(JSONB, nullable=False, default=dict)  # {'profession': 'Python', ...}
+    hh_params = Column(JSONB)  # Готовые параметры HH API
+    params_hash = Column(String(40))  # Хэш hh_params для группировки одинаковых запросов
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index('idx_user_filter_docs_params_hash', 'params_hash'),)
+
+    def __repr__(self):
+        return f"<UserFilterDocument {self.telegram_id}: {self.filters}>"
+
+
+class ConversationState(Base):
+    """Временное состояние диалога (ожидание ввода, сессия поиска) для режима STATE_STORE=postgres.
+
+    Таблица UNLOGGED: не пишется в WAL и очищается после аварийного рестарта
+    PostgreSQL - для короткоживущего состояния это допустимо.
+    """
+    __tablename__ = 'conversation_state'
+
+    namespace = Column(String(32), primary_key=True)  # 'filter_input', 'search', ...
+    key = Column(String(64), primary_key=True)
+    value = Column(JSONB, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_conversation_state_expires_at', 'expires_at'),
+        {'prefixes': ['UNLOGGED']}
+    )
+
+    def __repr__(self):
+        return f"<ConversationState {self.namespace}:{self.key}>"
+
+# Полнотекстовый индекс вакансии: название (русская и английская морфология),
+# работодатель и фрагменты требований/обязанностей из ответа HH
+VACANCY_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(employer_name, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, "
+    "coalesce(raw_data->'snippet'->>'requirement', '') || ' ' || "
+    "coalesce(raw_data->'snippet'->>'responsibility', '')), 'C')"
+)
+
+
 class Vacancy(Base):
     __tablename__ = 'vacancies'
 
@@ -48,6 +98,11 @@ class Vacancy(Base):
     salary_from = Column(Integer)
     salary_to = Column(Integer)
     salary_currency = Column(String(10))
+    # Зарплата в рублях в месяц на руки (см. SalaryNormalizer) - для фильтров и сортировки
+    salary_min_rub = Column(Integer)
+    salary_max_rub = Column(Integer)
+    # ID первой вакансии группы почти одинаковых (см. DuplicateIndex); NULL - вакансия сама первая
+    canonical_id = Column(String(50))
     area = Column(String(100))
     experience = Column(String(50))
     schedule = Column(String(50))
@@ -55,10 +110,29 @@ class Vacancy(Base):
     raw_data = Column(JSON)  # Все данные от API
     published_at = Column(DateTime)  # Когда опубликована на HH
     fetched_at = Column(DateTime, default=func.now())  # Когда мы получили
+    # Вычисляется самой БД; не загружаем без необходимости
+    search_vector = deferred(Column(TSVECTOR, Computed(VACANCY_SEARCH_VECTOR_SQL, persisted=True)))
 
     # Связь с пользователями
     users = relationship("UserVacancy", back_populates="vacancy")
 
+    __table_args__ = (
+        # Свежие вакансии первыми (ORDER BY published_at DESC NULLS LAST)
+        Index('idx_vacancies_published_at', published_at.desc().nulls_last()),
+        # Поиск по названию через ILIKE '%...%' (расширение pg_trgm)
+        Index('idx_vacancies_title_trgm', title,
+              postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        # Отбор по возрасту для горячих запросов и архивации по месяцам
+        Index('idx_vacancies_fetched_at', fetched_at),
+        # Локальный полнотекстовый поиск
+        Index('idx_vacancies_search_vector', search_vector, postgresql_using='gin'),
+        # Фильтр "зарплата от" (salary_max_rub >= X) и диапазоны по нормализованной зарплате
+        Index('idx_vacancies_salary_rub', salary_max_rub, salary_min_rub,
+              postgresql_where=salary_max_rub.is_not(None)),
+        # Была ли у пользователя любая вакансия из группы дубликатов (см. get_notified_canonical)
+        Index('idx_vacancies_canonical', func.coalesce(canonical_id, hh_id)),
+    )
+
     def __repr__(self):
         return f"<Vacancy {self.hh_id}: {self.title[:30]}...>"
 
@@ -72,11 +146,52 @@ class UserVacancy(Base):
     notified = Column(Boolean, default=False)  # Отправлено уведомление?
     cover_sent = Column(Boolean, default=False)  # Отправлено сопроводительное?
     interested = Column(Boolean, default=True)  # Пользователь заинтересован?
+    saved = Column(Boolean, nullable=False, default=False, server_default=false())  # В избранном
+    hidden = Column(Boolean, nullable=False, default=False, server_default=false())  # Скрыта пользователем
     created_at = Column(DateTime, default=func.now())
 
     # Связи
     user = relationship("User", back_populates="vacancies")
     vacancy = relationship("Vacancy", back_populates="users")
 
+    __table_args__ = (
+        Index('idx_user_vacancies_user_notified', 'user_id', 'notified'),
+        # Удаление связей при архивации вакансий
+        Index('idx_user_vacancies_vacancy', 'vacancy_id'),
+        # История с keyset-пагинацией: (created_at, vacancy_id) < курсор, без обращения к таблице
+        Index('idx_user_vacancies_history', user_id, created_at.desc(), vacancy_id.desc(),
+              postgresql_include=['saved', 'hidden']),
+        # Избранное - частичный индекс только по сохраненным
+        Index('idx_user_vacancies_saved', user_id, created_at.desc(), vacancy_id.desc(),
+              postgresql_where=saved),
+        # Загрузка скрытых вакансий пользователя для фильтра уведомлений
+        Index('idx_user_vacancies_hidden', user_id, vacancy_id, postgresql_where=hidden),
+    )
+
     def __repr__(self):
         return f"<UserVacancy user:{self.user_id} vacancy:{self.vacancy_id}>"
+
+
+class BlockedEmployer(Base):
+    """Работодатель, вакансии которого пользователь не хочет получать"""
+    __tablename__ = 'blocked_employers'
+
+    user_id = Column(BigInteger, ForeignKey('users.telegram_id'), primary_key=True)
+    employer_id = Column(String(50), primary_key=True)  # ID работодателя на HH
+    employer_name = Column(String(500))
+    created_at = Column(DateTime, default=func.now())
+
+    def __repr__(self):
+        return f"<BlockedEmployer user:{self.user_id} employer:{self.employer_id}>"
+
+
+class CurrencyRate(Base):
+    """Курс валюты из справочника HH: сколько единиц валюты стоит один рубль"""
+    __tablename__ = 'currency_rates'
+
+    code = Column(String(10), primary_key=True)  # 'RUR', 'USD', 'EUR', 'KZT', ...
+    rate = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CurrencyRate {self.code}: {self.rate}>"
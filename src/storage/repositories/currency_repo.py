@@ -0,0 +1,33 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.storage.models import CurrencyRate
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CurrencyRepository:
+    """Репозиторий курсов валют (currency_rates)"""
+
+    async def get_rates(self, session: AsyncSession) -> dict:
+        """{код валюты: курс}"""
+        result = await session.execute(select(CurrencyRate.code, CurrencyRate.rate))
+        return {code: rate for code, rate in result}
+
+    async def save_rates(self, session: AsyncSession, rates: dict):
+        """Записать курсы одним INSERT ... ON CONFLICT DO UPDATE"""
+        if not rates:
+            return
+        stmt = pg_insert(CurrencyRate).values(
+            [{'code': code, 'rate': rate} for code, rate in rates.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CurrencyRate.code],
+            set_={'rate': stmt.excluded.rate, 'updated_at': func.now()}
+        )
+        await session.execute(stmt)
+        await session.flush()
+
+
+currency_repo = CurrencyRepository()
@@ -0,0 +1,57 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, any_, bindparam, BigInteger
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from src.storage.models import UserVacancy, BlockedEmployer
+from src.storage.database import db, EXCLUSIONS_CHANNEL
+from src.storage.repositories.vacancy_repo import vacancy_repo
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Виды исключений в уведомлениях EXCLUSIONS_CHANNEL: "<user_id>:<вид>:<ID>"
+HIDDEN = 'v'
+BLOCKED = 'e'
+
+
+class ExclusionRepository:
+    """Скрытые пользователем вакансии (user_vacancies.hidden) и заблокированные работодатели"""
+
+    async def hide_vacancy(self, session: AsyncSession, user_id: int, vacancy_id: str):
+        """Скрыть вакансию для пользователя"""
+        await vacancy_repo.set_user_flags(session, user_id, vacancy_id, hidden=True)
+        await db.notify(session, EXCLUSIONS_CHANNEL, f"{user_id}:{HIDDEN}:{vacancy_id}")
+
+    async def block_employer(self, session: AsyncSession, user_id: int, employer_id: str, employer_name: str = None):
+        """Не присылать пользователю вакансии работодателя"""
+        stmt = pg_insert(BlockedEmployer).values(
+            user_id=user_id, employer_id=str(employer_id), employer_name=employer_name
+        ).on_conflict_do_nothing()
+        await session.execute(stmt)
+        await session.flush()
+        await db.notify(session, EXCLUSIONS_CHANNEL, f"{user_id}:{BLOCKED}:{employer_id}")
+
+    async def get_hidden_ids(self, session: AsyncSession, user_ids: list) -> dict:
+        """{user_id: [vacancy_id, ...]} скрытых вакансий"""
+        stmt = select(UserVacancy.user_id, UserVacancy.vacancy_id).where(
+            UserVacancy.user_id == any_(bindparam('user_ids', list(user_ids), type_=ARRAY(BigInteger))),
+            UserVacancy.hidden
+        )
+        result = await session.execute(stmt)
+        hidden = {user_id: [] for user_id in user_ids}
+        for user_id, vacancy_id in result:
+            hidden[user_id].append(vacancy_id)
+        return hidden
+
+    async def get_blocked_employers(self, session: AsyncSession, user_ids: list) -> dict:
+        """{user_id: [employer_id, ...]} заблокированных работодателей"""
+        stmt = select(BlockedEmployer.user_id, BlockedEmployer.employer_id).where(
+            BlockedEmployer.user_id == any_(bindparam('user_ids', list(user_ids), type_=ARRAY(BigInteger)))
+        )
+        result = await session.execute(stmt)
+        blocked = {user_id: [] for user_id in user_ids}
+        for user_id, employer_id in result:
+            blocked[user_id].append(employer_id)
+        return blocked
+
+
+exclusion_repo = ExclusionRepository()
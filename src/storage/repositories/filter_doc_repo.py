@@ -0,0 +1,181 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, any_, bindparam, BigInteger, Text, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, ARRAY
+from src.storage.models import UserFilterDocument
+from src.storage.repositories.filter_repo import FilterRepository
+from src.core.logger import get_logger
+from src.utils.hh_params import build_hh_params, params_hash
+
+logger = get_logger(__name__)
+
+
+class FilterDocumentRepository(FilterRepository):
+    """Фильтры пользователя одним JSONB-документом в user_filter_docs.
+
+    Интерфейс тот же, что у FilterRepository. Каждая запись - атомарное
+    изменение документа через jsonb_set; вместе с документом пересчитываются
+    готовые параметры HH API и их хэш.
+    """
+
+    async def _update_hh_params(self, session: AsyncSession, telegram_id: int, filters: dict):
+        """Пересчитать hh_params и params_hash по новому документу"""
+        params = build_hh_params(filters, include_keywords=False)
+        stmt = (
+            update(UserFilterDocument)
+            .where(UserFilterDocument.telegram_id == telegram_id)
+            .values(hh_params=params, params_hash=params_hash(params))
+        )
+        await session.execute(stmt)
+
+    async def save_filter(self, session: AsyncSession, telegram_id: int,
+                          filter_name: str, filter_value) -> bool:
+        """Сохранить или обновить фильтр пользователя"""
+        await self._mark_written(session, telegram_id)
+        try:
+            stmt = pg_insert(UserFilterDocument).values(
+                telegram_id=telegram_id,
+                filters={filter_name: filter_value}
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserFilterDocument.telegram_id],
+                set_={
+                    'filters': func.jsonb_set(
+                        UserFilterDocument.filters,
+                        bindparam('path', [filter_name], type_=ARRAY(Text)),
+                        bindparam('value', filter_value, type_=JSONB)
+                    ),
+                    'updated_at': func.now()
+                }
+            ).returning(UserFilterDocument.filters)
+
+            result = await session.execute(stmt)
+            await self._update_hh_params(session, telegram_id, result.scalar_one())
+            await session.flush()
+            logger.info(f"Сохранен фильтр {filter_name} для {telegram_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Ошибка сохранения фильтра: {e}")
+            raise
+
+    async def get_filter(self, session: AsyncSession, telegram_id: int,
+                         filter_name: str):
+        """Получить значение фильтра"""
+        filters = await self.get_all_filters(session, telegram_id)
+        return filters.get(filter_name)
+
+    async def get_all_filters(self, session: AsyncSession, telegram_id: int) -> dict:
+        """Получить все фильтры пользователя в виде словаря"""
+        cached = self.cache.get(telegram_id)
+        if cached is not None:
+            return dict(cached)
+
+        stmt = select(UserFilterDocument.filters).where(UserFilterDocument.telegram_id == telegram_id)
+        result = await session.execute(stmt)
+        filters = result.scalar_one_or_none() or {}
+
+        if telegram_id not in session.info.get('written_filters', ()):
+            self.cache.set(telegram_id, filters)
+        return dict(filters)
+
+    async def delete_filter(self, session: AsyncSession, telegram_id: int,
+                            filter_name: str) -> bool:
+        """Удалить фильтр"""
+        await self._mark_written(session, telegram_id)
+        try:
+            stmt = (
+                update(UserFilterDocument)
+                .where(UserFilterDocument.telegram_id == telegram_id)
+                .values(filters=UserFilterDocument.filters.op('-')(filter_name), updated_at=func.now())
+                .returning(UserFilterDocument.filters)
+            )
+            result = await session.execute(stmt)
+            filters = result.scalar_one_or_none()
+            if filters is not None:
+                await self._update_hh_params(session, telegram_id, filters)
+            await session.flush()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка удаления фильтра: {e}")
+            raise
+
+    async def clear_all_filters(self, session: AsyncSession, telegram_id: int) -> bool:
+        """Очистить все фильтры пользователя"""
+        await self._mark_written(session, telegram_id)
+        try:
+            stmt = delete(UserFilterDocument).where(UserFilterDocument.telegram_id == telegram_id)
+            await session.execute(stmt)
+            await session.flush()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка очистки фильтров: {e}")
+            raise
+
+    async def get_subscription_groups(self, session: AsyncSession, telegram_ids: list) -> list:
+        """Сгруппировать пользователей с одинаковыми параметрами поиска одним запросом по params_hash.
+
+        Возвращает список (hh_params, [telegram_id, ...]); пользователи без фильтров пропускаются.
+        """
+        if not telegram_ids:
+            return []
+
+        stmt = (
+            select(UserFilterDocument.hh_params, func.array_agg(UserFilterDocument.telegram_id))
+            .where(
+                UserFilterDocument.telegram_id == any_(
+                    bindparam('telegram_ids', list(telegram_ids), type_=ARRAY(BigInteger))
+                ),
+                UserFilterDocument.filters != text("'{}'::jsonb")
+            )
+            .group_by(UserFilterDocument.params_hash, UserFilterDocument.hh_params)
+        )
+        result = await session.execute(stmt)
+        return [(hh_params or {}, list(ids)) for hh_params, ids in result]
+
+    async def migrate_from_rows(self, session: AsyncSession) -> int:
+        """Перенести фильтры из user_filters (строка на фильтр) в документы.
+
+        Пользователи, у которых документ уже есть, не трогаются, поэтому
+        миграцию можно запускать повторно. Возвращает число созданных документов.
+        """
+        result = await session.execute(text("""
+            INSERT INTO user_filter_docs (telegram_id, filters, updated_at)
+            SELECT telegram_id,
+                   jsonb_object_agg(filter_name, filter_value::jsonb ORDER BY updated_at),
+                   max(updated_at)
+            FROM user_filters
+            GROUP BY telegram_id
+            ON CONFLICT (telegram_id) DO NOTHING
+            RETURNING telegram_id, filters
+        """))
+        migrated = result.all()
+
+        for telegram_id, filters in migrated:
+            await self._update_hh_params(session, telegram_id, filters)
+            self.invalidate(telegram_id)
+        await session.flush()
+
+        if migrated:
+            logger.info(f"Фильтры {len(migrated)} пользователей перенесены в user_filter_docs")
+        return len(migrated)
+
+    async def refresh_hh_params(self, session: AsyncSession) -> int:
+        """Пересчитать hh_params и params_hash у документов, сохраненных по старым правилам.
+
+        Нужна после изменения build_hh_params: иначе старые документы остаются
+        в группах со старыми параметрами до следующего изменения фильтров.
+        Возвращает число обновленных документов.
+        """
+        result = await session.execute(
+            select(UserFilterDocument.telegram_id, UserFilterDocument.filters, UserFilterDocument.params_hash)
+        )
+        updated = 0
+        for telegram_id, filters, stored_hash in result.all():
+            if params_hash(build_hh_params(filters or {}, include_keywords=False)) != stored_hash:
+                await self._update_hh_params(session, telegram_id, filters or {})
+                updated += 1
+        await session.flush()
+
+        if updated:
+            logger.info(f"Параметры поиска пересчитаны для {updated} документов фильтров")
+        return updated
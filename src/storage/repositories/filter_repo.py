@@ -1,18 +1,53 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, update
 from src.storage.models import UserFilter
+from src.storage.database import db, FILTERS_CHANNEL
 from src.core.logger import get_logger
+from src.utils.cache import LRUCache
+from src.utils.config import load_config
+from src.utils.hh_params import build_hh_params, params_hash
 import json
 
 logger = get_logger(__name__)
 
+# Кэш фильтров: на пользователя одна запись, устаревает через 10 минут
+FILTER_CACHE_SIZE = 10000
+FILTER_CACHE_TTL = 600
+
 
 class FilterRepository:
-    """Репозиторий для работы с фильтрами пользователей"""
+    """Репозиторий для работы с фильтрами пользователей.
+
+    Чтения get_all_filters/get_filter обслуживаются из кэша в памяти процесса,
+    любые записи сбрасывают кэш пользователя.
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(max_size=FILTER_CACHE_SIZE, ttl=FILTER_CACHE_TTL)
+
+    def invalidate(self, telegram_id: int):
+        """Сбросить кэш фильтров пользователя"""
+        self.cache.invalidate(telegram_id)
+
+    async def _mark_written(self, session: AsyncSession, telegram_id: int):
+        """Сбросить кэш и запомнить, что фильтры пользователя меняются в этой транзакции.
+
+        Пока транзакция не зафиксирована, прочитанные в ней фильтры не кэшируются:
+        при откате в кэше остались бы несохраненные значения. После коммита
+        другие процессы узнают об изменении через NOTIFY.
+        """
+        self.invalidate(telegram_id)
+        session.info.setdefault('written_filters', set()).add(telegram_id)
+        await db.notify(session, FILTERS_CHANNEL, telegram_id)
+
+    def cache_stats(self) -> dict:
+        """Метрики кэша фильтров"""
+        return self.cache.stats()
 
     async def save_filter(self, session: AsyncSession, telegram_id: int,
                           filter_name: str, filter_value) -> bool:
         """Сохранить или обновить фильтр пользователя"""
+        await self._mark_written(session, telegram_id)
         try:
             # Проверяем, существует ли уже такой фильтр
             stmt = select(UserFilter).where(
@@ -34,18 +69,21 @@ class FilterRepository:
                 )
                 session.add(filter_obj)
 
-            await session.commit()
+            await session.flush()
             logger.info(f"Сохранен фильтр {filter_name} для {telegram_id}")
             return True
 
         except Exception as e:
             logger.error(f"Ошибка сохранения фильтра: {e}")
-            await session.rollback()
-            return False
+            raise
 
     async def get_filter(self, session: AsyncSession, telegram_id: int,
                          filter_name: str):
         """Получить значение фильтра"""
+        cached = self.cache.get(telegram_id)
+        if cached is not None:
+            return cached.get(filter_name)
+
         stmt = select(UserFilter).where(
             UserFilter.telegram_id == telegram_id,
             UserFilter.filter_name == filter_name
@@ -57,38 +95,77 @@ class FilterRepository:
 
     async def get_all_filters(self, session: AsyncSession, telegram_id: int) -> dict:
         """Получить все фильтры пользователя в виде словаря"""
+        cached = self.cache.get(telegram_id)
+        if cached is not None:
+            return dict(cached)
+
         stmt = select(UserFilter).where(UserFilter.telegram_id == telegram_id)
         result = await session.execute(stmt)
-        filters = result.scalars().all()
+        filters = {f.filter_name: f.filter_value for f in result.scalars().all()}
 
-        return {f.filter_name: f.filter_value for f in filters}
+        if telegram_id not in session.info.get('written_filters', ()):
+            self.cache.set(telegram_id, filters)
+        return dict(filters)
 
     async def delete_filter(self, session: AsyncSession, telegram_id: int,
                             filter_name: str) -> bool:
         """Удалить фильтр"""
+        await self._mark_written(session, telegram_id)
         try:
             stmt = delete(UserFilter).where(
                 UserFilter.telegram_id == telegram_id,
                 UserFilter.filter_name == filter_name
             )
             await session.execute(stmt)
-            await session.commit()
+            await session.flush()
             return True
         except Exception as e:
             logger.error(f"Ошибка удаления фильтра: {e}")
-            return False
+            raise
 
     async def clear_all_filters(self, session: AsyncSession, telegram_id: int) -> bool:
         """Очистить все фильтры пользователя"""
+        await self._mark_written(session, telegram_id)
         try:
             stmt = delete(UserFilter).where(UserFilter.telegram_id == telegram_id)
             await session.execute(stmt)
-            await session.commit()
+            await session.flush()
             return True
         except Exception as e:
             logger.error(f"Ошибка очистки фильтров: {e}")
-            return False
+            raise
+
+    async def get_subscription_groups(self, session: AsyncSession, telegram_ids: list) -> list:
+        """Сгруппировать пользователей с одинаковыми параметрами поиска.
+
+        Возвращает список (hh_params, [telegram_id, ...]); пользователи без фильтров пропускаются.
+        """
+        if not telegram_ids:
+            return []
+
+        stmt = select(UserFilter).where(UserFilter.telegram_id.in_(telegram_ids))
+        result = await session.execute(stmt)
+
+        filters_by_user = {}
+        for f in result.scalars().all():
+            filters_by_user.setdefault(f.telegram_id, {})[f.filter_name] = f.filter_value
+
+        groups = {}
+        for telegram_id, filters in filters_by_user.items():
+            params = build_hh_params(filters, include_keywords=False)
+            groups.setdefault(params_hash(params), (params, []))[1].append(telegram_id)
+
+        return list(groups.values())
+
+
+def _create_filter_repo() -> FilterRepository:
+    """Репозиторий фильтров для режима хранения из конфигурации"""
+    if load_config().filter_storage == 'document':
+        # Импорт здесь, т.к. модуль наследуется от FilterRepository
+        from src.storage.repositories.filter_doc_repo import FilterDocumentRepository
+        return FilterDocumentRepository()
+    return FilterRepository()
 
 
 # Глобальный экземпляр
-filter_repo = FilterRepository()
+filter_repo = _create_filter_repo()
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.storage.models import ConversationState
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class StateRepository:
+    """Репозиторий временного состояния диалогов (conversation_state)"""
+
+    async def get(self, session: AsyncSession, namespace: str, key: str):
+        """Значение или None, если записи нет или она истекла"""
+        stmt = select(ConversationState.value).where(
+            ConversationState.namespace == namespace,
+            ConversationState.key == key,
+            ConversationState.expires_at > func.now()
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def set(self, session: AsyncSession, namespace: str, key: str, value, ttl: float):
+        """Записать значение со временем жизни ttl секунд"""
+        expires_at = func.now() + timedelta(seconds=ttl)
+        stmt = pg_insert(ConversationState).values(
+            namespace=namespace, key=key, value=value, expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConversationState.namespace, ConversationState.key],
+            set_={'value': stmt.excluded.value, 'expires_at': stmt.excluded.expires_at}
+        )
+        await session.execute(stmt)
+        await session.flush()
+
+    async def pop(self, session: AsyncSession, namespace: str, key: str):
+        """Удалить запись и вернуть ее значение (None, если записи нет или она истекла)"""
+        stmt = (
+            delete(ConversationState)
+            .where(ConversationState.namespace == namespace, ConversationState.key == key)
+            .returning(ConversationState.value, ConversationState.expires_at > func.now())
+        )
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        await session.flush()
+        return row[0] if row and row[1] else None
+
+    async def delete_expired(self, session: AsyncSession) -> int:
+        """Удалить истекшие записи, вернуть их количество"""
+        stmt = delete(ConversationState).where(ConversationState.expires_at <= func.now())
+        result = await session.execute(stmt)
+        await session.flush()
+        return result.rowcount
+
+
+state_repo = StateRepository()
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from src.storage.models import User
+from src.storage.database import db, USERS_CHANNEL
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,15 +25,15 @@ class UserRepository:
             # Создаем нового
             user = User(telegram_id=telegram_id, **kwargs)
             session.add(user)
-            await session.commit()
+            await session.flush()
             await session.refresh(user)  # Получаем данные из БД
+            await db.notify(session, USERS_CHANNEL, telegram_id)
 
             logger.info(f"Создан новый пользователь: {telegram_id}")
             return user
 
         except Exception as e:
             logger.error(f"Ошибка в get_or_create: {e}")
-            await session.rollback()
             raise
 
     async def update_filters(self, session: AsyncSession, telegram_id: int, filters: str) -> bool:
@@ -44,18 +45,18 @@ class UserRepository:
                 .values(search_filters=filters)
             )
             result = await session.execute(stmt)
-            await session.commit()
+            await session.flush()
 
             updated = result.rowcount > 0
             if updated:
+                await db.notify(session, USERS_CHANNEL, telegram_id)
                 logger.info(f"Обновлены фильтры для {telegram_id}: {filters}")
 
             return updated
 
         except Exception as e:
             logger.error(f"Ошибка обновления фильтров: {e}")
-            await session.rollback()
-            return False
+            raise
 
     async def get_user(self, session: AsyncSession, telegram_id: int) -> User | None:
         """Получить пользователя по ID"""
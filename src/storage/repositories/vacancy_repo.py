@@ -1,69 +1,165 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, delete, update, and_, or_, cast, func, text, literal_column, any_, bindparam, tuple_, BigInteger, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, ARRAY
 from datetime import datetime, timedelta
 from src.storage.models import Vacancy, UserVacancy
+from src.utils.salary import salary_normalizer
+from src.utils.hh_params import DEFAULT_AREA
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Неизменившуюся вакансию переписываем не чаще, только чтобы обновить fetched_at
+FETCHED_AT_REFRESH = timedelta(minutes=10)
+
 
 class VacancyRepository:
     """Репозиторий для работы с вакансиями"""
 
+    def _vacancy_values(self, hh_data: dict) -> dict:
+        """Преобразует данные вакансии от HH в значения колонок таблицы"""
+        # Безопасно получаем все данные
+        vacancy_id = str(hh_data.get('id', ''))
+        title = hh_data.get('name', 'Без названия')
+
+        # Безопасно получаем employer
+        employer = hh_data.get('employer', {})
+        employer_name = employer.get('name', '') if isinstance(employer, dict) else str(employer)
+
+        # Безопасно обрабатываем salary (может быть None)
+        salary = hh_data.get('salary')
+        salary_from = salary.get('from') if salary and isinstance(salary, dict) else None
+        salary_to = salary.get('to') if salary and isinstance(salary, dict) else None
+        salary_currency = salary.get('currency') if salary and isinstance(salary, dict) else None
+
+        # Безопасно получаем остальные поля
+        area_data = hh_data.get('area', {})
+        area = area_data.get('name', '') if isinstance(area_data, dict) else str(area_data)
+
+        exp_data = hh_data.get('experience', {})
+        experience = exp_data.get('name', '') if isinstance(exp_data, dict) else str(exp_data)
+
+        schedule_data = hh_data.get('schedule', {})
+        schedule = schedule_data.get('name', '') if isinstance(schedule_data, dict) else str(schedule_data)
+
+        url = hh_data.get('alternate_url', '')
+
+        # Дата публикации в формате HH: 2024-01-15T10:30:00+0300
+        published_at = None
+        if hh_data.get('published_at'):
+            try:
+                published_at = datetime.strptime(hh_data['published_at'], '%Y-%m-%dT%H:%M:%S%z')
+                # Колонка без часового пояса - храним в локальном времени, как fetched_at
+                published_at = published_at.astimezone().replace(tzinfo=None)
+            except (TypeError, ValueError):
+                logger.warning(f"Некорректная дата публикации: {hh_data['published_at']}")
+
+        return {
+            'hh_id': vacancy_id,
+            'title': title[:500],  # Ограничиваем длину для БД
+            'employer_name': employer_name[:500],
+            'salary_from': salary_from,
+            'salary_to': salary_to,
+            'salary_currency': salary_currency,
+            'salary_min_rub': None,  # Заполняется пачкой в _normalize_salaries
+            'salary_max_rub': None,
+            'canonical_id': None,
+            'area': area[:100],
+            'experience': experience[:50],
+            'schedule': schedule[:50],
+            'url': url[:500],
+            'raw_data': hh_data,
+            'published_at': published_at,
+            'fetched_at': datetime.now()
+        }
+
+    def _normalize_salaries(self, rows: list):
+        """Заполнить salary_min_rub/salary_max_rub для пачки значений одним проходом numpy"""
+        low, high = salary_normalizer.normalize([row['raw_data'] for row in rows])
+        for row, salary_min, salary_max in zip(rows, salary_normalizer.to_db(low), salary_normalizer.to_db(high)):
+            row['salary_min_rub'] = salary_min
+            row['salary_max_rub'] = salary_max
+
     async def save_vacancy(self, session: AsyncSession, hh_data: dict) -> Vacancy:
         """Упрощенный метод сохранения - безопасная обработка"""
         try:
-            # Безопасно получаем все данные
-            vacancy_id = str(hh_data.get('id', ''))
-            title = hh_data.get('name', 'Без названия')
-
-            # Безопасно получаем employer
-            employer = hh_data.get('employer', {})
-            employer_name = employer.get('name', '') if isinstance(employer, dict) else str(employer)
-
-            # Безопасно обрабатываем salary (может быть None)
-            salary = hh_data.get('salary')
-            salary_from = salary.get('from') if salary and isinstance(salary, dict) else None
-            salary_to = salary.get('to') if salary and isinstance(salary, dict) else None
-            salary_currency = salary.get('currency') if salary and isinstance(salary, dict) else None
-
-            # Безопасно получаем остальные поля
-            area_data = hh_data.get('area', {})
-            area = area_data.get('name', '') if isinstance(area_data, dict) else str(area_data)
-
-            exp_data = hh_data.get('experience', {})
-            experience = exp_data.get('name', '') if isinstance(exp_data, dict) else str(exp_data)
-
-            schedule_data = hh_data.get('schedule', {})
-            schedule = schedule_data.get('name', '') if isinstance(schedule_data, dict) else str(schedule_data)
-
-            url = hh_data.get('alternate_url', '')
-
-            vacancy = Vacancy(
-                hh_id=vacancy_id,
-                title=title[:500],  # Ограничиваем длину для БД
-                employer_name=employer_name[:500],
-                salary_from=salary_from,
-                salary_to=salary_to,
-                salary_currency=salary_currency,
-                area=area[:100],
-                experience=experience[:50],
-                schedule=schedule[:50],
-                url=url[:500],
-                raw_data=hh_data,
-                published_at=None,  # Пока не сохраняем
-                fetched_at=datetime.now()
-            )
+            values = self._vacancy_values(hh_data)
+            self._normalize_salaries([values])
+            vacancy = Vacancy(**values)
 
             # Добавляем или обновляем
             await session.merge(vacancy)
-            await session.commit()
-            logger.info(f"✅ Сохранена вакансия: {vacancy_id} - {title[:30]}...")
+            await session.flush()
+            logger.info(f"✅ Сохранена вакансия: {vacancy.hh_id} - {vacancy.title[:30]}...")
             return vacancy
 
         except Exception as e:
             logger.error(f"❌ Ошибка сохранения вакансии: {e}")
-            await session.rollback()
+            raise
+
+    async def save_vacancies(self, session: AsyncSession, records: list, canonical_ids: dict = None) -> set:
+        """Сохраняет страницу вакансий одним INSERT ... ON CONFLICT (hh_id) DO UPDATE.
+
+        Существующая строка обновляется, если изменились данные от HH или
+        fetched_at старше FETCHED_AT_REFRESH.
+        canonical_ids - {hh_id: канонический ID} от DuplicateIndex; уже
+        записанный канонический ID не перезаписывается.
+        Возвращает множество hh_id, которые были вставлены впервые.
+        """
+        canonical_ids = canonical_ids or {}
+        # В одном INSERT ... ON CONFLICT строку нельзя затронуть дважды - убираем дубли
+        rows = {}
+        for hh_data in records:
+            values = self._vacancy_values(hh_data)
+            if values['hh_id']:
+                canonical_id = canonical_ids.get(values['hh_id'])
+                values['canonical_id'] = canonical_id if canonical_id != values['hh_id'] else None
+                rows[values['hh_id']] = values
+
+        if not rows:
+            return set()
+        self._normalize_salaries(list(rows.values()))
+
+        try:
+            stmt = pg_insert(Vacancy).values(list(rows.values()))
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Vacancy.hh_id],
+                set_={
+                    'title': excluded.title,
+                    'employer_name': excluded.employer_name,
+                    'salary_from': excluded.salary_from,
+                    'salary_to': excluded.salary_to,
+                    'salary_currency': excluded.salary_currency,
+                    'salary_min_rub': excluded.salary_min_rub,
+                    'salary_max_rub': excluded.salary_max_rub,
+                    'canonical_id': func.coalesce(Vacancy.canonical_id, excluded.canonical_id),
+                    'area': excluded.area,
+                    'experience': excluded.experience,
+                    'schedule': excluded.schedule,
+                    'url': excluded.url,
+                    'raw_data': excluded.raw_data,
+                    'published_at': excluded.published_at,
+                    'fetched_at': excluded.fetched_at,
+                },
+                # У типа json нет оператора сравнения, поэтому сравниваем как jsonb. Без изменений
+                # строку все равно обновляем раз в FETCHED_AT_REFRESH: по fetched_at локальный
+                # поиск решает, свежие ли данные
+                where=or_(
+                    cast(Vacancy.raw_data, JSONB).is_distinct_from(cast(excluded.raw_data, JSONB)),
+                    Vacancy.fetched_at < excluded.fetched_at - FETCHED_AT_REFRESH
+                )
+            ).returning(Vacancy.hh_id, literal_column('(xmax = 0)').label('inserted'))
+
+            result = await session.execute(stmt)
+            inserted = {row.hh_id for row in result if row.inserted}
+            await session.flush()
+
+            logger.info(f"✅ Сохранено вакансий: {len(rows)} (новых: {len(inserted)})")
+            return inserted
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетного сохранения вакансий: {e}")
             raise
 
     async def mark_as_notified(self, session: AsyncSession, user_id: int, vacancy_id: str):
@@ -91,23 +187,162 @@ class VacancyRepository:
                 )
                 session.add(user_vacancy)
 
-            await session.commit()
+            await session.flush()
             logger.debug(f"Вакансия {vacancy_id} отмечена как отправленная для {user_id}")
 
         except Exception as e:
             logger.error(f"Ошибка отметки вакансии: {e}")
-            await session.rollback()
+            raise
+
+    async def mark_as_notified_many(self, session: AsyncSession, user_id: int, vacancy_ids: list):
+        """Отметить пачку вакансий как отправленные пользователю одним INSERT ... ON CONFLICT"""
+        rows = [
+            {'user_id': user_id, 'vacancy_id': str(vacancy_id), 'notified': True}
+            for vacancy_id in dict.fromkeys(vacancy_ids)
+        ]
+        if not rows:
+            return
+
+        try:
+            stmt = pg_insert(UserVacancy).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserVacancy.user_id, UserVacancy.vacancy_id],
+                set_={'notified': True},
+                where=UserVacancy.notified.is_not(True)
+            )
+            await session.execute(stmt)
+            await session.flush()
+            logger.debug(f"{len(rows)} вакансий отмечены как отправленные для {user_id}")
+
+        except Exception as e:
+            logger.error(f"Ошибка пакетной отметки вакансий: {e}")
+            raise
+
+    async def unmark_notified(self, session: AsyncSession, user_id: int, vacancy_ids: list):
+        """Снять отметку об отправке (сообщение не ушло) - вакансия вернется в следующую проверку"""
+        if not vacancy_ids:
+            return
+
+        try:
+            await session.execute(
+                update(UserVacancy)
+                .where(UserVacancy.user_id == user_id, UserVacancy.vacancy_id.in_([str(v) for v in vacancy_ids]))
+                .values(notified=False)
+            )
+            await session.flush()
+            logger.debug(f"{len(vacancy_ids)} вакансий снова ждут отправки пользователю {user_id}")
+
+        except Exception as e:
+            logger.error(f"Ошибка снятия отметки об отправке: {e}")
+            raise
+
+    async def set_user_flags(self, session: AsyncSession, user_id: int, vacancy_id: str, **flags):
+        """Установить флаги связи пользователь-вакансия (saved, hidden, ...), создав связь при необходимости"""
+        stmt = pg_insert(UserVacancy).values(user_id=user_id, vacancy_id=str(vacancy_id), **flags)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserVacancy.user_id, UserVacancy.vacancy_id],
+            set_=flags
+        )
+        await session.execute(stmt)
+        await session.flush()
+
+    async def get_history_page(self, session: AsyncSession, user_id: int, saved_only: bool = False,
+                               after: tuple = None, limit: int = 10) -> list:
+        """Страница истории (или избранного) пользователя, новые первыми.
+
+        Keyset-пагинация: after - (created_at, vacancy_id) последней строки
+        предыдущей страницы. Стоимость не зависит от номера страницы.
+        Возвращает до limit + 1 строк: лишняя означает, что есть следующая страница.
+        """
+        stmt = (
+            select(
+                UserVacancy.vacancy_id, UserVacancy.created_at, UserVacancy.saved,
+                Vacancy.title, Vacancy.employer_name, Vacancy.url
+            )
+            .join(Vacancy, Vacancy.hh_id == UserVacancy.vacancy_id)
+            .where(UserVacancy.user_id == user_id)
+            .order_by(UserVacancy.created_at.desc(), UserVacancy.vacancy_id.desc())
+            .limit(limit + 1)
+        )
+        if saved_only:
+            stmt = stmt.where(UserVacancy.saved)
+        else:
+            stmt = stmt.where(UserVacancy.hidden.is_(False))
+        if after:
+            stmt = stmt.where(tuple_(UserVacancy.created_at, UserVacancy.vacancy_id) < tuple_(*after))
+
+        result = await session.execute(stmt)
+        return list(result.all())
+
+    async def get_saved_ids(self, session: AsyncSession, user_id: int, limit: int = 20) -> list:
+        """ID вакансий из избранного пользователя, новые первыми"""
+        stmt = (
+            select(UserVacancy.vacancy_id)
+            .where(UserVacancy.user_id == user_id, UserVacancy.saved)
+            .order_by(UserVacancy.created_at.desc(), UserVacancy.vacancy_id.desc())
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_notified_canonical(self, session: AsyncSession, user_ids: list, canonical_ids: list) -> set:
+        """Пары (user_id, канонический ID), по группе дубликатов которых пользователю уже что-то отправляли"""
+        canonical_ids = list({str(canonical_id) for canonical_id in canonical_ids})
+        if not user_ids or not canonical_ids:
+            return set()
+
+        canonical = func.coalesce(Vacancy.canonical_id, Vacancy.hh_id)
+        stmt = (
+            select(UserVacancy.user_id, canonical)
+            .join(Vacancy, Vacancy.hh_id == UserVacancy.vacancy_id)
+            .where(
+                canonical == any_(bindparam('canonical_ids', canonical_ids, type_=ARRAY(String))),
+                UserVacancy.user_id == any_(bindparam('user_ids', list(user_ids), type_=ARRAY(BigInteger))),
+                UserVacancy.notified == True
+            )
+            .distinct()
+        )
+        result = await session.execute(stmt)
+        return {(user_id, canonical_id) for user_id, canonical_id in result}
+
+    async def get_notified_pairs(self, session: AsyncSession, user_ids, vacancy_ids: list) -> set:
+        """Получить уже отправленные пары (user_id, vacancy_id) одним запросом.
+
+        user_ids - ID одного пользователя или список ID.
+        """
+        if isinstance(user_ids, int):
+            user_ids = [user_ids]
+        vacancy_ids = [str(vacancy_id) for vacancy_id in vacancy_ids]
+        if not user_ids or not vacancy_ids:
+            return set()
+
+        try:
+            stmt = select(UserVacancy.user_id, UserVacancy.vacancy_id).where(
+                UserVacancy.user_id == any_(bindparam('user_ids', list(user_ids), type_=ARRAY(BigInteger))),
+                UserVacancy.vacancy_id == any_(bindparam('vacancy_ids', vacancy_ids, type_=ARRAY(String))),
+                UserVacancy.notified == True
+            )
+            result = await session.execute(stmt)
+            return {(row.user_id, row.vacancy_id) for row in result}
+        except Exception as e:
+            logger.error(f"Ошибка получения отправленных вакансий: {e}")
+            # Пустой ответ означал бы "ничего не отправлено" и повторную рассылку всей страницы
+            raise
 
     async def get_new_vacancies_for_user(self, session: AsyncSession, user_id: int, filters: str = None,
-                                         limit: int = 10):
-        """Получить новые вакансии для пользователя"""
+                                         limit: int = 10, fresh_days: int = 30):
+        """Получить новые вакансии для пользователя (только полученные за последние fresh_days дней)"""
         try:
-            # Вакансии, которые еще не отправлялись пользователю
-            subquery = select(UserVacancy.vacancy_id).where(UserVacancy.user_id == user_id)
+            # Вакансии, которые еще не отправлялись пользователю (anti-join через NOT EXISTS)
+            already_sent = select(UserVacancy.vacancy_id).where(
+                UserVacancy.user_id == user_id,
+                UserVacancy.vacancy_id == Vacancy.hh_id
+            )
 
-            # Базовый запрос
+            # Базовый запрос - только по свежим данным
             stmt = select(Vacancy).where(
-                Vacancy.hh_id.not_in(subquery)
+                Vacancy.fetched_at >= datetime.now() - timedelta(days=fresh_days),
+                ~already_sent.exists()
             )
 
             # Фильтруем по ключевым словам если есть
@@ -116,7 +351,7 @@ class VacancyRepository:
                 stmt = stmt.where(Vacancy.title.ilike(f"%{filters}%"))
 
             # Сортируем по дате публикации
-            stmt = stmt.order_by(Vacancy.published_at.desc()).limit(limit)
+            stmt = stmt.order_by(Vacancy.published_at.desc().nulls_last()).limit(limit)
 
             result = await session.execute(stmt)
             vacancies = result.scalars().all()
@@ -141,6 +376,233 @@ class VacancyRepository:
             logger.error(f"Ошибка получения связи пользователь-вакансия: {e}")
             return None
 
+    async def strip_raw_data(self, session: AsyncSession, older_than: datetime,
+                             keep_keys: list, limit: int = 1000) -> int:
+        """Урезает raw_data старых вакансий до ключей keep_keys (одна пачка).
+
+        Возвращает количество обработанных строк.
+        """
+        stmt = text("""
+            UPDATE vacancies
+            SET raw_data = (
+                SELECT json_object_agg(key, value) FROM json_each(vacancies.raw_data)
+                WHERE key = ANY(:keys)
+            )
+            WHERE hh_id IN (
+                SELECT hh_id FROM vacancies
+                WHERE fetched_at < :older_than
+                  AND raw_data IS NOT NULL
+                  AND CASE WHEN json_typeof(raw_data) = 'object' THEN EXISTS (
+                      SELECT 1 FROM json_object_keys(raw_data) k WHERE k <> ALL(:keys)
+                  ) ELSE false END
+                LIMIT :limit
+            )
+        """).bindparams(bindparam('keys', type_=ARRAY(String)))
+
+        result = await session.execute(stmt, {'keys': list(keep_keys), 'older_than': older_than, 'limit': limit})
+        await session.flush()
+        return result.rowcount
+
+    @staticmethod
+    def _kept_by_users():
+        """Условие "вакансия в избранном или скрыта хотя бы у одного пользователя" - такие не архивируются"""
+        return (
+            select(UserVacancy.vacancy_id)
+            .where(
+                UserVacancy.vacancy_id == Vacancy.hh_id,
+                or_(UserVacancy.saved == True, UserVacancy.hidden == True)
+            )
+            .exists()
+        )
+
+    async def get_archive_months(self, session: AsyncSession, older_than: datetime) -> list:
+        """Месяцы (по fetched_at), в которых есть вакансии старше older_than"""
+        month = func.date_trunc(literal_column("'month'"), Vacancy.fetched_at)
+        stmt = (
+            select(month)
+            .where(Vacancy.fetched_at < older_than, ~self._kept_by_users())
+            .group_by(month)
+            .order_by(month)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def pop_archive_batch(self, session: AsyncSession, month_start: datetime, month_end: datetime,
+                                older_than: datetime, limit: int = 1000) -> tuple:
+        """Выбирает и удаляет пачку старых вакансий месяца вместе со связями с пользователями.
+
+        Возвращает (вакансии, связи) в виде словарей для записи в архив.
+        Удаление фиксируется коммитом единицы работы, поэтому архив нужно
+        записать до выхода из session_scope. Вакансии из избранного и
+        скрытые пользователями остаются в БД вместе со всеми связями.
+        """
+        stmt = (
+            select(Vacancy)
+            .where(
+                Vacancy.fetched_at >= month_start,
+                Vacancy.fetched_at < month_end,
+                Vacancy.fetched_at < older_than,
+                ~self._kept_by_users()
+            )
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        vacancies = result.scalars().all()
+        if not vacancies:
+            return [], []
+
+        vacancy_ids = [v.hh_id for v in vacancies]
+        result = await session.execute(
+            select(UserVacancy).where(UserVacancy.vacancy_id.in_(vacancy_ids))
+        )
+        user_vacancies = result.scalars().all()
+
+        vacancy_rows = [_row_to_dict(v) for v in vacancies]
+        user_vacancy_rows = [_row_to_dict(uv) for uv in user_vacancies]
+
+        await session.execute(delete(UserVacancy).where(UserVacancy.vacancy_id.in_(vacancy_ids)))
+        await session.execute(delete(Vacancy).where(Vacancy.hh_id.in_(vacancy_ids)))
+        await session.flush()
+
+        # Удаленные объекты больше не нужны в identity map
+        for obj in [*vacancies, *user_vacancies]:
+            session.expunge(obj)
+        return vacancy_rows, user_vacancy_rows
+
+    def _local_search_conditions(self, params: dict, since: datetime) -> list:
+        """Условия WHERE для локального поиска по параметрам в формате HH API"""
+        conditions = [
+            Vacancy.fetched_at >= since,
+            Vacancy.raw_data.is_not(None)
+        ]
+
+        if params.get('text'):
+            # Название индексировано и русской, и английской морфологией
+            query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), params['text']).op('||')(
+                func.websearch_to_tsquery(literal_column("'english'::regconfig"), params['text'])
+            )
+            conditions.append(Vacancy.search_vector.op('@@')(query))
+
+        if params.get('salary'):
+            # Как у HH: вилка достигает желаемой зарплаты (в рублях в месяц на руки,
+            # по индексу idx_vacancies_salary_rub) или сверху не ограничена ("от ...")
+            conditions.append(or_(
+                Vacancy.salary_max_rub >= int(params['salary']),
+                and_(Vacancy.salary_to.is_(None), Vacancy.salary_from.is_not(None))
+            ))
+
+        # Справочные поля HH сравниваем по id из исходного ответа (area - только регионы
+        # без вложенных, см. LocalSearchService; без региона - DEFAULT_AREA, как у HH)
+        params = {'area': DEFAULT_AREA, **params}
+        for param, key in (('area', 'area'), ('experience', 'experience'),
+                           ('schedule', 'schedule'), ('employment', 'employment')):
+            if params.get(param):
+                conditions.append(Vacancy.raw_data[key]['id'].as_string() == str(params[param]))
+
+        return conditions
+
+    async def search_local(self, session: AsyncSession, params: dict, since: datetime,
+                           limit: int = 20, offset: int = 0) -> list:
+        """Поиск по сохраненным вакансиям с параметрами в формате HH API (см. build_hh_params).
+
+        Учитываются text, area, salary, experience, schedule и employment;
+        только вакансии, полученные не раньше since. Возвращает raw_data в
+        порядке публикации (как order_by=publication_time у HH).
+        """
+        stmt = (
+            select(Vacancy.raw_data)
+            .where(*self._local_search_conditions(params, since))
+            .order_by(Vacancy.published_at.desc().nulls_last(), Vacancy.hh_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def count_local(self, session: AsyncSession, params: dict, since: datetime) -> int:
+        """Количество вакансий, которые найдет search_local"""
+        stmt = select(func.count()).select_from(Vacancy).where(*self._local_search_conditions(params, since))
+        result = await session.execute(stmt)
+        return result.scalar_one()
+
+    async def get_salary_batch(self, session: AsyncSession, after_id: str = '', limit: int = 1000,
+                               currencies: list = None) -> list:
+        """Пачка вакансий с зарплатой для пересчета нормализованных колонок (keyset по hh_id).
+
+        currencies - только вакансии в этих валютах; None - только еще не пересчитанные.
+        """
+        stmt = (
+            select(
+                Vacancy.hh_id, Vacancy.salary_from, Vacancy.salary_to, Vacancy.salary_currency,
+                Vacancy.raw_data['salary']['gross'].as_boolean().label('gross'),
+                Vacancy.raw_data['salary_range']['mode']['id'].as_string().label('period')
+            )
+            .where(Vacancy.hh_id > after_id, or_(Vacancy.salary_from.is_not(None), Vacancy.salary_to.is_not(None)))
+            .order_by(Vacancy.hh_id)
+            .limit(limit)
+        )
+        if currencies is None:
+            stmt = stmt.where(Vacancy.salary_max_rub.is_(None))
+        else:
+            stmt = stmt.where(Vacancy.salary_currency == any_(bindparam('currencies', list(currencies),
+                                                                            type_=ARRAY(String))))
+        result = await session.execute(stmt)
+        return list(result.all())
+
+    async def update_normalized_salaries(self, session: AsyncSession, rows: list):
+        """Пакетное обновление salary_min_rub/salary_max_rub по первичному ключу.
+
+        rows - [{'hh_id': ..., 'salary_min_rub': ..., 'salary_max_rub': ...}]
+        """
+        if rows:
+            await session.execute(update(Vacancy), rows)
+            await session.flush()
+
+    async def get_recent_with_canonical(self, session: AsyncSession, since: datetime, limit: int) -> list:
+        """(hh_id, canonical_id, raw_data) последних полученных вакансий, новые первыми"""
+        stmt = (
+            select(Vacancy.hh_id, Vacancy.canonical_id, Vacancy.raw_data)
+            .where(Vacancy.fetched_at >= since)
+            .order_by(Vacancy.fetched_at.desc())
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.all())
+
+    async def get_raw_data(self, session: AsyncSession, vacancy_id: str):
+        """Исходные данные вакансии от HH по ID (или None)"""
+        stmt = select(Vacancy.raw_data).where(Vacancy.hh_id == str(vacancy_id))
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_raw_data_many(self, session: AsyncSession, vacancy_ids: list) -> dict:
+        """{ID: исходные данные от HH} для нескольких вакансий одним запросом (нет в БД - нет в ответе)"""
+        if not vacancy_ids:
+            return {}
+        stmt = select(Vacancy.hh_id, Vacancy.raw_data).where(
+            Vacancy.hh_id == any_(bindparam('vacancy_ids', [str(v) for v in vacancy_ids], type_=ARRAY(String)))
+        )
+        result = await session.execute(stmt)
+        return {hh_id: raw_data for hh_id, raw_data in result if raw_data}
+
+    async def get_recent(self, session: AsyncSession, since: datetime, limit: int) -> list:
+        """raw_data последних полученных вакансий (не раньше since), новые первыми"""
+        stmt = (
+            select(Vacancy.raw_data)
+            .where(Vacancy.fetched_at >= since)
+            .order_by(Vacancy.fetched_at.desc())
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+def _row_to_dict(obj) -> dict:
+    """ORM-объект → словарь значений колонок (без вычисляемых БД)"""
+    return {
+        column.name: getattr(obj, column.name)
+        for column in obj.__table__.columns
+        if column.computed is None
+    }
 
 # Глобальный экземпляр
 vacancy_repo = VacancyRepository()
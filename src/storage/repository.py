@@ -20,7 +20,7 @@ class UserRepository:
         # Создаем нового
         user = User(telegram_id=telegram_id, **kwargs)
         session.add(user)
-        await session.commit()
+        await session.flush()
         return user
 
     async def update_filters(self, session: AsyncSession, telegram_id: int, filters: str):
@@ -31,7 +31,7 @@ class UserRepository:
             .values(search_filters=filters)
         )
         await session.execute(stmt)
-        await session.commit()
+        await session.flush()
 
 
 class VacancyRepository:
@@ -49,7 +49,7 @@ class VacancyRepository:
 
         # Upsert операция (вставка или обновление)
         await session.merge(vacancy)
-        await session.commit()
+        await session.flush()
 
 
 # Создаем экземпляры репозиториев
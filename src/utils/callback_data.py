@@ -0,0 +1,73 @@
+"""Компактная версионированная кодировка callback_data inline-кнопок.
+
+Формат: <версия><код маршрута>[:<аргумент>], например "1n:5" или "1sv:93451234".
+Telegram ограничивает callback_data 64 байтами - encode проверяет это сразу,
+при создании клавиатуры. Кнопки старого формата (или другой версии) decode
+не распознает, и роутер отвечает на них как на устаревшие.
+"""
+
+CALLBACK_VERSION = '1'
+MAX_CALLBACK_BYTES = 64
+SEPARATOR = ':'
+
+
+class Route:
+    """Коды маршрутов (короткие, чтобы оставить место под аргумент)"""
+
+    # Вакансии
+    NEXT = 'n'
+    PREV = 'p'
+    PAGE_INFO = 'pi'
+    SAVE = 'sv'
+    HIDE = 'hd'
+    IGNORE = 'ig'
+    BACK_TO_VACANCY = 'bv'
+    BLOCK_EMPLOYER = 'be'
+
+    # История и избранное
+    HISTORY = 'hi'
+
+    # Сопроводительные письма
+    COVER = 'cv'
+    GEN_COVER = 'gc'
+    MANUAL_COVER = 'mc'
+    SEND_COVER = 'sc'
+    DRAFT_COVER = 'dc'
+    COVER_SAVED = 'cs'
+
+    # Фильтры
+    FILTERS_MENU = 'fm'
+    FILTER_SELECT = 'fs'
+    FILTER_PROFESSION = 'fp'
+    FILTER_SALARY = 'fz'
+    FILTER_EXPERIENCE = 'fe'
+    FILTER_SCHEDULE = 'fh'
+    FILTER_EMPLOYMENT = 'fy'
+    FILTER_AREA = 'fa'
+    FILTERS_SAVE = 'fv'
+    FILTERS_CLEAR = 'fc'
+    FILTERS_BACK = 'fb'
+    MAIN_MENU = 'mm'
+    CONFIRM = 'ok'
+    CANCEL = 'no'
+
+
+def encode(route: str, arg='') -> str:
+    """Собрать callback_data для маршрута; ValueError, если не влезает в 64 байта"""
+    data = f"{CALLBACK_VERSION}{route}"
+    arg = str(arg)
+    if arg:
+        data = f"{data}{SEPARATOR}{arg}"
+
+    if len(data.encode('utf-8')) > MAX_CALLBACK_BYTES:
+        raise ValueError(f"callback_data длиннее {MAX_CALLBACK_BYTES} байт: {data}")
+    return data
+
+
+def decode(data: str):
+    """Разобрать callback_data в (код маршрута, аргумент) или None для чужой версии"""
+    if not data or not data.startswith(CALLBACK_VERSION):
+        return None
+
+    route, _, arg = data[len(CALLBACK_VERSION):].partition(SEPARATOR)
+    return route, arg
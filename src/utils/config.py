@@ -24,6 +24,79 @@ class Config:
         self.hh_api_url = os.getenv('HH_API_URL', 'https://api.hh.ru/vacancies')
         self.check_interval = int(os.getenv('CHECK_INTERVAL', '3600'))  # 1 час по умолчанию
 
+        # Хранение старых данных
+        self.raw_data_ttl_days = int(os.getenv('RAW_DATA_TTL_DAYS', '30'))  # Через сколько дней урезать raw_data
+        self.archive_after_days = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))  # Через сколько дней архивировать
+        self.archive_dir = os.getenv('ARCHIVE_DIR', 'archive')
+        self.retention_interval = int(os.getenv('RETENTION_INTERVAL', '86400'))  # Раз в сутки
+
+        # Хранение фильтров: 'rows' - строка на фильтр, 'document' - JSONB-документ на пользователя
+        self.filter_storage = os.getenv('FILTER_STORAGE', 'rows')
+
+        # Повторная проверка после изменения фильтров (LISTEN/NOTIFY), секунды ожидания
+        self.recheck_debounce = float(os.getenv('RECHECK_DEBOUNCE', '10'))
+
+        # Сколько вакансий за одну проверку отправлять пользователю; остальные - в следующую проверку
+        self.notify_max_per_check = int(os.getenv('NOTIFY_MAX_PER_CHECK', '10'))
+
+        # /search отвечает из локальной базы, если вакансии получены не раньше, чем столько секунд назад (0 - выключено)
+        self.local_search_max_age = int(os.getenv('LOCAL_SEARCH_MAX_AGE', '3600'))
+
+        # Отложенная запись действий пользователя: интервал (мс), размер пачки, предел очереди
+        self.write_behind_interval_ms = int(os.getenv('WRITE_BEHIND_INTERVAL_MS', '500'))
+        self.write_behind_batch = int(os.getenv('WRITE_BEHIND_BATCH', '100'))
+        self.write_behind_max_queue = int(os.getenv('WRITE_BEHIND_MAX_QUEUE', '10000'))
+
+        # Предзагрузка следующих вакансий при листании: сколько вперед и размер кэша
+        self.prefetch_ahead = int(os.getenv('PREFETCH_AHEAD', '3'))
+        self.prefetch_cache_size = int(os.getenv('PREFETCH_CACHE_SIZE', '1000'))
+
+        # Прием апдейтов: 'polling' или 'webhook' (локальный aiohttp-сервер)
+        self.bot_mode = os.getenv('BOT_MODE', 'polling')
+        self.webhook_host = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+        self.webhook_port = int(os.getenv('WEBHOOK_PORT', '8443'))
+        self.webhook_path = os.getenv('WEBHOOK_PATH', '/telegram')
+        self.webhook_url = os.getenv('WEBHOOK_URL', '')  # Публичный адрес; пустой - setWebhook не вызывается
+        self.webhook_secret = os.getenv('WEBHOOK_SECRET', '')  # Обязателен в режиме webhook
+        self.webhook_queue_size = int(os.getenv('WEBHOOK_QUEUE_SIZE', '1000'))  # Принятых и не обработанных апдейтов
+
+        # Сколько апдейтов обрабатывать одновременно (апдейты одного чата - всегда по очереди).
+        # Каждый держит соединение с БД; пул расширяется под это значение (см. database.py)
+        self.max_concurrent_updates = int(os.getenv('MAX_CONCURRENT_UPDATES', '20'))
+
+        # Состояние диалогов: 'memory' - в процессе, 'postgres' - общее для всех процессов бота
+        self.state_store = os.getenv('STATE_STORE', 'memory')
+        self.state_ttl = int(os.getenv('STATE_TTL', '3600'))
+        self.state_max_size = int(os.getenv('STATE_MAX_SIZE', '10000'))  # Только для 'memory'
+
+        # Inline-режим (@bot запрос): сколько последних вакансий держать в индексе и сколько отдавать
+        self.inline_index_size = int(os.getenv('INLINE_INDEX_SIZE', '20000'))
+        self.inline_results = int(os.getenv('INLINE_RESULTS', '20'))  # Telegram принимает не больше 50
+
+        # Скрытые вакансии и заблокированные работодатели в памяти
+        self.exclusions_cache_size = int(os.getenv('EXCLUSIONS_CACHE_SIZE', '10000'))  # Пользователей
+        self.exclusions_cache_ttl = int(os.getenv('EXCLUSIONS_CACHE_TTL', '3600'))
+
+        # Сопроводительные письма: потоки для подстановки шаблонов и кэш готовых писем
+        self.cover_letter_workers = int(os.getenv('COVER_LETTER_WORKERS', '2'))
+        self.cover_letter_cache_size = int(os.getenv('COVER_LETTER_CACHE_SIZE', '5000'))
+
+        # Ранжирование вакансий перед отправкой: веса признаков и сколько лучших отправлять за проверку
+        self.ranking_weights = os.getenv('RANKING_WEIGHTS', '')  # "keywords=0.4,salary=0.2,..."
+        self.ranking_top_k = int(os.getenv('RANKING_TOP_K', '0'))  # 0 - отправлять все новые (лучшие первыми)
+        self.ranking_half_life_hours = float(os.getenv('RANKING_HALF_LIFE_HOURS', '24'))
+
+        # Нормализация зарплат: курсы валют из справочника HH и НДФЛ для зарплат "до вычета налогов"
+        self.currency_refresh_interval = int(os.getenv('CURRENCY_REFRESH_INTERVAL', '86400'))  # Секунды
+        self.income_tax_rate = float(os.getenv('INCOME_TAX_RATE', '0.13'))
+
+        # Почти одинаковые вакансии (MinHash/LSH): размер индекса, точность сигнатуры и порог сходства
+        self.dedup_index_size = int(os.getenv('DEDUP_INDEX_SIZE', '50000'))
+        self.dedup_num_perm = int(os.getenv('DEDUP_NUM_PERM', '64'))
+        self.dedup_bands = int(os.getenv('DEDUP_BANDS', '16'))  # num_perm должно делиться на bands
+        self.dedup_threshold = float(os.getenv('DEDUP_THRESHOLD', '0.8'))
+        self.dedup_days = int(os.getenv('DEDUP_DAYS', '14'))  # За сколько дней восстанавливать индекс из БД
+
         # Настройки PostgreSQL
         self.db_config = {
             "host": os.getenv('DB_HOST', 'localhost'),
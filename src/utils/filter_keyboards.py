@@ -1,37 +1,31 @@
+from functools import lru_cache
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List, Optional
+from src.utils.callback_data import Route, encode
 
 
-def get_filters_main_keyboard(current_filters: dict = None) -> InlineKeyboardMarkup:
-    """Главное меню фильтров с отображением текущих настроек"""
-    filters_text = ""
-    if current_filters:
-        if current_filters.get('profession'):
-            filters_text += f"💼 {current_filters['profession']}\n"
-        if current_filters.get('salary_min'):
-            filters_text += f"💰 от {current_filters['salary_min']} руб.\n"
-        if current_filters.get('experience'):
-            filters_text += f"🎓 {current_filters['experience']}\n"
-
+def _build_filters_main_keyboard() -> InlineKeyboardMarkup:
+    """Главное меню фильтров"""
     keyboard = [
-        [InlineKeyboardButton("💼 Профессия", callback_data="filter_profession")],
-        [InlineKeyboardButton("💰 Зарплата", callback_data="filter_salary")],
-        [InlineKeyboardButton("🎓 Опыт", callback_data="filter_experience")],
-        [InlineKeyboardButton("📍 Формат работы", callback_data="filter_schedule")],
-        [InlineKeyboardButton("🏢 Тип занятости", callback_data="filter_employment")],
-        [InlineKeyboardButton("🌍 Город", callback_data="filter_area")],
-        [InlineKeyboardButton("🔍 Ключевые слова", callback_data="filter_keywords")],
+        [InlineKeyboardButton("💼 Профессия", callback_data=encode(Route.FILTER_SELECT, "profession"))],
+        [InlineKeyboardButton("💰 Зарплата", callback_data=encode(Route.FILTER_SELECT, "salary"))],
+        [InlineKeyboardButton("🎓 Опыт", callback_data=encode(Route.FILTER_SELECT, "experience"))],
+        [InlineKeyboardButton("📍 Формат работы", callback_data=encode(Route.FILTER_SELECT, "schedule"))],
+        [InlineKeyboardButton("🏢 Тип занятости", callback_data=encode(Route.FILTER_SELECT, "employment"))],
+        [InlineKeyboardButton("🌍 Город", callback_data=encode(Route.FILTER_SELECT, "area"))],
+        [InlineKeyboardButton("🔍 Ключевые слова", callback_data=encode(Route.FILTER_SELECT, "keywords"))],
+        [InlineKeyboardButton("🚫 Слова-исключения", callback_data=encode(Route.FILTER_SELECT, "exclude_keywords"))],
         [
-            InlineKeyboardButton("✅ Сохранить", callback_data="filters_save"),
-            InlineKeyboardButton("🧹 Очистить все", callback_data="filters_clear")
+            InlineKeyboardButton("✅ Сохранить", callback_data=encode(Route.FILTERS_SAVE)),
+            InlineKeyboardButton("🧹 Очистить все", callback_data=encode(Route.FILTERS_CLEAR))
         ],
-        [InlineKeyboardButton("🔙 Назад", callback_data="back_to_main")]  # Изменено здесь!
+        [InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.MAIN_MENU))]  # Изменено здесь!
     ]
 
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_profession_keyboard() -> InlineKeyboardMarkup:
+def _build_profession_keyboard() -> InlineKeyboardMarkup:
     """Выбор профессии"""
     professions = [
         ("Python-разработчик", "Python"),
@@ -50,17 +44,17 @@ def get_profession_keyboard() -> InlineKeyboardMarkup:
         row = []
         if i < len(professions):
             row.append(InlineKeyboardButton(professions[i][0],
-                                            callback_data=f"prof_{professions[i][1]}"))
+                                            callback_data=encode(Route.FILTER_PROFESSION, professions[i][1])))
         if i + 1 < len(professions):
             row.append(InlineKeyboardButton(professions[i + 1][0],
-                                            callback_data=f"prof_{professions[i + 1][1]}"))
+                                            callback_data=encode(Route.FILTER_PROFESSION, professions[i + 1][1])))
         keyboard.append(row)
 
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_salary_keyboard() -> InlineKeyboardMarkup:
+def _build_salary_keyboard() -> InlineKeyboardMarkup:
     """Выбор зарплаты"""
     salary_ranges = [
         ("💸 Любая", "any"),
@@ -71,14 +65,14 @@ def get_salary_keyboard() -> InlineKeyboardMarkup:
         ("💰 Указать свою", "custom_salary")
     ]
 
-    keyboard = [[InlineKeyboardButton(text, callback_data=f"salary_{value}")]
+    keyboard = [[InlineKeyboardButton(text, callback_data=encode(Route.FILTER_SALARY, value))]
                 for text, value in salary_ranges]
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
 
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_experience_keyboard() -> InlineKeyboardMarkup:
+def _build_experience_keyboard() -> InlineKeyboardMarkup:
     """Выбор опыта"""
     experiences = [
         ("👶 Без опыта", "noExperience"),
@@ -88,14 +82,14 @@ def get_experience_keyboard() -> InlineKeyboardMarkup:
         ("👑 Lead", "lead")
     ]
 
-    keyboard = [[InlineKeyboardButton(text, callback_data=f"exp_{value}")]
+    keyboard = [[InlineKeyboardButton(text, callback_data=encode(Route.FILTER_EXPERIENCE, value))]
                 for text, value in experiences]
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
 
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_schedule_keyboard() -> InlineKeyboardMarkup:
+def _build_schedule_keyboard() -> InlineKeyboardMarkup:
     """Выбор формата работы"""
     schedules = [
         ("🏢 Офис", "office"),
@@ -104,14 +98,14 @@ def get_schedule_keyboard() -> InlineKeyboardMarkup:
         ("🌍 Любой", "any")
     ]
 
-    keyboard = [[InlineKeyboardButton(text, callback_data=f"schedule_{value}")]
+    keyboard = [[InlineKeyboardButton(text, callback_data=encode(Route.FILTER_SCHEDULE, value))]
                 for text, value in schedules]
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
 
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_employment_keyboard() -> InlineKeyboardMarkup:
+def _build_employment_keyboard() -> InlineKeyboardMarkup:
     """Выбор типа занятости"""
     employments = [
         ("📅 Полный день", "fullDay"),
@@ -121,14 +115,14 @@ def get_employment_keyboard() -> InlineKeyboardMarkup:
         ("🔄 Сменная", "shift")
     ]
 
-    keyboard = [[InlineKeyboardButton(text, callback_data=f"employment_{value}")]
+    keyboard = [[InlineKeyboardButton(text, callback_data=encode(Route.FILTER_EMPLOYMENT, value))]
                 for text, value in employments]
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
 
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_area_keyboard() -> InlineKeyboardMarkup:
+def _build_area_keyboard() -> InlineKeyboardMarkup:
     """Выбор города"""
     areas = [
         ("📍 Москва", "1"),
@@ -143,21 +137,67 @@ def get_area_keyboard() -> InlineKeyboardMarkup:
         row = []
         if i < len(areas):
             row.append(InlineKeyboardButton(areas[i][0],
-                                            callback_data=f"area_{areas[i][1]}"))
+                                            callback_data=encode(Route.FILTER_AREA, areas[i][1])))
         if i + 1 < len(areas):
             row.append(InlineKeyboardButton(areas[i + 1][0],
-                                            callback_data=f"area_{areas[i + 1][1]}"))
+                                            callback_data=encode(Route.FILTER_AREA, areas[i + 1][1])))
         keyboard.append(row)
 
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_filters")])
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode(Route.FILTERS_BACK))])
     return InlineKeyboardMarkup(keyboard)
 
 
+# Статические клавиатуры собираются один раз (разметка PTB неизменяема)
+FILTERS_MAIN_KEYBOARD = _build_filters_main_keyboard()
+PROFESSION_KEYBOARD = _build_profession_keyboard()
+SALARY_KEYBOARD = _build_salary_keyboard()
+EXPERIENCE_KEYBOARD = _build_experience_keyboard()
+SCHEDULE_KEYBOARD = _build_schedule_keyboard()
+EMPLOYMENT_KEYBOARD = _build_employment_keyboard()
+AREA_KEYBOARD = _build_area_keyboard()
+
+
+def get_filters_main_keyboard(current_filters: dict = None) -> InlineKeyboardMarkup:
+    """Главное меню фильтров (текущие настройки показываются в тексте сообщения)"""
+    return FILTERS_MAIN_KEYBOARD
+
+
+def get_profession_keyboard() -> InlineKeyboardMarkup:
+    """Выбор профессии"""
+    return PROFESSION_KEYBOARD
+
+
+def get_salary_keyboard() -> InlineKeyboardMarkup:
+    """Выбор зарплаты"""
+    return SALARY_KEYBOARD
+
+
+def get_experience_keyboard() -> InlineKeyboardMarkup:
+    """Выбор опыта"""
+    return EXPERIENCE_KEYBOARD
+
+
+def get_schedule_keyboard() -> InlineKeyboardMarkup:
+    """Выбор формата работы"""
+    return SCHEDULE_KEYBOARD
+
+
+def get_employment_keyboard() -> InlineKeyboardMarkup:
+    """Выбор типа занятости"""
+    return EMPLOYMENT_KEYBOARD
+
+
+def get_area_keyboard() -> InlineKeyboardMarkup:
+    """Выбор города"""
+    return AREA_KEYBOARD
+
+
+@lru_cache(maxsize=256)
 def get_confirmation_keyboard(action: str, data: str = "") -> InlineKeyboardMarkup:
     """Клавиатура подтверждения"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("✅ Да", callback_data=f"confirm_{action}_{data}"),
-            InlineKeyboardButton("❌ Нет", callback_data=f"cancel_{action}")
+            InlineKeyboardButton("✅ Да", callback_data=encode(Route.CONFIRM, f"{action}_{data}" if data else action)),
+            InlineKeyboardButton("❌ Нет", callback_data=encode(Route.CANCEL, action))
         ]
     ])
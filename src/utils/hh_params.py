@@ -0,0 +1,107 @@
+import hashlib
+import json
+
+DEFAULT_AREA = 1  # Регион поиска HH, если в фильтрах его нет (Москва)
+
+
+def _clean(text: str) -> str:
+    """Убрать из текста кавычки и скобки - символы языка запросов HH"""
+    return ' '.join(text.replace('"', ' ').replace('(', ' ').replace(')', ' ').split())
+
+
+def _any_of(words: list) -> str:
+    """Слова и фразы через OR на языке запросов HH: фразы в кавычках"""
+    terms = []
+    for word in words:
+        word = _clean(word)
+        if word:
+            terms.append(f'"{word}"' if ' ' in word else word)
+    return ' OR '.join(terms)
+
+
+def build_hh_params(filters: dict, include_keywords: bool = True) -> dict:
+    """Фильтры → параметры HH API.
+
+    include_keywords=False - режим подписок: достаточно любого из ключевых
+    слов, и искать их нужно не только в названии. Профессия ищется в
+    названии (NAME:), ключевые слова через OR - во всех полях вакансии.
+    Найденное KeywordMatcher дополнительно проверяет целыми словами по
+    названию, фрагментам описания и навыкам.
+    """
+    params = {}
+
+    keywords = filters.get('keywords') or []
+    if not isinstance(keywords, list):
+        keywords = [keywords]
+
+    # Текст поиска
+    if include_keywords:
+        search_parts = []
+        if filters.get('profession'):
+            search_parts.append(filters['profession'])
+        search_parts.extend(keywords)
+        if search_parts:
+            params['text'] = ' '.join(search_parts)
+    else:
+        any_keyword = _any_of(keywords)
+        if any_keyword:
+            # search_field=None - искать во всех полях, поля задаются в самом запросе
+            params['search_field'] = None
+            profession = _clean(filters.get('profession') or '')
+            if profession:
+                params['text'] = f"NAME:({profession}) AND ({any_keyword})"
+            else:
+                params['text'] = any_keyword
+        elif filters.get('profession'):
+            params['text'] = filters['profession']
+
+    # Регион (ID из HH API)
+    area_map = {'Москва': 1, 'Санкт-Петербург': 2, 'remote': 113}
+    if filters.get('area') in area_map:
+        params['area'] = area_map[filters['area']]
+    elif filters.get('area') and filters['area'] != 'any':
+        # Если город не из списка, пока пропускаем
+        pass
+
+    # Зарплата
+    if filters.get('salary_min'):
+        params['salary'] = filters['salary_min']
+
+    # Опыт
+    exp_map = {
+        'noExperience': 'noExperience',
+        'junior': 'between1And3',
+        'middle': 'between3And6',
+        'senior': 'moreThan6'
+    }
+    if filters.get('experience') in exp_map:
+        params['experience'] = exp_map[filters['experience']]
+
+    # График работы
+    schedule_map = {
+        'office': 'fullDay',
+        'remote': 'remote',
+        'hybrid': 'flexible',
+        'any': None
+    }
+    if filters.get('schedule') in schedule_map and schedule_map[filters['schedule']]:
+        params['schedule'] = schedule_map[filters['schedule']]
+
+    # Тип занятости
+    employment_map = {
+        'fullDay': 'full',
+        'partDay': 'part',
+        'project': 'project',
+        'internship': 'probation',
+        'shift': 'shift'
+    }
+    if filters.get('employment') in employment_map:
+        params['employment'] = employment_map[filters['employment']]
+
+    return params
+
+
+def params_hash(params: dict) -> str:
+    """Стабильный хэш параметров поиска (не зависит от порядка ключей)"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
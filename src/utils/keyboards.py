@@ -1,9 +1,16 @@
+from functools import lru_cache
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.constants import ParseMode
+from src.utils.callback_data import Route, encode
+
+# Объекты клавиатур PTB неизменяемы, поэтому одну и ту же разметку можно
+# отдавать во все ответы: статические клавиатуры собираются один раз при
+# импорте, параметризованные - кэшируются по аргументам.
+VACANCY_KEYBOARD_CACHE_SIZE = 4096
 
 
 # REPLY KEYBOARD (постоянная)
-def get_main_keyboard():
+def _build_main_keyboard():
     """Основная клавиатура команд"""
     keyboard = [
         ["🔍 Поиск вакансий", "⚙️ Мои фильтры"],
@@ -13,7 +20,7 @@ def get_main_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
-def get_filters_keyboard():
+def _build_filters_keyboard():
     """Клавиатура для работы с фильтрами"""
     keyboard = [
         ["📝 Установить фильтры", "👀 Показать фильтры"],
@@ -22,7 +29,7 @@ def get_filters_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
-def get_search_keyboard():
+def _build_search_keyboard():
     """Клавиатура для поиска"""
     keyboard = [
         ["🔎 Искать сейчас", "⏰ Автопоиск"],
@@ -31,27 +38,48 @@ def get_search_keyboard():
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
+MAIN_KEYBOARD = _build_main_keyboard()
+FILTERS_KEYBOARD = _build_filters_keyboard()
+SEARCH_KEYBOARD = _build_search_keyboard()
+
+
+def get_main_keyboard():
+    """Основная клавиатура команд"""
+    return MAIN_KEYBOARD
+
+
+def get_filters_keyboard():
+    """Клавиатура для работы с фильтрами"""
+    return FILTERS_KEYBOARD
+
+
+def get_search_keyboard():
+    """Клавиатура для поиска"""
+    return SEARCH_KEYBOARD
+
+
 # INLINE KEYBOARD (для вакансий)
+@lru_cache(maxsize=VACANCY_KEYBOARD_CACHE_SIZE)
 def get_vacancy_keyboard(vacancy_id: str, page: int = 0, total: int = 1):
     """Inline-клавиатура для действий с вакансией"""
     # Кнопки навигации
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Предыдущая", callback_data=f"prev_{page - 1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Предыдущая", callback_data=encode(Route.PREV, page - 1)))
 
-    nav_buttons.append(InlineKeyboardButton(f"{page + 1}/{total}", callback_data="page_info"))
+    nav_buttons.append(InlineKeyboardButton(f"{page + 1}/{total}", callback_data=encode(Route.PAGE_INFO)))
 
     if page < total - 1:
-        nav_buttons.append(InlineKeyboardButton("Следующая ➡️", callback_data=f"next_{page + 1}"))
+        nav_buttons.append(InlineKeyboardButton("Следующая ➡️", callback_data=encode(Route.NEXT, page + 1)))
 
     keyboard = [
         [
-            InlineKeyboardButton("📨 Создать письмо", callback_data=f"cover_{vacancy_id}"),
-            InlineKeyboardButton("💾 Сохранить", callback_data=f"save_{vacancy_id}")
+            InlineKeyboardButton("📨 Создать письмо", callback_data=encode(Route.COVER, vacancy_id)),
+            InlineKeyboardButton("💾 Сохранить", callback_data=encode(Route.SAVE, vacancy_id))
         ],
         [
-            InlineKeyboardButton("👎 Не интересно", callback_data=f"hide_{vacancy_id}"),
-            InlineKeyboardButton("❌ Скрыть", callback_data=f"ignore_{vacancy_id}")
+            InlineKeyboardButton("👎 Не интересно", callback_data=encode(Route.HIDE, vacancy_id)),
+            InlineKeyboardButton("❌ Скрыть", callback_data=encode(Route.IGNORE, vacancy_id))
         ],
         nav_buttons,
         [
@@ -64,30 +92,43 @@ def get_vacancy_keyboard(vacancy_id: str, page: int = 0, total: int = 1):
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=VACANCY_KEYBOARD_CACHE_SIZE)
 def get_cover_letter_keyboard(vacancy_id: str):
     """Клавиатура для сопроводительного письма"""
     keyboard = [
         [
-            InlineKeyboardButton("🤖 Сгенерировать", callback_data=f"gen_cover_{vacancy_id}"),
-            InlineKeyboardButton("✏️ Ввести вручную", callback_data=f"manual_cover_{vacancy_id}")
+            InlineKeyboardButton("🤖 Сгенерировать", callback_data=encode(Route.GEN_COVER, vacancy_id)),
+            InlineKeyboardButton("✏️ Ввести вручную", callback_data=encode(Route.MANUAL_COVER, vacancy_id))
         ],
         [
-            InlineKeyboardButton("📤 Отправить", callback_data=f"send_cover_{vacancy_id}"),
-            InlineKeyboardButton("💾 Черновик", callback_data=f"draft_cover_{vacancy_id}")
+            InlineKeyboardButton("📤 Отправить", callback_data=encode(Route.SEND_COVER, vacancy_id)),
+            InlineKeyboardButton("💾 Черновик", callback_data=encode(Route.DRAFT_COVER, vacancy_id))
         ],
         [
-            InlineKeyboardButton("↩️ Назад к вакансии", callback_data=f"back_to_{vacancy_id}")
+            InlineKeyboardButton("↩️ Назад к вакансии", callback_data=encode(Route.BACK_TO_VACANCY, vacancy_id))
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=VACANCY_KEYBOARD_CACHE_SIZE)
+def get_hidden_vacancy_keyboard(vacancy_id: str, next_index: int = None):
+    """Клавиатура после скрытия вакансии"""
+    keyboard = [
+        [InlineKeyboardButton("🚫 Скрыть работодателя", callback_data=encode(Route.BLOCK_EMPLOYER, vacancy_id))]
+    ]
+    if next_index is not None:
+        keyboard.append([InlineKeyboardButton("Следующая ➡️", callback_data=encode(Route.NEXT, next_index))])
+    return InlineKeyboardMarkup(keyboard)
+
+
+@lru_cache(maxsize=256)
 def get_confirmation_keyboard(action: str, data: str):
     """Клавиатура подтверждения действия"""
     keyboard = [
         [
-            InlineKeyboardButton("✅ Да", callback_data=f"confirm_{action}_{data}"),
-            InlineKeyboardButton("❌ Нет", callback_data=f"cancel_{action}")
+            InlineKeyboardButton("✅ Да", callback_data=encode(Route.CONFIRM, f"{action}_{data}" if data else action)),
+            InlineKeyboardButton("❌ Нет", callback_data=encode(Route.CANCEL, action))
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
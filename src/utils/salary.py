@@ -0,0 +1,62 @@
+import numpy as np
+from src.utils.config import load_config
+
+# Зарплата за период HH (salary_range.mode) -> в месяц
+PERIOD_MULTIPLIERS = {'MONTH': 1, 'HOUR': 164, 'SHIFT': 21, 'FLY_IN_FLY_OUT': 1}
+BASE_CURRENCY = 'RUR'
+
+
+class SalaryNormalizer:
+    """Приведение зарплат к сопоставимому виду: рубли в месяц на руки.
+
+    Курсы - сколько единиц валюты стоит рубль (как в справочнике HH
+    /dictionaries), обновляются фоновой задачей. Зарплата "до вычета
+    налогов" (gross) уменьшается на ставку НДФЛ, почасовая и посменная -
+    пересчитывается в месячную. Считается сразу для всей пачки массивами numpy.
+    """
+
+    def __init__(self, income_tax: float = 0.13):
+        self.income_tax = income_tax
+        self.rates = {BASE_CURRENCY: 1.0}
+
+    def set_rates(self, rates: dict) -> set:
+        """Заменить курсы; возвращает валюты, курс которых изменился"""
+        rates = {code: float(rate) for code, rate in rates.items() if rate}
+        rates[BASE_CURRENCY] = 1.0
+        changed = {code for code in set(rates) | set(self.rates) if rates.get(code) != self.rates.get(code)}
+        self.rates = rates
+        return changed
+
+    def normalize(self, vacancies: list) -> tuple:
+        """(минимум, максимум) в рублях в месяц на руки для вакансий в формате HH API (NaN - не указана)"""
+        salary_from, salary_to, currencies, gross, periods = [], [], [], [], []
+        for vacancy in vacancies:
+            salary = vacancy.get('salary') or {}
+            salary_range = vacancy.get('salary_range') or {}
+            salary_from.append(salary.get('from'))
+            salary_to.append(salary.get('to'))
+            currencies.append(salary.get('currency'))
+            gross.append(salary.get('gross'))
+            periods.append((salary_range.get('mode') or {}).get('id'))
+        return self.normalize_columns(salary_from, salary_to, currencies, gross, periods)
+
+    def normalize_columns(self, salary_from, salary_to, currencies, gross, periods) -> tuple:
+        """То же по колонкам: исходные границы, валюта, признак gross и период HH"""
+        low = np.array(salary_from, dtype=float)  # None -> NaN
+        high = np.array(salary_to, dtype=float)
+        rate = np.array([self.rates.get(code, np.nan) for code in currencies], dtype=float)
+        net = np.where(np.array([bool(value) for value in gross]), 1 - self.income_tax, 1.0)
+        per_month = np.array([PERIOD_MULTIPLIERS.get(period, 1) for period in periods], dtype=float)
+
+        factor = net * per_month / rate
+        low, high = low * factor, high * factor
+        # Одна граница указана - она же и минимум, и максимум
+        return np.fmin(low, high), np.fmax(low, high)
+
+    @staticmethod
+    def to_db(values: np.ndarray) -> list:
+        """Массив с NaN -> целые рубли и None для колонок БД"""
+        return [None if np.isnan(value) else int(round(value)) for value in values.tolist()]
+
+
+salary_normalizer = SalaryNormalizer(income_tax=load_config().income_tax_rate)
@@ -0,0 +1,46 @@
+import src.utils.cache as cache_module
+from src.utils.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.keys() == ['a', 'c']
+    assert cache.get('b') is None
+
+
+def test_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    cache = LRUCache(ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=100)
+
+    clock.now = 11
+
+    assert 'a' not in cache
+    assert cache.get('a', 'default') == 'default'
+    assert len(cache) == 1
+    assert cache.get('b') == 2
+
+
+def test_stats_and_invalidate():
+    cache = LRUCache(max_size=10)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    cache.invalidate('a')
+
+    assert cache.stats() == {'size': 0, 'max_size': 10, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
@@ -0,0 +1,32 @@
+import pytest
+from src.utils.callback_data import Route, encode, decode, MAX_CALLBACK_BYTES
+
+
+def test_round_trip():
+    assert decode(encode(Route.SAVE, 93451234)) == (Route.SAVE, '93451234')
+    assert decode(encode(Route.MAIN_MENU)) == (Route.MAIN_MENU, '')
+
+
+def test_argument_may_contain_separator():
+    assert decode(encode(Route.FILTER_SELECT, 'experience:junior')) == (Route.FILTER_SELECT, 'experience:junior')
+
+
+def test_foreign_version_is_not_decoded():
+    assert decode('save_123') is None
+    assert decode('') is None
+    assert decode(None) is None
+
+
+def test_too_long_data_is_rejected():
+    encode(Route.NEXT, 'x' * (MAX_CALLBACK_BYTES - 1 - len(Route.NEXT) - 1))
+    with pytest.raises(ValueError):
+        encode(Route.NEXT, 'x' * MAX_CALLBACK_BYTES)
+    # Лимит в байтах, а не в символах
+    with pytest.raises(ValueError):
+        encode(Route.NEXT, 'я' * 31)
+
+
+def test_route_codes_are_unique():
+    codes = [value for name, value in vars(Route).items() if not name.startswith('_')]
+
+    assert len(codes) == len(set(codes))
@@ -0,0 +1,70 @@
+import pytest
+from src.services.dedup import DuplicateIndex, MinHasher, shingles
+
+DESCRIPTION = (
+    "Ищем опытного Python разработчика для работы над высоконагруженным сервисом. "
+    "Требования: опыт от трех лет, знание asyncio, PostgreSQL, Docker. "
+    "Условия: удаленная работа, ДМС, гибкий график, обучение за счет компании."
+)
+
+
+def make_vacancy(vacancy_id, name='Python developer', employer='ACME', description=DESCRIPTION, area='Москва'):
+    return {
+        'id': vacancy_id,
+        'name': name,
+        'employer': {'name': employer},
+        'area': {'name': area},
+        'description': description
+    }
+
+
+def test_shingles_ignore_markup_and_case():
+    vacancy = make_vacancy(1, name='Python', employer='ACME', description='<p>Пишем КОД</p>')
+
+    assert shingles(vacancy) == {'python acme пишем', 'acme пишем код'}
+
+
+def test_signature_is_deterministic_and_short_texts_are_skipped():
+    hasher = MinHasher(num_perm=32)
+    items = shingles(make_vacancy(1))
+
+    assert (hasher.signature(items) == MinHasher(num_perm=32).signature(items)).all()
+    assert hasher.signature(items).shape == (32,)
+    assert hasher.signature({'one', 'two'}) is None
+
+
+def test_republished_vacancy_gets_canonical_id():
+    index = DuplicateIndex(max_size=100)
+
+    canonical = index.canonical_ids([
+        make_vacancy(1),
+        make_vacancy(2, area='Казань', description=DESCRIPTION + ' Офис в Казани.'),
+        make_vacancy(3, name='Повар', employer='Кафе', description='Готовим вкусную еду на кухне ресторана каждый день')
+    ])
+
+    assert canonical == {'1': '1', '2': '1', '3': '3'}
+    assert index.stats()['duplicates_found'] == 1
+
+
+def test_known_vacancy_keeps_its_canonical_id():
+    index = DuplicateIndex(max_size=100)
+    index.canonical_ids([make_vacancy(1), make_vacancy(2)])
+
+    assert index.canonical_ids([make_vacancy(2)]) == {'2': '1'}
+
+
+def test_oldest_entries_are_evicted():
+    index = DuplicateIndex(max_size=2)
+    for i in range(1, 4):
+        index.canonical_ids([make_vacancy(i, name=f'Вакансия {i}', employer=f'Работодатель {i}',
+                                          description=f'текст номер {i} ' * 5)])
+
+    assert len(index) == 2
+    assert list(index.entries) == ['2', '3']
+    # Вытесненная вакансия не осталась в корзинах LSH
+    assert all('1' not in ids for bucket in index.buckets for ids in bucket.values())
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        DuplicateIndex(num_perm=64, bands=10)
@@ -0,0 +1,36 @@
+from src.utils.hh_params import build_hh_params, params_hash
+
+
+def test_interactive_search_joins_keywords():
+    params = build_hh_params({'profession': 'Python', 'keywords': ['Django', 'Celery'], 'area': 'Москва'})
+
+    assert params == {'text': 'Python Django Celery', 'area': 1}
+
+
+def test_subscription_keywords_are_any_of_all_fields():
+    params = build_hh_params({'profession': 'Python', 'keywords': ['Django', 'Fast API', '(x)']},
+                             include_keywords=False)
+
+    assert params == {'search_field': None, 'text': 'NAME:(Python) AND (Django OR "Fast API" OR x)'}
+
+
+def test_subscription_profession_is_sanitized():
+    params = build_hh_params({'profession': 'C++ (Qt) "senior"', 'keywords': ['Qt']}, include_keywords=False)
+
+    assert params['text'] == 'NAME:(C++ Qt senior) AND (Qt)'
+
+
+def test_subscription_keywords_without_profession():
+    params = build_hh_params({'keywords': ['Django'], 'area': 'remote'}, include_keywords=False)
+
+    assert params == {'search_field': None, 'text': 'Django', 'area': 113}
+
+
+def test_subscription_without_keywords_searches_title():
+    assert build_hh_params({'profession': 'Go'}, include_keywords=False) == {'text': 'Go'}
+    assert build_hh_params({'experience': 'junior'}, include_keywords=False) == {'experience': 'between1And3'}
+
+
+def test_params_hash_ignores_key_order():
+    assert params_hash({'a': 1, 'b': 2}) == params_hash({'b': 2, 'a': 1})
+    assert params_hash({'a': 1}) != params_hash({'a': 2})
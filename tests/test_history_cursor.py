@@ -0,0 +1,20 @@
+from datetime import datetime
+from src.handlers.history import encode_cursor, decode_cursor, HISTORY, SAVED
+from src.utils.callback_data import Route, encode
+
+
+def test_round_trip_keeps_microseconds():
+    created_at = datetime(2024, 5, 17, 13, 45, 12, 123456)
+
+    assert decode_cursor(encode_cursor(SAVED, created_at, '93451234')) == (SAVED, (created_at, '93451234'))
+
+
+def test_first_page():
+    assert decode_cursor(SAVED) == (SAVED, None)
+    assert decode_cursor('') == (HISTORY, None)
+
+
+def test_cursor_fits_callback_data():
+    cursor = encode_cursor(HISTORY, datetime(2099, 12, 31, 23, 59, 59, 999999), '9' * 12)
+
+    encode(Route.HISTORY, cursor)
@@ -0,0 +1,69 @@
+from src.services.inline_index import InlineVacancyIndex, tokenize
+
+
+def make_vacancy(vacancy_id, name, employer='ACME', area='Москва', published='2024-01-01T12:00:00+0300'):
+    return {
+        'id': vacancy_id,
+        'name': name,
+        'employer': {'name': employer},
+        'area': {'name': area},
+        'published_at': published,
+        'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}'
+    }
+
+
+def found_ids(index: InlineVacancyIndex, query: str) -> list:
+    return [item.vacancy_id for item in index.search(query)]
+
+
+def test_tokenize():
+    assert tokenize('Ёлка-Python, 1С!') == ['елка', 'python', '1с']
+
+
+def test_prefix_search_requires_every_word():
+    index = InlineVacancyIndex()
+    index.add([
+        make_vacancy(1, 'Python developer', area='Москва'),
+        make_vacancy(2, 'Python разработчик', area='Казань'),
+        make_vacancy(3, 'Java developer'),
+    ])
+
+    assert sorted(found_ids(index, 'pyth')) == ['1', '2']
+    assert found_ids(index, 'pyth каз') == ['2']
+    assert found_ids(index, 'golang') == []
+    # Слишком короткие слова запроса не учитываются
+    assert found_ids(index, 'p') == []
+
+
+def test_newest_first_and_limit():
+    index = InlineVacancyIndex()
+    index.add([
+        make_vacancy(1, 'Python', published='2024-01-01T10:00:00+0300'),
+        make_vacancy(2, 'Python', published='2024-01-03T10:00:00+0300'),
+        make_vacancy(3, 'Python', published='2024-01-02T10:00:00+0300'),
+    ])
+
+    assert [item.vacancy_id for item in index.search('python', limit=2)] == ['2', '3']
+
+
+def test_update_and_eviction_clean_postings():
+    index = InlineVacancyIndex(max_size=2)
+    index.add([make_vacancy(1, 'Python'), make_vacancy(2, 'Java')])
+    index.add([make_vacancy(1, 'Golang')])
+
+    assert found_ids(index, 'python') == []
+    assert found_ids(index, 'golang') == ['1']
+
+    index.add([make_vacancy(3, 'Kotlin')])
+
+    assert len(index) == 2
+    assert found_ids(index, 'java') == []
+    assert 'java' not in index.postings and 'java' not in index.vocabulary
+    assert index.vocabulary == sorted(index.vocabulary)
+
+
+def test_broken_vacancy_is_skipped():
+    index = InlineVacancyIndex()
+    index.add([{'name': 'Без ID'}, make_vacancy(1, 'Python')])
+
+    assert len(index) == 1
@@ -0,0 +1,108 @@
+from src.services.keyword_matcher import AhoCorasick, KeywordMatcher, normalize, vacancy_text
+
+
+def make_vacancy(name='', description='', requirement='', skills=()):
+    return {
+        'name': name,
+        'description': description,
+        'snippet': {'requirement': requirement},
+        'key_skills': [{'name': skill} for skill in skills]
+    }
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick()
+    for pattern in ('he', 'she', 'his', 'hers'):
+        automaton.add(pattern)
+
+    found = sorted(automaton.find('ushers'))
+
+    assert found == [(3, 'he'), (3, 'she'), (5, 'hers')]
+
+
+def test_automaton_rebuilds_after_new_pattern():
+    automaton = AhoCorasick()
+    automaton.add('java')
+    assert [word for _, word in automaton.find('java python')] == ['java']
+
+    automaton.add('python')
+    assert sorted(word for _, word in automaton.find('java python')) == ['java', 'python']
+
+
+def test_vacancy_text_strips_tags_and_normalizes():
+    vacancy = make_vacancy(name='Ёлка  Developer', description='<p>Опыт &amp; <b>Django</b></p>', skills=['SQL'])
+
+    text = vacancy_text(vacancy)
+
+    assert '<' not in text
+    assert 'елка developer' in text
+    assert 'опыт & django' in text
+    assert text.endswith('sql')
+    assert normalize('  A  b ') == 'a b'
+
+
+def test_whole_words_only():
+    matcher = KeywordMatcher()
+    matcher.set_user(1, {'keywords': ['java']})
+
+    assert matcher.accepts(make_vacancy(name='JavaScript developer'), [1]) == set()
+    assert matcher.accepts(make_vacancy(name='Java developer'), [1]) == {1}
+
+
+def test_include_and_exclude_per_user():
+    matcher = KeywordMatcher()
+    matcher.set_user(1, {'keywords': ['django']})
+    matcher.set_user(2, {'exclude_keywords': ['битрикс']})
+    matcher.set_user(3, {'keywords': ['fastapi'], 'exclude_keywords': ['senior']})
+
+    vacancy = make_vacancy(name='Senior Python', requirement='Django, FastAPI', skills=['Битрикс'])
+
+    # 4 - без фильтров слов: подходит любая вакансия
+    assert matcher.accepts(vacancy, [1, 2, 3, 4]) == {1, 4}
+
+
+def test_search_result_matches_snippet_and_skills():
+    matcher = KeywordMatcher()
+    matcher.set_user(1, {'keywords': ['django']})
+    matcher.set_user(2, {'keywords': ['celery']})
+    matcher.set_user(3, {'keywords': ['kafka']})
+
+    # Результат поиска HH: без описания, ключевые слова во фрагменте и навыках
+    vacancy = {
+        'name': 'Python developer',
+        'snippet': {'requirement': 'Опыт с <highlighttext>Django</highlighttext>', 'responsibility': None},
+        'key_skills': [{'name': 'Celery'}]
+    }
+
+    assert matcher.accepts(vacancy, [1, 2, 3]) == {1, 2}
+
+
+def test_keywords_from_string():
+    matcher = KeywordMatcher()
+    matcher.set_user(1, {'keywords': 'Django, FastAPI\nCelery'})
+
+    assert matcher.users[1][0] == {'django', 'fastapi', 'celery'}
+
+
+def test_remove_user_compacts_automaton():
+    matcher = KeywordMatcher()
+    for user_id in range(10):
+        matcher.set_user(user_id, {'keywords': [f'word{user_id}']})
+    automaton = matcher.automaton
+
+    for user_id in range(1, 10):
+        matcher.remove_user(user_id)
+
+    assert matcher.automaton is not automaton
+    assert set(matcher.automaton.patterns) == {'word0'}
+    assert matcher.accepts(make_vacancy(name='word0'), [0]) == {0}
+
+
+def test_unchanged_filters_keep_automaton():
+    matcher = KeywordMatcher()
+    matcher.set_user(1, {'keywords': ['go']})
+    matcher.automaton.build()
+
+    matcher.set_user(1, {'keywords': ['go']})
+
+    assert not matcher.automaton.dirty
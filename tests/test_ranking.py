@@ -0,0 +1,66 @@
+from src.services.ranking import VacancyRanker, RankingProfile, parse_weights, DEFAULT_WEIGHTS
+
+
+def make_vacancy(vacancy_id, name, salary_to=None, experience=None):
+    return {
+        'id': vacancy_id,
+        'name': name,
+        'salary': {'from': None, 'to': salary_to, 'currency': 'RUR'} if salary_to else None,
+        'experience': {'id': experience} if experience else None,
+        'area': {'id': '1'},
+        'published_at': '2024-01-01T12:00:00+0300'
+    }
+
+
+VACANCIES = [
+    make_vacancy(1, 'Java developer', 150000, 'between1And3'),
+    make_vacancy(2, 'Python Django developer', 300000, 'between1And3'),
+    make_vacancy(3, 'Python developer', 100000, 'moreThan6'),
+]
+
+
+def selected_ids(selected: dict) -> dict:
+    return {user_id: [v['id'] for v in vacancies] for user_id, vacancies in selected.items()}
+
+
+def test_parse_weights():
+    weights = parse_weights('keywords=0.5, salary=0.1,unknown=1,')
+
+    assert weights['keywords'] == 0.5
+    assert weights['salary'] == 0.1
+    assert weights['recency'] == DEFAULT_WEIGHTS['recency']
+    assert 'unknown' not in weights
+
+
+def test_select_orders_candidates_by_score():
+    ranker = VacancyRanker()
+    profiles = {
+        1: RankingProfile({'profession': 'Python', 'keywords': ['Django'], 'salary_min': 200000,
+                           'experience': 'junior'}),
+        2: RankingProfile({'profession': 'Java'}),
+    }
+    candidates = {1: {'1', '2', '3'}, 2: {'1', '3'}}
+
+    selected = selected_ids(ranker.select(VACANCIES, profiles, candidates))
+
+    assert selected[1] == [2, 3, 1]
+    assert selected[2] == [1, 3]
+
+
+def test_select_respects_top_k_and_candidates():
+    ranker = VacancyRanker(top_k=1)
+    profiles = {1: RankingProfile({'profession': 'Python'}), 2: RankingProfile({}), 3: RankingProfile({})}
+    candidates = {1: {'1', '2', '3'}, 2: {'3'}, 3: set()}
+
+    selected = selected_ids(ranker.select(VACANCIES, profiles, candidates))
+
+    assert len(selected[1]) == 1 and selected[1][0] in (2, 3)
+    assert selected[2] == [3]
+    assert selected[3] == []
+
+
+def test_select_without_candidates():
+    ranker = VacancyRanker()
+
+    assert ranker.select(VACANCIES, {1: RankingProfile({})}, {}) == {1: []}
+    assert ranker.select([], {1: RankingProfile({})}, {1: {'1'}}) == {1: []}
@@ -0,0 +1,42 @@
+import math
+from src.utils.salary import SalaryNormalizer
+
+
+def make_vacancy(salary_from=None, salary_to=None, currency='RUR', gross=False, mode=None):
+    vacancy = {'salary': {'from': salary_from, 'to': salary_to, 'currency': currency, 'gross': gross}}
+    if mode:
+        vacancy['salary_range'] = {'mode': {'id': mode}}
+    return vacancy
+
+
+def test_net_rubles_per_month():
+    normalizer = SalaryNormalizer(income_tax=0.13)
+    normalizer.set_rates({'USD': 0.01})
+
+    low, high = normalizer.normalize([
+        make_vacancy(100000, 200000),
+        make_vacancy(100000, None, gross=True),
+        make_vacancy(None, 1000, currency='USD'),
+        make_vacancy(1000, None, mode='HOUR'),
+    ])
+
+    assert SalaryNormalizer.to_db(low) == [100000, 87000, 100000, 164000]
+    assert SalaryNormalizer.to_db(high) == [200000, 87000, 100000, 164000]
+
+
+def test_missing_salary_and_unknown_currency_are_nan():
+    normalizer = SalaryNormalizer()
+
+    low, high = normalizer.normalize([{'salary': None}, make_vacancy(1000, 2000, currency='XXX')])
+
+    assert all(math.isnan(value) for value in [*low, *high])
+    assert SalaryNormalizer.to_db(low) == [None, None]
+
+
+def test_set_rates_reports_changed_currencies():
+    normalizer = SalaryNormalizer()
+
+    assert normalizer.set_rates({'USD': 0.01, 'EUR': 0.009}) == {'USD', 'EUR'}
+    assert normalizer.set_rates({'USD': 0.01, 'EUR': 0.0095}) == {'EUR'}
+    assert normalizer.set_rates({'USD': 0.01}) == {'EUR'}
+    assert normalizer.rates['RUR'] == 1.0
@@ -0,0 +1,66 @@
+"""Порядок внутри чата и общий лимит PerChatUpdateProcessor"""
+import asyncio
+from telegram import Update
+from src.core.update_processor import PerChatUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': 'python'
+        }
+    }, None)
+
+
+def test_busy_chat_does_not_block_other_chats():
+    async def scenario():
+        processor = PerChatUpdateProcessor(2)
+        release = asyncio.Event()
+        done = []
+
+        async def slow(update_id):
+            await release.wait()
+            done.append(update_id)
+
+        async def fast(update_id):
+            done.append(update_id)
+
+        # Серия нажатий одного чата: первое висит, остальные ждут очередь чата
+        busy = [asyncio.create_task(processor.process_update(make_update(i, 1), slow(i))) for i in range(10)]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(processor.process_update(make_update(100, 2), fast(100)), timeout=1)
+
+        assert done == [100]
+        assert processor.in_progress == 1
+
+        release.set()
+        await asyncio.gather(*busy)
+        assert done == [100] + list(range(10))
+        assert processor.stats()['updates'] == 11
+
+    asyncio.run(scenario())
+
+
+def test_limit_applies_across_chats():
+    async def scenario():
+        processor = PerChatUpdateProcessor(2)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        tasks = [asyncio.create_task(processor.process_update(make_update(i, i), slow())) for i in range(5)]
+        await asyncio.sleep(0.01)
+
+        assert processor.in_progress == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert processor.in_progress == 0
+        assert not processor.chat_locks
+
+    asyncio.run(scenario())
@@ -0,0 +1,98 @@
+"""Webhook-сервер без сети и Telegram: aiohttp test client и фиктивное приложение"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.update_processor import PerChatUpdateProcessor
+from src.core.webhook import WebhookServer, SECRET_HEADER
+
+SECRET = 'test-secret'
+
+
+class FakeApplication:
+    """Минимум Application для WebhookServer: бот, процессор и process_update"""
+
+    def __init__(self):
+        self.bot = None
+        self.update_processor = PerChatUpdateProcessor(4)
+        self.processed = []
+
+    async def process_update(self, update):
+        self.processed.append(update.update_id)
+
+
+def make_config(**overrides):
+    config = SimpleNamespace(
+        webhook_host='127.0.0.1',
+        webhook_port=0,
+        webhook_path='/telegram',
+        webhook_url='',
+        webhook_secret=SECRET,
+        webhook_queue_size=100
+    )
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    return config
+
+
+def make_update(update_id: int, chat_id: int = 1) -> dict:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': '/start'
+        }
+    }
+
+
+async def post(server: WebhookServer, payload, headers=None):
+    async with TestClient(TestServer(server.make_app())) as client:
+        response = await client.post(server.path, json=payload, headers=headers or {})
+        await asyncio.gather(*server.tasks)
+        return response.status
+
+
+def test_update_with_secret_is_processed():
+    application = FakeApplication()
+    server = WebhookServer(application, make_config())
+
+    status = asyncio.run(post(server, make_update(1), {SECRET_HEADER: SECRET}))
+
+    assert status == 200
+    assert application.processed == [1]
+
+
+@pytest.mark.parametrize('headers', [{}, {SECRET_HEADER: 'wrong'}])
+def test_wrong_secret_is_rejected(headers):
+    application = FakeApplication()
+    server = WebhookServer(application, make_config())
+
+    status = asyncio.run(post(server, make_update(1), headers))
+
+    assert status == 403
+    assert application.processed == []
+
+
+def test_invalid_update_is_rejected():
+    server = WebhookServer(FakeApplication(), make_config())
+
+    status = asyncio.run(post(server, ['not', 'an', 'update'], {SECRET_HEADER: SECRET}))
+
+    assert status == 400
+
+
+def test_overflow_returns_503():
+    application = FakeApplication()
+    server = WebhookServer(application, make_config(webhook_queue_size=0))
+
+    status = asyncio.run(post(server, make_update(1), {SECRET_HEADER: SECRET}))
+
+    assert status == 503
+    assert application.processed == []
+
+
+def test_secret_is_required():
+    with pytest.raises(ValueError):
+        WebhookServer(FakeApplication(), make_config(webhook_secret=''))